@@ -1,15 +1,26 @@
 # app/auth.py
 import os
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, lazyload
 
 from app.config import settings
 from app.db import get_db
 from app.models.utilisateur import Utilisateur
+from app.services.principal_cache import principal_cache, snapshot_user, attach_user
+from app.services.token_versions import token_versions
+
+# bcrypt tourne sur le pool borné de app.services.hashing :
+# les routes async doivent utiliser les variantes *_async.
+from app.services.hashing import (
+    hash_password,
+    verify_password,
+    hash_password_async,
+    verify_password_async,
+)
 
 # ==========================================================
 # 🔹 CONFIGURATION GÉNÉRALE
@@ -20,21 +31,9 @@ ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 ACTIVATION_TOKEN_EXPIRE_HOURS = 24
 RESET_TOKEN_EXPIRE_HOURS = 1
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
 
-# ==========================================================
-# 🔹 HASH / VERIFY MOTS DE PASSE
-# ==========================================================
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-
 # ==========================================================
 # 🔹 TOKEN D’ACCÈS (connexion)
 # ==========================================================
@@ -46,52 +45,137 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def build_access_claims(user) -> dict:
     """
-    Retourne l'utilisateur courant.
-    - En production : retourne un objet ORM complet
-    - En tests : reste compatible avec les dicts utilisés
+    Claims du token d'accès.
+    - Format classique : seulement `sub`
+    - Format `claims` (ACCESS_TOKEN_CLAIMS) : rôle/équipe signés + token_version
     """
-    from app.config import settings
-    from jose import JWTError, jwt
-    from fastapi import HTTPException, status
-
-    credentials_exception = HTTPException(
+    if not settings.ACCESS_TOKEN_CLAIMS:
+        return {"sub": str(user.id)}
+
+    return {
+        "sub": str(user.id),
+        "fmt": "claims",
+        "id": user.id,
+        "type": user.type,
+        "equipe": user.equipe,
+        "is_active": bool(user.is_active),
+        "tv": user.token_version or 0,
+    }
+
+
+def _credentials_exception(detail: str = "Jeton invalide ou expiré.") -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Jeton invalide ou expiré.",
+        detail=detail,
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _decode_access_token(token: str) -> dict:
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=["HS256"])
-        sub = payload.get("sub")
-        if sub is None:
-            raise credentials_exception
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
 
-    user = None
-    if str(sub).isdigit():
-        user = db.query(Utilisateur).filter(Utilisateur.id == int(sub)).first()
-    if not user:
-        user = db.query(Utilisateur).filter(Utilisateur.email == sub).first()
 
-    if not user:
-        raise HTTPException(status_code=404, detail="Utilisateur introuvable")
+def _check_token_version(payload: dict, db: Session) -> None:
+    """Token à claims : rejeté dès que la token_version de l'utilisateur a changé."""
+    if payload.get("fmt") != "claims":
+        return
+    user_id = payload.get("id")
+    if user_id is None or token_versions.current(user_id, db) != payload.get("tv"):
+        raise _credentials_exception("Jeton révoqué, reconnectez-vous.")
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    """
+    Retourne l'utilisateur courant.
+    - En production : retourne un objet ORM complet
+    - En tests : reste compatible avec les dicts utilisés
+    - Token à claims : token_version vérifiée comme pour get_current_principal
+    """
+    return _user_from_payload(_decode_access_token(token), db)
+
+
+def _user_from_payload(payload: dict, db: Session):
+    _check_token_version(payload, db)
+    sub = str(payload["sub"])
+
+    # ⚡ Cache des utilisateurs : évite 2-3 requêtes SQL par appel authentifié
+    user = None
+    cached = principal_cache.get(sub)
+    if cached is None:
+        if sub.isdigit():
+            user = (
+                db.query(Utilisateur)
+                .options(lazyload(Utilisateur.assignations))
+                .filter(Utilisateur.id == int(sub))
+                .first()
+            )
+        if not user:
+            user = (
+                db.query(Utilisateur)
+                .options(lazyload(Utilisateur.assignations))
+                .filter(Utilisateur.email == sub)
+                .first()
+            )
+
+        if not user:
+            raise HTTPException(status_code=404, detail="Utilisateur introuvable")
+
+        cached = snapshot_user(user)
+        principal_cache.put(sub, cached)
 
     # 🔐 Si on est en mode test : retourne un dict
     if os.getenv("TESTING") == "1":
         return {
-            "id": user.id,
-            "email": user.email,
-            "nom": user.nom,
-            "type": user.type,
-            "equipe": user.equipe,
-            "is_active": getattr(user, "is_active", False),
+            "id": cached["id"],
+            "email": cached["email"],
+            "nom": cached["nom"],
+            "type": cached["type"],
+            "equipe": cached["equipe"],
+            "is_active": cached["is_active"] or False,
         }
 
     # 🟢 En exécution normale : retourne un vrai ORM object
-    return user
+    return user if user is not None else attach_user(cached, db)
+
+
+# ==========================================================
+# 🔹 PRINCIPAL À PARTIR DES CLAIMS (routes en lecture seule)
+# ==========================================================
+@dataclass(frozen=True)
+class Principal:
+    """Utilisateur courant reconstruit depuis un token à claims, sans DB."""
+    id: int
+    type: str
+    equipe: str | None
+    is_active: bool
+
+
+def get_current_principal(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    """
+    Dépendance pour les routes en lecture seule.
+    - Token à claims : autorisation depuis les claims, seule la token_version
+      est vérifiée (table compacte en mémoire, pas de requête par appel)
+    - Ancien format (`sub` seul) : repli sur get_current_user
+    """
+    payload = _decode_access_token(token)
+    if payload.get("fmt") != "claims":
+        return _user_from_payload(payload, db)
+
+    _check_token_version(payload, db)
+    return Principal(
+        id=payload["id"],
+        type=payload.get("type") or "user",
+        equipe=payload.get("equipe"),
+        is_active=bool(payload.get("is_active")),
+    )
 
 
 
@@ -0,0 +1,244 @@
+"""
+Rattrapage des résumés IA (`resume_ia IS NULL`) sur les tâches existantes.
+
+    python -m app.backfill_summaries
+    python -m app.backfill_summaries --workers 8 --batch-size 1000 --max-rate 2000
+    python -m app.backfill_summaries --reset          # ignore le point de reprise
+
+- lecture en flux : pages par clé (id > dernier), une transaction courte par
+  page (pas de curseur serveur, qui garderait un instantané ouvert pendant
+  tout le rattrapage et retiendrait le VACUUM)
+- résumés calculés par lots sur un pool de processus (generate_summaries)
+- écriture par lot : un UPDATE exécuté en executemany, une transaction courte
+  par lot, conditionné au contenu lu (une tâche modifiée entre-temps est
+  laissée à la file des résumés de l'API)
+- point de reprise (dernier id écrit) enregistré après chaque lot : le
+  script peut être interrompu (Ctrl+C) puis relancé
+- `--max-rate` limite le débit d'écriture pour ne pas pénaliser l'API
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from sqlalchemy import Engine, bindparam, create_engine, func, select, update
+
+from app.models.tache import Tache
+from app.models.utilisateur import Utilisateur  # noqa: F401 (mappers)
+from app.models.commentaire import Commentaire  # noqa: F401 (mappers)
+from app.models.fichier import FichierTache  # noqa: F401 (mappers)
+from app.services.some_ai_module import generate_summaries
+from app.services.summaries import MIN_CONTENU_LENGTH
+
+DEFAULT_CHECKPOINT = "backfill_summaries.checkpoint.json"
+
+
+# ======================================================
+# 💾 POINT DE REPRISE
+# ======================================================
+def load_checkpoint(path: str) -> dict:
+    if not os.path.exists(path):
+        return {"last_id": 0, "scanned": 0, "written": 0}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: str, state: dict) -> None:
+    """Écriture atomique : un arrêt brutal laisse l'ancien point de reprise intact."""
+    state = {**state, "saved_at": datetime.now(timezone.utc).isoformat()}
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+# ======================================================
+# 📥 LECTURE EN FLUX
+# ======================================================
+def _pending_filter(after_id: int):
+    return (
+        Tache.id > after_id,
+        Tache.resume_ia.is_(None),
+        func.length(Tache.contenu) > MIN_CONTENU_LENGTH,
+    )
+
+
+def count_pending(engine: Engine, after_id: int) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(func.count(Tache.id)).where(*_pending_filter(after_id))).scalar_one()
+
+
+def stream_batches(engine: Engine, after_id: int, batch_size: int):
+    """Lots de (id, contenu) par id croissant, sans charger toute la table."""
+    query = select(Tache.id, Tache.contenu).order_by(Tache.id)
+
+    # Pages courtes par clé : aucune transaction ni verrou de lecture gardé
+    # pendant les calculs et les écritures
+    while True:
+        with engine.connect() as conn:
+            rows = conn.execute(query.where(*_pending_filter(after_id)).limit(batch_size)).all()
+        if not rows:
+            return
+        yield [tuple(row) for row in rows]
+        after_id = rows[-1][0]
+
+
+# ======================================================
+# 🧠 CALCUL (processus du pool) / 📤 ÉCRITURE
+# ======================================================
+def summarize_rows(contenus: list[str]) -> list[str]:
+    return generate_summaries(contenus)
+
+
+_UPDATE = (
+    update(Tache)
+    .where(
+        Tache.id == bindparam("b_id"),
+        Tache.contenu == bindparam("b_contenu"),
+        Tache.resume_ia.is_(None),
+    )
+    # updated_at inchangé : un résumé n'est pas une modification utilisateur
+    .values({Tache.resume_ia: bindparam("b_resume"), Tache.updated_at: Tache.updated_at})
+)
+
+
+def write_batch(engine: Engine, rows: list[tuple[int, str]], resumes: list[str]) -> int:
+    params = [
+        {"b_id": tache_id, "b_contenu": contenu, "b_resume": resume}
+        for (tache_id, contenu), resume in zip(rows, resumes)
+        if resume
+    ]
+    if not params:
+        return 0
+    with engine.begin() as conn:
+        result = conn.execute(_UPDATE, params)
+    # executemany : rowcount agrégé selon le pilote, -1 s'il est inconnu
+    return result.rowcount if result.rowcount >= 0 else len(params)
+
+
+# ======================================================
+# ▶ RATTRAPAGE
+# ======================================================
+def backfill(
+    engine: Engine,
+    batch_size: int = 500,
+    workers: int = 0,
+    checkpoint: str = DEFAULT_CHECKPOINT,
+    reset: bool = False,
+    limit: int | None = None,
+    max_rate: float | None = None,
+    report_every: float = 5.0,
+    log=print,
+) -> dict:
+    """
+    Remplit `resume_ia` par lots. `workers=0` : calcul dans le processus courant.
+    Retourne l'état final (last_id, scanned, written, elapsed, rate).
+    """
+    state = {"last_id": 0, "scanned": 0, "written": 0} if reset else load_checkpoint(checkpoint)
+    remaining = count_pending(engine, state["last_id"])
+    if limit is not None:
+        remaining = min(remaining, limit)
+    log(f"🧠 {remaining} tâche(s) à résumer (reprise après id={state['last_id']})")
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+    in_flight: deque[tuple[list, Future | list]] = deque()
+    max_in_flight = max(workers, 1) * 2      # la lecture ne devance pas le calcul
+
+    read = scanned = written = 0
+    started = last_report = time.perf_counter()
+
+    def flush_oldest():
+        nonlocal scanned, written, last_report
+        rows, pending = in_flight.popleft()
+        resumes = pending.result() if pool is not None else pending
+        count = write_batch(engine, rows, resumes)
+        scanned += len(rows)
+        written += count
+
+        # Lots écrits dans l'ordre des id : le point de reprise ne saute rien
+        state["last_id"] = rows[-1][0]
+        state["scanned"] += len(rows)
+        state["written"] += count
+        save_checkpoint(checkpoint, state)
+
+        elapsed = time.perf_counter() - started
+        if max_rate:
+            # Limitation de débit : on attend que la moyenne repasse sous max_rate
+            delay = scanned / max_rate - elapsed
+            if delay > 0:
+                time.sleep(delay)
+                elapsed += delay
+
+        now = time.perf_counter()
+        if now - last_report >= report_every:
+            last_report = now
+            log(f"   {scanned}/{remaining} lues, {written} écrites, {scanned / elapsed:.0f} tâches/s")
+
+    try:
+        for rows in stream_batches(engine, state["last_id"], batch_size):
+            if limit is not None:
+                rows = rows[: limit - read]
+                if not rows:
+                    break
+            read += len(rows)
+
+            contenus = [contenu for _, contenu in rows]
+            pending = pool.submit(summarize_rows, contenus) if pool is not None else summarize_rows(contenus)
+            in_flight.append((rows, pending))
+
+            while len(in_flight) >= max_in_flight:
+                flush_oldest()
+
+        while in_flight:
+            flush_oldest()
+    except KeyboardInterrupt:
+        log(f"⏸ Interrompu : reprise possible après id={state['last_id']}")
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+    result = {
+        **state,
+        "elapsed": round(elapsed, 2),
+        "rate": round(scanned / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+    log(f"✅ {scanned} lues, {written} écrites en {elapsed:.1f} s ({result['rate']} tâches/s)")
+    return result
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base cible (défaut : DATABASE_URL)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=max((os.cpu_count() or 1) - 1, 1),
+                        help="Processus de calcul (0 : dans le processus courant)")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--reset", action="store_true", help="Ignore le point de reprise existant")
+    parser.add_argument("--limit", type=int, help="Nombre maximum de tâches à traiter")
+    parser.add_argument("--max-rate", type=float, help="Tâches par seconde au plus")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        engine = create_engine(args.url)
+    else:
+        from app.db import engine
+
+    return backfill(
+        engine,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        checkpoint=args.checkpoint,
+        reset=args.reset,
+        limit=args.limit,
+        max_rate=args.max_rate,
+    )
+
+
+if __name__ == "__main__" and os.getenv("TESTING") != "1":
+    main()
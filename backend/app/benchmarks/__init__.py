@@ -0,0 +1,19 @@
+# app/benchmarks/__init__.py
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+
+def ensure_throwaway_database(engine: Engine, default_url: str, force: bool = False) -> None:
+    """
+    Les benchmarks suppriment puis recréent toutes les tables : refus sur une
+    base qui en contient déjà, sauf base jetable par défaut (/tmp) ou --i-know.
+    """
+    if force or engine.url.render_as_string(hide_password=False) == default_url:
+        return
+
+    tables = inspect(engine).get_table_names()
+    if tables:
+        raise SystemExit(
+            f"⛔ {engine.url.render_as_string(hide_password=True)} contient déjà {len(tables)} table(s), "
+            "que ce benchmark supprimerait. Utilisez une base vide, ou --i-know pour confirmer."
+        )
@@ -0,0 +1,112 @@
+# app/benchmarks/bench_likes.py
+"""
+Benchmark de concurrence des likes : aucune mise à jour perdue.
+
+    python -m app.benchmarks.bench_likes --users 200 --threads 16
+    python -m app.benchmarks.bench_likes --url postgresql://... --users 2000 --threads 64
+
+Chaque utilisateur like la même tâche `--repeat` fois, depuis un pool de threads :
+- legacy    : lecture ORM, +1 en Python, commit (ancien like_tache_service)
+- atomic    : like_tache_service (ligne TacheLike + UPDATE ... RETURNING)
+- coalesced : idem avec LIKES_COALESCE (total écrit par lots)
+Attendu : legacy = users × repeat (et perd des incréments), sinon = users.
+Toutes les tables sont supprimées puis recréées : hors base jetable par défaut
+(/tmp), la base doit être vide (sinon --i-know).
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, insert, select, func
+from sqlalchemy.orm import sessionmaker
+
+from app.benchmarks import ensure_throwaway_database
+from app.db import Base
+from app.models.utilisateur import Utilisateur
+from app.models.tache import Tache
+from app.models.commentaire import Commentaire  # noqa: F401 (mappers)
+from app.models.fichier import FichierTache  # noqa: F401 (mappers)
+from app.models.like import TacheLike
+from app.config import settings
+from app.services.taches import like_tache_service
+from app.services.counter_buffers import like_counter
+
+TACHE_ID = 1
+DEFAULT_URL = "sqlite:////tmp/bench_likes.db"
+
+
+def populate(engine, users: int):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Utilisateur), [
+            {"id": i, "nom": f"U{i}", "email": f"u{i}@example.com", "mot_de_passe": "x"}
+            for i in range(1, users + 1)
+        ])
+        conn.execute(insert(Tache), [{"id": TACHE_ID, "titre": "Populaire", "contenu": "x", "likes": 0, "status": "en_attente"}])
+
+
+def legacy_like(Session, user_id: int):
+    with Session() as db:
+        tache = db.get(Tache, TACHE_ID)
+        tache.likes = (tache.likes or 0) + 1
+        db.commit()
+
+
+def atomic_like(Session, user_id: int):
+    with Session() as db:
+        like_tache_service(TACHE_ID, db, SimpleNamespace(id=user_id))
+
+
+def run(engine, strategy: str, users: int, threads: int, repeat: int):
+    populate(engine, users)
+    Session = sessionmaker(bind=engine)
+    like = legacy_like if strategy == "legacy" else atomic_like
+
+    settings.LIKES_COALESCE = strategy == "coalesced"
+    if settings.LIKES_COALESCE:
+        like_counter.clear()
+        like_counter.start(Session)
+
+    jobs = [user_id for user_id in range(1, users + 1) for _ in range(repeat)]
+    errors = 0
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for future in [pool.submit(like, Session, user_id) for user_id in jobs]:
+            try:
+                future.result()
+            except Exception:
+                errors += 1
+    elapsed = time.perf_counter() - t0
+
+    if settings.LIKES_COALESCE:
+        like_counter.stop()
+
+    with Session() as db:
+        likes = db.execute(select(Tache.likes).where(Tache.id == TACHE_ID)).scalar()
+        rows = db.execute(select(func.count()).select_from(TacheLike)).scalar()
+
+    expected = len(jobs) if strategy == "legacy" else users
+    print(
+        f"{strategy:<12}{expected:>10}{likes:>10}{expected - likes:>8}{rows:>8}"
+        f"{errors:>8}{elapsed * 1000:>12.0f}{len(jobs) / elapsed:>12.0f}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=2)
+    parser.add_argument("--i-know", action="store_true", help="Autorise la suppression des tables d'une base non vide")
+    args = parser.parse_args()
+
+    connect_args = {"timeout": 30, "check_same_thread": False} if args.url.startswith("sqlite") else {}
+    engine = create_engine(args.url, connect_args=connect_args, pool_size=args.threads, max_overflow=0)
+    ensure_throwaway_database(engine, DEFAULT_URL, force=args.i_know)
+
+    print(f"{'stratégie':<12}{'attendu':>10}{'likes':>10}{'perdus':>8}{'lignes':>8}{'erreurs':>8}{'ms':>12}{'likes/s':>12}")
+    for strategy in ("legacy", "atomic", "coalesced"):
+        run(engine, strategy, args.users, args.threads, args.repeat)
@@ -0,0 +1,114 @@
+# app/benchmarks/bench_search.py
+"""
+Benchmark recherche des tâches : ILIKE '%terme%' vs plein texte (FTS5 / tsvector).
+
+    python -m app.benchmarks.bench_search --rows 1000000
+    python -m app.benchmarks.bench_search --url postgresql://... --rows 1000000
+
+Par défaut : base SQLite jetable dans /tmp. Toutes les tables sont supprimées
+puis recréées : une autre base doit être vide (sinon --i-know). Les lignes sont
+insérées par lots (executemany) puis chaque requête (COUNT + première page de
+20) est mesurée.
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.benchmarks import ensure_throwaway_database
+from app.db import Base
+from app.models.utilisateur import Utilisateur
+from app.models.tache import Tache
+from app.models.commentaire import Commentaire  # noqa: F401 (mappers)
+from app.models.fichier import FichierTache  # noqa: F401 (mappers)
+from app.config import settings
+from app.services.search import apply_search
+
+WORDS = (
+    "installation fibre optique client réseau câblage routeur panne urgence "
+    "maintenance serveur sauvegarde migration base données sécurité pare-feu "
+    "imprimante poste travail licence logiciel mise jour rapport intervention "
+    "technicien équipe support bureau chantier inspection électrique compteur"
+).split()
+
+DEFAULT_URL = "sqlite:////tmp/bench_search.db"
+TERMS = ["fibre", "routeur panne", "inspection électrique", "sauvegarde serveur", "zzzintrouvable"]
+
+
+def _sentence(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def populate(engine, rows: int, batch: int = 10_000):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(42)
+    now = datetime.utcnow()
+
+    with engine.begin() as conn:
+        conn.execute(insert(Utilisateur), [{"id": 1, "nom": "Bench", "email": "bench@example.com", "mot_de_passe": "x"}])
+
+    for start in range(0, rows, batch):
+        data = [
+            {
+                "titre": _sentence(rng, 4),
+                "contenu": _sentence(rng, 60),
+                "equipe": "Dev",
+                "auteur_id": 1,
+                "status": "en_attente",
+                "created_at": now - timedelta(minutes=i),
+            }
+            for i in range(start, min(start + batch, rows))
+        ]
+        with engine.begin() as conn:
+            conn.execute(insert(Tache), data)
+        print(f"  {min(start + batch, rows):>9} / {rows} tâches", end="\r")
+    print()
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def run(engine, repeat: int):
+    Session = sessionmaker(bind=engine)
+    print(f"{'terme':<24}{'backend':<12}{'total':>10}{'count ms':>12}{'page ms':>12}{'rank ms':>12}")
+
+    for term in TERMS:
+        for backend in ("ilike", "auto"):
+            settings.SEARCH_BACKEND = backend
+            with Session() as db:
+                query, relevance = apply_search(db.query(Tache), term)
+                total = query.count()
+                count_ms = _time(query.count, repeat)
+                page_ms = _time(lambda: query.order_by(Tache.created_at.desc()).limit(20).all(), repeat)
+                rank_ms = _time(lambda: query.order_by(*relevance).limit(20).all(), repeat) if relevance else None
+            label = "ilike" if backend == "ilike" else engine.dialect.name
+            rank = f"{rank_ms:>12.1f}" if rank_ms is not None else f"{'-':>12}"
+            print(f"{term:<24}{label:<12}{total:>10}{count_ms:>12.1f}{page_ms:>12.1f}{rank}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-populate", action="store_true")
+    parser.add_argument("--i-know", action="store_true", help="Autorise la suppression des tables d'une base non vide")
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    if not args.skip_populate:
+        ensure_throwaway_database(engine, DEFAULT_URL, force=args.i_know)
+        print(f"📦 Génération de {args.rows} tâches…")
+        populate(engine, args.rows)
+    run(engine, args.repeat)
@@ -0,0 +1,66 @@
+# app/benchmarks/bench_summarizer.py
+"""
+Benchmark du résumé extractif : coût par tâche, à l'unité et par lots.
+
+    python -m app.benchmarks.bench_summarizer
+    python -m app.benchmarks.bench_summarizer --sizes 1000,10000,100000 --sentences 8
+
+Textes synthétiques FR/EN (`--sentences` phrases par tâche). Attendu : ~1 ms
+par tâche à l'unité, moins par lot, et un temps par tâche constant quand la
+taille du lot augmente (coût linéaire).
+"""
+import argparse
+import random
+import time
+
+from app.services.summarizer import summarize, summarize_batch
+
+WORDS_FR = (
+    "imprimante serveur réseau panne poste utilisateur accès messagerie sauvegarde "
+    "licence logiciel mise jour écran câble bureau équipe comptabilité facture "
+    "redémarrage erreur connexion mot passe compte dossier partage"
+).split()
+WORDS_EN = (
+    "printer server network outage laptop user access mailbox backup license "
+    "software update screen cable office team invoice restart error login "
+    "password account folder share gateway"
+).split()
+
+
+def make_texts(n: int, sentences: int, seed: int = 42) -> list[str]:
+    rng = random.Random(seed)
+    texts = []
+    for i in range(n):
+        words = WORDS_FR if i % 2 == 0 else WORDS_EN
+        texts.append(" ".join(
+            " ".join(rng.choice(words) for _ in range(rng.randint(6, 16))).capitalize() + "."
+            for _ in range(sentences)
+        ))
+    return texts
+
+
+def run(sizes: list[int], sentences: int):
+    texts = make_texts(max(sizes), sentences)
+
+    single = texts[:1000]
+    t0 = time.perf_counter()
+    for text in single:
+        summarize(text)
+    per_task = (time.perf_counter() - t0) * 1000 / len(single)
+    print(f"{'unitaire':<12}{len(single):>10}{per_task:>14.3f}")
+
+    for size in sizes:
+        t0 = time.perf_counter()
+        summarize_batch(texts[:size])
+        elapsed = time.perf_counter() - t0
+        print(f"{'lot':<12}{size:>10}{elapsed * 1000 / size:>14.3f}{size / elapsed:>14.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,10000")
+    parser.add_argument("--sentences", type=int, default=6)
+    args = parser.parse_args()
+
+    print(f"{'mode':<12}{'tâches':>10}{'ms/tâche':>14}{'tâches/s':>14}")
+    run([int(s) for s in args.sizes.split(",")], args.sentences)
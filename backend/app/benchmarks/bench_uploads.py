@@ -0,0 +1,85 @@
+# app/benchmarks/bench_uploads.py
+"""
+Benchmark écriture des pièces jointes : mémoire de pointe et débit.
+
+    python -m app.benchmarks.bench_uploads
+    python -m app.benchmarks.bench_uploads --files 8 --size-mb 20
+
+Chaque stratégie copie les mêmes fichiers (fichiers temporaires, comme ceux
+que produit le parseur multipart) vers un dossier jetable :
+- legacy   : `await f.read()` puis écriture (ancien update_tache_service)
+- streamed : store_uploads_async (blocs de UPLOAD_CHUNK_BYTES, en parallèle)
+La mémoire de pointe est mesurée avec tracemalloc (allocations Python).
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from fastapi import UploadFile
+
+from app.config import settings
+from app.services import uploads
+
+
+def make_sources(directory: str, files: int, size: int) -> list[str]:
+    paths = []
+    block = os.urandom(1024 * 1024)
+    for i in range(files):
+        path = os.path.join(directory, f"source_{i}.bin")
+        with open(path, "wb") as f:
+            for _ in range(size // len(block)):
+                f.write(block)
+        paths.append(path)
+    return paths
+
+
+def open_uploads(paths: list[str]) -> list[UploadFile]:
+    return [UploadFile(filename=os.path.basename(p), file=open(p, "rb")) for p in paths]
+
+
+async def legacy(files: list[UploadFile], target: str):
+    for f in files:
+        with open(os.path.join(target, f.filename), "wb") as buffer:
+            buffer.write(await f.read())
+
+
+async def streamed(files: list[UploadFile], target: str):
+    await uploads.store_uploads_async(files)
+
+
+def run(name: str, strategy, paths: list[str], target: str):
+    shutil.rmtree(target, ignore_errors=True)
+    os.makedirs(target)
+    uploads.UPLOAD_DIR = target
+    files = open_uploads(paths)
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    asyncio.run(strategy(files, target))
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    for f in files:
+        f.file.close()
+    total = sum(os.path.getsize(p) for p in paths)
+    print(f"{name:<10}{peak / 2**20:>14.1f}{elapsed * 1000:>10.0f}{total / 2**20 / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=4)
+    parser.add_argument("--size-mb", type=int, default=20)
+    args = parser.parse_args()
+
+    settings.UPLOAD_MAX_FILE_BYTES = settings.UPLOAD_MAX_REQUEST_BYTES = 2**40
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_sources(tmp, args.files, args.size_mb * 1024 * 1024)
+        print(f"{args.files} fichiers × {args.size_mb} Mo, blocs de {settings.UPLOAD_CHUNK_BYTES // 1024} Ko")
+        print(f"{'stratégie':<10}{'pic (Mo)':>14}{'ms':>10}{'Mo/s':>10}")
+        run("legacy", legacy, paths, os.path.join(tmp, "legacy"))
+        run("streamed", streamed, paths, os.path.join(tmp, "streamed"))
@@ -1,7 +1,7 @@
 # app/config.py
 from pydantic_settings import BaseSettings
 from pydantic import Field, Json
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -14,6 +14,78 @@ class Settings(BaseSettings):
     # --- Auth & Security ---
     JWT_SECRET: str = Field(...)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # Tokens signés avec id/type/equipe/is_active (authentification sans DB)
+    ACCESS_TOKEN_CLAIMS: bool = False
+    TOKEN_VERSION_TTL_SECONDS: int = 30
+
+    # --- Cache des utilisateurs authentifiés ---
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 1024
+
+    # --- Hachage des mots de passe (bcrypt) ---
+    HASHING_MAX_WORKERS: int = 2
+    HASHING_MAX_PENDING: int = 32
+    # Imports en masse : 0 = un thread par cœur CPU
+    HASHING_BULK_WORKERS: int = 0
+
+    # --- Import en masse d'utilisateurs ---
+    USER_IMPORT_BATCH_SIZE: int = 200
+    USER_IMPORT_MAX_ROWS: int = 5000
+
+    # --- Comptage des listes paginées (mode "cached") ---
+    COUNT_CACHE_TTL_SECONDS: int = 30
+    COUNT_CACHE_MAX_SIZE: int = 512
+
+    # --- Cache des réponses de GET /taches (invalidé par les écritures) ---
+    TACHES_LIST_CACHE_MAX_ENTRIES: int = 256
+    TACHES_LIST_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    TACHES_LIST_CACHE_TTL_SECONDS: int = 30
+
+    # --- Compteur de vues write-behind (écrit par lots) ---
+    VIEW_COUNTER_FLUSH_SECONDS: float = 5.0
+    VIEW_COUNTER_MAX_PENDING: int = 5000
+    VIEW_COUNTER_BATCH_SIZE: int = 500
+
+    # --- Likes : total incrémenté par lots (rafales) plutôt qu'à chaque like ---
+    LIKES_COALESCE: bool = False
+    LIKES_COALESCE_FLUSH_SECONDS: float = 1.0
+
+    # --- Commentaires : N plus récents dans le détail, pages keyset ensuite ---
+    DETAIL_COMMENTS_LIMIT: int = 20
+    COMMENTS_PAGE_SIZE: int = 50
+
+    # --- Pièces jointes : écriture en flux, limites vérifiées pendant la copie ---
+    UPLOAD_CHUNK_BYTES: int = 1024 * 1024
+    UPLOAD_MAX_FILE_BYTES: int = 25 * 1024 * 1024
+    UPLOAD_MAX_REQUEST_BYTES: int = 100 * 1024 * 1024
+    UPLOAD_MAX_WORKERS: int = 4
+    # Blob sans référence mais touché depuis moins longtemps : laissé au ramasse-miettes
+    UPLOAD_BLOB_GRACE_SECONDS: int = 3600
+
+    # --- Upload reprenable : blocs PUT successifs, session abandonnée supprimée ---
+    RESUMABLE_MAX_FILE_BYTES: int = 1024 * 1024 * 1024
+    RESUMABLE_CHUNK_BYTES: int = 4 * 1024 * 1024
+    RESUMABLE_SESSION_TTL_SECONDS: int = 24 * 3600
+    RESUMABLE_MAX_SESSIONS_PER_USER: int = 10
+    RESUMABLE_GC_INTERVAL_SECONDS: int = 600
+
+    # --- Téléchargement des pièces jointes (GET /taches/fichiers/{id}) ---
+    # Préfixe d'un emplacement interne du proxy (ex. "/_uploads/" déclaré
+    # `internal` dans nginx) : l'envoi du fichier lui est délégué
+    FILES_ACCEL_REDIRECT_PREFIX: Optional[str] = None
+    FILES_ACCEL_HEADER: str = "X-Accel-Redirect"   # X-Sendfile pour Apache / lighttpd
+    FILES_CACHE_MAX_AGE: int = 365 * 24 * 3600
+    # Export ZIP en flux (tâche ou équipe sur une période)
+    EXPORT_MAX_FILES: int = 5000
+    # Montage /uploads historique, sans contrôle d'accès ; False une fois le front migré
+    UPLOADS_STATIC_MOUNT: bool = True
+
+    # --- Résumés IA calculés en arrière-plan (hors chemin de lecture) ---
+    SUMMARY_MAX_WORKERS: int = 2
+    SUMMARY_MAX_PENDING: int = 256
+
+    # --- Recherche des tâches : auto (tsvector / FTS5 selon la base) ou ilike ---
+    SEARCH_BACKEND: str = "auto"
 
     # --- CORS ---
     CORS_ORIGINS: Json[List[str]] = ["http://localhost:4200", "http://127.0.0.1:4200"]
@@ -5,13 +5,14 @@ import random
 
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import text
-from passlib.context import CryptContext
 
 from app.db import engine, Base
 from app.models.utilisateur import Utilisateur
 from app.models.tache import Tache
 from app.models.commentaire import Commentaire
 from app.models.fichier import FichierTache
+from app.models.like import TacheLike
+from app.services.hashing import hash_password
 
 # ======================================================
 # ⚙ CONFIG
@@ -19,18 +20,12 @@ from app.models.fichier import FichierTache
 
 ENV = os.getenv("ENV", "dev")  # dev | demo | prod
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-
 # ======================================================
 # 🔄 RESET SCHEMA (DEV / DEMO UNIQUEMENT)
 # ======================================================
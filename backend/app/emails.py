@@ -3,6 +3,7 @@
 # Empêche tout envoi SMTP réel pendant les tests.
 # =====================================================
 
+import asyncio
 import os
 from datetime import datetime
 from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
@@ -111,3 +112,28 @@ async def send_reset_password_email(to_email: str, user_name: str, token: str):
         subtype="html"
     )
     await _safe_send_email(message, "reset_password.html")
+
+
+# -------------------------------------------------------
+# 📨 Emails d’inscription + activation en lot (import)
+# -------------------------------------------------------
+BULK_EMAIL_CONCURRENCY = 5
+
+
+async def send_bulk_registration_emails(recipients: list[dict]):
+    """
+    Envoie bienvenue + activation pour chaque utilisateur importé.
+    recipients : [{"email", "nom", "password", "token"}, ...]
+    Concurrence bornée pour ne pas saturer le serveur SMTP.
+    """
+    semaphore = asyncio.Semaphore(BULK_EMAIL_CONCURRENCY)
+
+    async def _send(r: dict):
+        async with semaphore:
+            try:
+                await send_registration_email(r["email"], r["nom"], r["password"])
+                await send_activation_email(r["email"], r["nom"], r["token"])
+            except Exception as e:
+                print(f"⚠️ Email error ({r['email']}): {e}")
+
+    await asyncio.gather(*(_send(r) for r in recipients))
@@ -0,0 +1,284 @@
+"""
+Ramasse-miettes des pièces jointes : fichiers du dossier uploads/ qu'aucune
+ligne de `fichiers_taches` ne référence.
+
+    python -m app.gc_uploads --dry-run              # rapport seulement
+    python -m app.gc_uploads                        # suppression
+    python -m app.gc_uploads --quarantine           # déplacement dans uploads/.quarantine/<date>/
+    python -m app.gc_uploads --max-rate 500 --min-age-hours 6
+    python -m app.gc_uploads --purge-quarantine-days 30
+
+- parcours en flux (os.scandir) : jamais la liste complète des fichiers en
+  mémoire ; une requête IN par lot et par type de fichier
+    - blob (uploads/blobs/ab/cd/<sha256>) : référencé si une ligne porte
+      cette empreinte ; compteur `fichiers_blobs` resté sans référence
+      supprimé dans la même transaction
+    - fichier non migré (uploads/<nom>) : référencé si une ligne a ce chemin
+- fichiers plus récents que --min-age-hours ignorés : un upload écrit son
+  blob avant de valider la ligne (un contenu réutilisé est rajeuni) ; l'âge
+  est revérifié juste avant la suppression
+- ignorés : avatars, sessions d'upload reprenable (expiration propre), quarantaine
+- `--max-rate` limite le nombre de fichiers examinés par seconde
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import shutil
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import Engine, create_engine, delete, exists, select
+from sqlalchemy.orm import Session
+
+from app.models.tache import Tache  # noqa: F401 (mappers)
+from app.models.utilisateur import Utilisateur  # noqa: F401 (mappers)
+from app.models.commentaire import Commentaire  # noqa: F401 (mappers)
+from app.models.fichier import FichierBlob, FichierTache
+from app.services import uploads
+from app.services.resumable_uploads import SESSION_DIR
+
+QUARANTINE_DIR = ".quarantine"
+SKIPPED_DIRS = {"avatars", SESSION_DIR, QUARANTINE_DIR}
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+# ======================================================
+# 📂 PARCOURS EN FLUX
+# ======================================================
+def walk_store(root: str):
+    """(chemin, stat) de chaque fichier, répertoire par répertoire."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if not (directory == root and entry.name in SKIPPED_DIRS):
+                        stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry.path, entry.stat(follow_symlinks=False)
+
+
+def batched(iterable, size: int):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _path_variants(path: str) -> set[str]:
+    # Chemins enregistrés avec le séparateur du système qui a reçu le fichier
+    return {path, path.replace("\\", "/"), path.replace("/", "\\")}
+
+
+def _blob_hash(path: str, root: str) -> str | None:
+    name = os.path.basename(path)
+    if _SHA256_RE.match(name) and path == os.path.join(root, uploads.BLOB_DIR, name[:2], name[2:4], name):
+        return name
+    return None
+
+
+# ======================================================
+# 🔍 CLASSEMENT D'UN LOT
+# ======================================================
+def find_orphans(session: Session, paths: list[str], root: str) -> tuple[list[str], list[str]]:
+    """(chemins orphelins, empreintes des blobs orphelins) parmi `paths`."""
+    blobs = {path: h for path in paths if (h := _blob_hash(path, root))}
+    others = [path for path in paths if path not in blobs]
+
+    referenced_hashes = set()
+    if blobs:
+        referenced_hashes = set(session.scalars(
+            select(FichierTache.sha256).where(FichierTache.sha256.in_(set(blobs.values()))).distinct()
+        ))
+    referenced_paths = set()
+    if others:
+        candidates = set().union(*(_path_variants(p) for p in others))
+        referenced_paths = set(session.scalars(
+            select(FichierTache.chemin).where(FichierTache.chemin.in_(candidates)).distinct()
+        ))
+
+    orphans = [p for p, h in blobs.items() if h not in referenced_hashes]
+    orphans += [p for p in others if not (_path_variants(p) & referenced_paths)]
+    return orphans, [blobs[p] for p in orphans if p in blobs]
+
+
+def drop_stale_refcounts(session: Session, hashes: list[str]) -> int:
+    """Compteurs sans aucune ligne FichierTache (suppression SQL en cascade, arrêt brutal...)."""
+    if not hashes:
+        return 0
+    result = session.execute(
+        delete(FichierBlob)
+        .where(
+            FichierBlob.sha256.in_(hashes),
+            ~exists().where(FichierTache.sha256 == FichierBlob.sha256),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+# ======================================================
+# 🗑 SUPPRESSION / QUARANTAINE
+# ======================================================
+def _quarantine(path: str, root: str, run_dir: str) -> None:
+    dest = os.path.join(run_dir, os.path.relpath(path, root))
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    os.replace(path, dest)
+
+
+def _prune_empty_dirs(path: str, root: str) -> None:
+    """Répertoires de répartition vidés ; uploads/ et uploads/blobs/ sont gardés."""
+    keep = {os.path.normpath(root), os.path.normpath(os.path.join(root, uploads.BLOB_DIR))}
+    directory = os.path.dirname(path)
+    while os.path.normpath(directory) not in keep:
+        try:
+            os.rmdir(directory)
+        except OSError:
+            return
+        directory = os.path.dirname(directory)
+
+
+def purge_quarantine(root: str, older_than_days: float, log=print) -> int:
+    base = os.path.join(root, QUARANTINE_DIR)
+    if not os.path.isdir(base):
+        return 0
+    limit = time.time() - older_than_days * 86400
+    purged = 0
+    for entry in os.scandir(base):
+        if entry.is_dir() and entry.stat().st_mtime < limit:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            purged += 1
+    log(f"🗑 {purged} quarantaine(s) de plus de {older_than_days:g} jour(s) supprimée(s)")
+    return purged
+
+
+# ======================================================
+# ▶ PASSAGE
+# ======================================================
+def collect(
+    engine: Engine,
+    root: str | None = None,
+    batch_size: int = 500,
+    dry_run: bool = False,
+    quarantine: bool = False,
+    min_age_hours: float = 1.0,
+    max_rate: float | None = None,
+    report_every: float = 5.0,
+    log=print,
+) -> dict:
+    """Examine le dossier des uploads ; retourne les compteurs du passage."""
+    root = root or uploads.UPLOAD_DIR
+    run_dir = os.path.join(root, QUARANTINE_DIR, datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S"))
+    min_mtime = time.time() - min_age_hours * 3600
+
+    stats = {"scanned": 0, "recent": 0, "orphans": 0, "bytes": 0,
+             "removed": 0, "quarantined": 0, "stale_refcounts": 0}
+    started = last_report = time.perf_counter()
+
+    for batch in batched(walk_store(root), batch_size):
+        stats["scanned"] += len(batch)
+        sizes = {}
+        for path, st in batch:
+            if st.st_mtime > min_mtime:
+                stats["recent"] += 1
+            else:
+                sizes[path] = st.st_size
+
+        with Session(engine) as session:
+            orphans, orphan_hashes = find_orphans(session, list(sizes), root)
+            stats["orphans"] += len(orphans)
+            stats["bytes"] += sum(sizes[p] for p in orphans)
+
+            if dry_run:
+                for path in orphans:
+                    log(f"   orphelin : {path} ({sizes[path]} o)")
+            else:
+                stats["stale_refcounts"] += drop_stale_refcounts(session, orphan_hashes)
+                session.commit()
+
+        if not dry_run:
+            for path in orphans:
+                try:
+                    # Rajeuni depuis le parcours : contenu réutilisé par un upload
+                    # dont la ligne vient (ou va) d'être validée
+                    if os.stat(path).st_mtime > min_mtime:
+                        stats["recent"] += 1
+                        stats["orphans"] -= 1
+                        stats["bytes"] -= sizes[path]
+                        continue
+                    if quarantine:
+                        _quarantine(path, root, run_dir)
+                        stats["quarantined"] += 1
+                    else:
+                        os.remove(path)
+                        stats["removed"] += 1
+                except FileNotFoundError:
+                    continue
+                _prune_empty_dirs(path, root)
+
+        elapsed = time.perf_counter() - started
+        if max_rate:
+            # Limitation de débit : on attend que la moyenne repasse sous max_rate
+            delay = stats["scanned"] / max_rate - elapsed
+            if delay > 0:
+                time.sleep(delay)
+
+        now = time.perf_counter()
+        if now - last_report >= report_every:
+            last_report = now
+            log(f"   {stats['scanned']} examinés, {stats['orphans']} orphelins")
+
+    mode = " (simulation)" if dry_run else ""
+    log(
+        f"✅ {stats['scanned']} fichiers examinés, {stats['orphans']} orphelins{mode} "
+        f"({stats['bytes'] // 1024} Kio), {stats['recent']} trop récents"
+    )
+    return stats
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base cible (défaut : DATABASE_URL)")
+    parser.add_argument("--root", help="Dossier des uploads (défaut : uploads)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="Liste les orphelins sans rien modifier")
+    parser.add_argument("--quarantine", action="store_true", help="Déplace au lieu de supprimer")
+    parser.add_argument("--min-age-hours", type=float, default=1.0)
+    parser.add_argument("--max-rate", type=float, help="Fichiers examinés par seconde au plus")
+    parser.add_argument("--purge-quarantine-days", type=float,
+                        help="Supprime d'abord les quarantaines plus anciennes que N jours")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        engine = create_engine(args.url)
+    else:
+        from app.db import engine
+
+    root = args.root or uploads.UPLOAD_DIR
+    if args.purge_quarantine_days is not None and not args.dry_run:
+        purge_quarantine(root, args.purge_quarantine_days)
+
+    return collect(
+        engine,
+        root=root,
+        batch_size=args.batch_size,
+        dry_run=args.dry_run,
+        quarantine=args.quarantine,
+        min_age_hours=args.min_age_hours,
+        max_rate=args.max_rate,
+    )
+
+
+if __name__ == "__main__" and os.getenv("TESTING") != "1":
+    main()
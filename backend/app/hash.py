@@ -1,8 +1,3 @@
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+from app.services.hashing import hash_password
 
 print(hash_password("Test1212"))
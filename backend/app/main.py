@@ -3,8 +3,16 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
-from app.db import engine
+from app.db import engine, SessionLocal
+from app.services.search import ensure_search_schema
+from app.services.token_versions import ensure_token_version_schema
+from app.services.pagination import ensure_keyset_indexes
+from app.services.taches import ensure_likes_schema
 from app.config import settings
+from app.services.hashing import hashing_service
+from app.services.counter_buffers import view_counter, like_counter
+from app.services.summaries import summary_queue
+from app.services import uploads
 
 # ✅ Seed sécurisé (demo uniquement)
 from app.db_create import seed
@@ -20,6 +28,7 @@ from app.routers import (
     login,
     router_password_change,
     techniciens,
+    metrics,
 )
 
 # ======================================================
@@ -49,6 +58,25 @@ def startup_event():
         return
 
     print(f"🚀 Application boot — ENV={ENV}")
+    ensure_token_version_schema(engine)
+    ensure_search_schema(engine)
+    ensure_keyset_indexes(engine)
+    ensure_likes_schema(engine)
+    uploads.ensure_blob_schema(engine)
+    view_counter.start(SessionLocal)
+    if settings.LIKES_COALESCE:
+        like_counter.start(SessionLocal)
+    summary_queue.start(SessionLocal)
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    # Écrit les compteurs encore en mémoire avant l'arrêt
+    view_counter.stop()
+    like_counter.stop()
+    summary_queue.shutdown()
+    uploads.shutdown()
+    hashing_service.shutdown()
 
 
 # ======================================================
@@ -65,12 +93,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lisibles par le front (revalidation, pagination des commentaires)
+    expose_headers=["ETag", "X-Total-Count", "X-Next-Cursor", "X-Prev-Cursor", "Content-Disposition", "Upload-Offset"],
 )
 
 # ======================================================
 # 📦 STATIC FILES
 # ======================================================
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Historique, sans contrôle d'accès : préférer GET /taches/fichiers/{id}
+if settings.UPLOADS_STATIC_MOUNT:
+    app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
 
 # ======================================================
@@ -104,6 +136,7 @@ app.include_router(utilisateurs.router, prefix="/utilisateurs", tags=["Utilisate
 app.include_router(taches.router, prefix="/taches", tags=["Tâches"])
 app.include_router(commentaires.router, prefix="/commentaires", tags=["Commentaires"])
 app.include_router(techniciens.router, prefix="/techniciens", tags=["Techniciens"])
+app.include_router(metrics.router, prefix="/metrics", tags=["Métriques"])
 
 
 # ======================================================
@@ -0,0 +1,199 @@
+"""
+Migration des pièces jointes existantes (uploads/<nom>) vers le magasin
+adressé par contenu (uploads/blobs/ab/cd/<sha256>).
+
+    python -m app.migrate_uploads --dry-run       # rapport seulement
+    python -m app.migrate_uploads
+    python -m app.migrate_uploads --keep-originals
+
+- ajoute au besoin la table `fichiers_blobs` et les colonnes sha256/taille
+- lignes `sha256 IS NULL` lues par pages (id croissant) : chaque fichier est
+  haché en flux puis copié sous son empreinte (un contenu déjà présent
+  n'est pas recopié)
+- une transaction par lot : lignes mises à jour (conditionnées à leur
+  ancien chemin) et compteurs de références incrémentés ensemble
+- les originaux qui ne sont plus référencés sont effacés après le commit
+- idempotent : relancé, le script ne reprend que les lignes non migrées ;
+  une ligne dont le fichier a disparu est signalée et laissée telle quelle
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import shutil
+import tempfile
+
+from sqlalchemy import Engine, create_engine, func, inspect, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.tache import Tache  # noqa: F401 (mappers)
+from app.models.utilisateur import Utilisateur  # noqa: F401 (mappers)
+from app.models.commentaire import Commentaire  # noqa: F401 (mappers)
+from app.models.fichier import FichierTache
+from app.services import uploads
+from app.services.uploads import StoredUpload, acquire_blobs, ensure_blob_schema
+
+
+# ======================================================
+# 🔐 HACHAGE / COPIE
+# ======================================================
+def hash_file(path: str) -> tuple[str, int]:
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(settings.UPLOAD_CHUNK_BYTES):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def copy_to_blob(path: str, sha256: str) -> tuple[str, bool]:
+    """Copie `path` sous son empreinte ; (chemin du blob, créé)."""
+    dest = uploads.blob_path(sha256)
+    if os.path.exists(dest):
+        return dest, False
+    tmp_dir = os.path.join(uploads.UPLOAD_DIR, uploads.BLOB_DIR)
+    os.makedirs(tmp_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, prefix=".migrate-", suffix=".part")
+    try:
+        with open(path, "rb") as src, os.fdopen(fd, "wb") as out:
+            shutil.copyfileobj(src, out, settings.UPLOAD_CHUNK_BYTES)
+        dest, created, _ = uploads.place_blob(tmp_path, sha256)
+        return dest, created
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# ======================================================
+# 📥 LECTURE PAR PAGES
+# ======================================================
+def legacy_batches(engine: Engine, batch_size: int):
+    """Lots de (id, chemin) non migrés, par id croissant."""
+    after_id = 0
+    query = select(FichierTache.id, FichierTache.chemin).order_by(FichierTache.id).limit(batch_size)
+    columns = {c["name"] for c in inspect(engine).get_columns(FichierTache.__tablename__)}
+    if "sha256" in columns:
+        # Sinon (simulation sur une base jamais migrée) : toutes les lignes
+        query = query.where(FichierTache.sha256.is_(None))
+    while True:
+        with engine.connect() as conn:
+            rows = conn.execute(query.where(FichierTache.id > after_id)).all()
+        if not rows:
+            return
+        yield [tuple(row) for row in rows]
+        after_id = rows[-1][0]
+
+
+def _remove_original(session: Session, path: str) -> bool:
+    """Efface un original que plus aucune ligne ne référence."""
+    still_used = session.scalar(select(func.count(FichierTache.id)).where(FichierTache.chemin == path))
+    if still_used or not os.path.exists(path):
+        return False
+    os.remove(path)
+    return True
+
+
+# ======================================================
+# ▶ MIGRATION
+# ======================================================
+def migrate(
+    engine: Engine,
+    batch_size: int = 200,
+    dry_run: bool = False,
+    keep_originals: bool = False,
+    log=print,
+) -> dict:
+    """Migre les lignes `sha256 IS NULL` ; retourne les compteurs du passage."""
+    if not dry_run:
+        ensure_blob_schema(engine)
+
+    stats = {"scanned": 0, "migrated": 0, "missing": 0, "deduplicated": 0,
+             "bytes": 0, "bytes_saved": 0, "originals_removed": 0}
+    seen: dict[str, tuple[str, int]] = {}     # chemin -> empreinte (un original partagé n'est haché qu'une fois)
+    known_blobs: set[str] = set()
+
+    for rows in legacy_batches(engine, batch_size):
+        stats["scanned"] += len(rows)
+        stored: list[tuple[int, str, StoredUpload]] = []
+
+        for fichier_id, chemin in rows:
+            if chemin not in seen:
+                if not os.path.isfile(chemin):
+                    stats["missing"] += 1
+                    log(f"   ⚠ fichier absent : {chemin} (id={fichier_id})")
+                    continue
+                seen[chemin] = hash_file(chemin)
+            sha256, size = seen[chemin]
+
+            duplicate = sha256 in known_blobs or os.path.exists(uploads.blob_path(sha256))
+            stats["deduplicated"] += int(duplicate)
+            stats["bytes"] += size
+            stats["bytes_saved"] += size if duplicate else 0
+            known_blobs.add(sha256)
+
+            if dry_run:
+                continue
+            dest, _ = copy_to_blob(chemin, sha256)
+            stored.append((fichier_id, chemin, StoredUpload(
+                nom_fichier="", chemin=dest, taille=size, sha256=sha256,
+            )))
+
+        if dry_run or not stored:
+            continue
+
+        with Session(engine) as session:
+            migrated = []
+            for fichier_id, chemin, upload in stored:
+                result = session.execute(
+                    update(FichierTache)
+                    .where(
+                        FichierTache.id == fichier_id,
+                        FichierTache.chemin == chemin,
+                        FichierTache.sha256.is_(None),
+                    )
+                    .values(chemin=upload.chemin, sha256=upload.sha256, taille=upload.taille)
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount:
+                    migrated.append((chemin, upload))
+            # Une référence par ligne effectivement migrée
+            acquire_blobs(session, [upload for _, upload in migrated])
+            session.commit()
+
+            stats["migrated"] += len(migrated)
+            if not keep_originals:
+                for chemin in {chemin for chemin, _ in migrated}:
+                    stats["originals_removed"] += int(_remove_original(session, chemin))
+
+        log(f"   {stats['scanned']} lues, {stats['migrated']} migrées, {stats['deduplicated']} doublons")
+
+    mode = " (simulation)" if dry_run else ""
+    log(
+        f"✅ {stats['scanned']} lues, {stats['migrated']} migrées, {stats['missing']} absentes{mode} ; "
+        f"{stats['bytes_saved'] // 1024} Kio économisés sur {stats['bytes'] // 1024} Kio"
+    )
+    return stats
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base cible (défaut : DATABASE_URL)")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--dry-run", action="store_true", help="Hache et compte sans rien écrire")
+    parser.add_argument("--keep-originals", action="store_true", help="Ne supprime pas les anciens fichiers")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        engine = create_engine(args.url)
+    else:
+        from app.db import engine
+
+    return migrate(engine, batch_size=args.batch_size, dry_run=args.dry_run, keep_originals=args.keep_originals)
+
+
+if __name__ == "__main__" and os.getenv("TESTING") != "1":
+    main()
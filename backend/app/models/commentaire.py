@@ -2,7 +2,7 @@ from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Foreign
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db import Base
-from datetime import datetime
+from datetime import datetime, timezone
 
 
 
@@ -12,7 +12,10 @@ class Commentaire(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     contenu = Column(Text, nullable=False)
-    date = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    # Horodatage posé aussi côté Python : précision à la microseconde et format
+    # homogène avec les curseurs keyset (SQLite compare des chaînes)
+    date = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
+                  server_default=func.now(), index=True)
 
     auteur_id = Column(Integer, ForeignKey("utilisateurs.id", ondelete="CASCADE"), index=True)
     auteur = relationship("Utilisateur", back_populates="commentaires")
@@ -25,3 +28,4 @@ class Commentaire(Base):
 # 🔹 Index supplémentaires pour optimiser les requêtes fréquentes
 Index("idx_commentaire_auteur", Commentaire.auteur_id)
 Index("idx_commentaire_note", Commentaire.tache_id)
+Index("idx_commentaire_tache_date_id", Commentaire.tache_id, Commentaire.date, Commentaire.id)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index, JSON, UniqueConstraint
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, Boolean, ForeignKey, Index, JSON, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db import Base
@@ -12,11 +12,27 @@ class FichierTache(Base):
     id = Column(Integer, primary_key=True, index=True)
     nom_fichier = Column(String(255), nullable=False)
     chemin = Column(String(255), nullable=False)
+    # Contenu adressé par empreinte (app/services/uploads.py) ;
+    # NULL : fichier antérieur au magasin, à migrer (app/migrate_uploads.py)
+    sha256 = Column(String(64), nullable=True)
+    taille = Column(BigInteger, nullable=True)
 
     tache_id = Column(Integer, ForeignKey("taches.id", ondelete="CASCADE"))
     tache = relationship("Tache", back_populates="fichiers")
- 
+
+
+# ---------------- CONTENUS (DÉDOUBLONNÉS) ----------------
+class FichierBlob(Base):
+    __tablename__ = "fichiers_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    taille = Column(BigInteger, nullable=False)
+    # Nombre de FichierTache qui pointent vers ce contenu ; à 0 la ligne est
+    # supprimée et le fichier effacé
+    refcount = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
 # 🔹 Index supplémentaires pour optimiser les requêtes fréquentes
-Index("idx_fichier_tache", FichierTache.tache_id)
\ No newline at end of file
+Index("idx_fichier_tache", FichierTache.tache_id)
+Index("idx_fichier_sha256", FichierTache.sha256)
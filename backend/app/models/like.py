@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from app.db import Base
+
+
+# ---------------- LIKES PAR UTILISATEUR ----------------
+class TacheLike(Base):
+    """
+    Un like = une ligne (tache_id, utilisateur_id). Stockage compact : deux
+    entiers, la clé primaire composite sert d'index pour « a-t-il liké ? »
+    et garantit l'idempotence. Pas de rowid sous SQLite.
+    """
+    __tablename__ = "tache_likes"
+
+    tache_id = Column(Integer, ForeignKey("taches.id", ondelete="CASCADE"), primary_key=True)
+    utilisateur_id = Column(Integer, ForeignKey("utilisateurs.id", ondelete="CASCADE"), primary_key=True)
+
+    __table_args__ = {"sqlite_with_rowid": False}
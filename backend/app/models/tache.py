@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db import Base
@@ -41,3 +41,57 @@ class Tache(Base):
 Index("idx_tache_auteur", Tache.auteur_id)
 Index("idx_tache_assign_to", Tache.assign_to_id)
 Index("idx_tache_equipe", Tache.equipe)
+# Pagination keyset : ORDER BY created_at, id (lu dans les deux sens)
+Index("idx_tache_created_id", Tache.created_at, Tache.id)
+
+
+# ==========================================================
+# 🔎 RECHERCHE PLEIN TEXTE (voir app/services/search.py)
+# ==========================================================
+# PostgreSQL : colonne tsvector générée (stemming français, titre pondéré A,
+# contenu B) + index GIN. Hors modèle ORM : jamais lue ni écrite par l'ORM.
+SEARCH_DDL_POSTGRESQL = [
+    """
+    ALTER TABLE taches ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('french', coalesce(titre, '')), 'A') ||
+        setweight(to_tsvector('french', coalesce(contenu, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_tache_search ON taches USING GIN (search_vector)",
+]
+
+# SQLite : table FTS5 "external content" synchronisée par triggers
+SEARCH_DDL_SQLITE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS taches_fts USING fts5(
+        titre, contenu, content='taches', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS taches_fts_ai AFTER INSERT ON taches BEGIN
+        INSERT INTO taches_fts(rowid, titre, contenu) VALUES (new.id, new.titre, new.contenu);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS taches_fts_ad AFTER DELETE ON taches BEGIN
+        INSERT INTO taches_fts(taches_fts, rowid, titre, contenu) VALUES ('delete', old.id, old.titre, old.contenu);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS taches_fts_au AFTER UPDATE OF titre, contenu ON taches BEGIN
+        INSERT INTO taches_fts(taches_fts, rowid, titre, contenu) VALUES ('delete', old.id, old.titre, old.contenu);
+        INSERT INTO taches_fts(rowid, titre, contenu) VALUES (new.id, new.titre, new.contenu);
+    END
+    """,
+]
+
+for _stmt in SEARCH_DDL_POSTGRESQL:
+    event.listen(Tache.__table__, "after_create", DDL(_stmt).execute_if(dialect="postgresql"))
+for _stmt in SEARCH_DDL_SQLITE:
+    event.listen(Tache.__table__, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+event.listen(
+    Tache.__table__, "before_drop",
+    DDL("DROP TABLE IF EXISTS taches_fts").execute_if(dialect="sqlite"),
+)
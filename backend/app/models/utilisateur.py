@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    Column, Integer, String, DateTime, Boolean, Index, UniqueConstraint
+    Column, Integer, String, DateTime, Boolean, Index, UniqueConstraint, DDL, event
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -38,6 +38,10 @@ class Utilisateur(Base):
     is_active = Column(Boolean, default=False)
     avatar_url = Column(String(255), nullable=True)
 
+    # Incrémenté à chaque changement de rôle / mot de passe :
+    # révoque les tokens d'accès à claims déjà émis
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
+
     # Taches créées par l'utilisateur
     taches = relationship(
         "Tache",
@@ -67,3 +71,33 @@ class Utilisateur(Base):
         Index("idx_utilisateur_equipe", "equipe"),
     )
 
+
+# ==========================================================
+# 🔎 INDEX TRIGRAMMES (filtres ILIKE '%x%' sur nom / email)
+# ==========================================================
+# PostgreSQL uniquement : pg_trgm permet à un index GIN de servir ILIKE '%x%'.
+# Sans droit CREATE EXTENSION, on continue sans index (repli : parcours ILIKE).
+TRIGRAM_DDL_POSTGRESQL = [
+    """
+    DO $$
+    BEGIN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    EXCEPTION WHEN insufficient_privilege THEN
+        RAISE NOTICE 'pg_trgm indisponible : filtres ILIKE non indexés';
+    END
+    $$
+    """,
+    """
+    DO $$
+    BEGIN
+        IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+            CREATE INDEX IF NOT EXISTS idx_utilisateur_nom_trgm ON utilisateurs USING GIN (nom gin_trgm_ops);
+            CREATE INDEX IF NOT EXISTS idx_utilisateur_email_trgm ON utilisateurs USING GIN (email gin_trgm_ops);
+        END IF;
+    END
+    $$
+    """,
+]
+
+for _stmt in TRIGRAM_DDL_POSTGRESQL:
+    event.listen(Utilisateur.__table__, "after_create", DDL(_stmt).execute_if(dialect="postgresql"))
@@ -6,6 +6,7 @@ from app.models.utilisateur import Utilisateur
 from app.auth import verify_activation_token, create_activation_token
 from app.emails import send_activation_email
 from app.schemas.schemas import EmailRequest
+from app.services.principal_cache import invalidate_user
 
 router = APIRouter(prefix="/auth", tags=["Activation"])
 
@@ -50,6 +51,7 @@ def _activate_account_logic(token: str, db: Session):
         raise HTTPException(status_code=400, detail="Aucun champ d’activation trouvé sur le modèle utilisateur.")
 
     db.commit()
+    invalidate_user(user_id=user.id, email=user.email)
     return {"message": "Votre compte a été activé avec succès 🎉"}
 
 
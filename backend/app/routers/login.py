@@ -25,7 +25,7 @@ async def login(
 
     user = db.query(Utilisateur).filter(Utilisateur.email == username).first()
 
-    if not user or not app.auth.verify_password(password, user.mot_de_passe):
+    if not user or not await app.auth.verify_password_async(password, user.mot_de_passe):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou mot de passe incorrect",
@@ -39,7 +39,7 @@ async def login(
         detail="Votre compte n’est pas encore activé. Vérifiez vos emails."
     )
 
-    token = app.auth.create_access_token({"sub": str(user.id)})
+    token = app.auth.create_access_token(app.auth.build_access_claims(user))
 
     return {
         "access_token": token,
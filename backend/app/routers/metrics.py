@@ -0,0 +1,37 @@
+# app/routers/metrics.py
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.models.utilisateur import Utilisateur
+from app.auth import get_current_user
+from app.services.utilisateurs import _is_admin
+from app.services.principal_cache import principal_cache
+from app.services.hashing import hashing_service
+from app.services.token_versions import token_versions
+from app.services.counts import count_cache
+from app.services.list_cache import taches_list_cache
+from app.services.counter_buffers import view_counter, like_counter
+from app.services.summaries import summary_queue
+
+router = APIRouter()
+
+
+# ---------------- MÉTRIQUES INTERNES ----------------
+@router.get("/", response_model=dict)
+def get_metrics(current_user: Utilisateur = Depends(get_current_user)):
+    if not _is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Action réservée aux administrateurs.")
+
+    return {
+        "status": "success",
+        "data": {
+            "principal_cache": principal_cache.stats(),
+            "hashing": hashing_service.stats(),
+            "token_versions": token_versions.stats(),
+            "count_cache": count_cache.stats(),
+            "taches_list_cache": taches_list_cache.stats(),
+            "view_counter": view_counter.stats(),
+            "like_counter": like_counter.stats(),
+            "summaries": summary_queue.stats(),
+        },
+    }
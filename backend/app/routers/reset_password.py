@@ -5,6 +5,8 @@ from app.db import get_db
 from app.models.utilisateur import Utilisateur
 from app.auth import create_reset_token, verify_reset_token, hash_password
 from app.emails import send_reset_password_email
+from app.services.principal_cache import invalidate_user
+from app.services.token_versions import bump_token_version
 from datetime import datetime
 
 router = APIRouter(prefix="/auth", tags=["Password Reset"])
@@ -50,6 +52,8 @@ def reset_password(data: ResetPasswordRequest, db: Session = Depends(get_db)):
 
     user.mot_de_passe = hash_password(data.new_password)
     user.is_active = True  # ✅ activation automatique après reset
+    bump_token_version(user)
     db.commit()
+    invalidate_user(user_id=user.id, email=user.email)
 
     return {"message": "🔐 Mot de passe réinitialisé avec succès ✅"}
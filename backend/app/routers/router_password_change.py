@@ -6,6 +6,8 @@ from pydantic import BaseModel, Field
 from app.db import get_db
 from app.models.utilisateur import Utilisateur
 from app.auth import verify_password, hash_password, get_current_user as auth_dep
+from app.services.principal_cache import invalidate_user
+from app.services.token_versions import bump_token_version
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -32,7 +34,9 @@ def change_own_password(
         raise HTTPException(status_code=400, detail="Le nouveau mot de passe doit être différent")
 
     user.mot_de_passe = hash_password(data.new_password)
+    bump_token_version(user)
     db.commit()
+    invalidate_user(user_id=user.id, email=user.email)
 
     return {"message": "Mot de passe modifié avec succès ✅"}
 
@@ -56,6 +60,8 @@ def admin_change_user_password(
         raise HTTPException(status_code=404, detail="Utilisateur introuvable")
 
     user.mot_de_passe = hash_password(data.new_password)
+    bump_token_version(user)
     db.commit()
+    invalidate_user(user_id=user.id, email=user.email)
 
     return {"message": "Mot de passe modifié par admin ✅"}
@@ -1,17 +1,33 @@
 # app/api/v1/taches.py
-from fastapi import APIRouter, Depends, Form, File, UploadFile, Query, Request, HTTPException
+import json
+from fastapi import APIRouter, Depends, Form, File, UploadFile, Query, Request, HTTPException, Response, Header
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Optional
+from datetime import date
 from sqlalchemy.orm import Session
 from app.db import get_db
+from app.config import settings
 from app.models.utilisateur import Utilisateur
 from app.schemas.schemas import (
     TacheOut,
     TacheDetailOut,
     TachesResponse,
+    TachesSummaryResponse,
     CommentaireOut,
+    CommentaireLiteOut,
     CommentaireCreate,
-    TacheCreate
+    TacheCreate,
+    FichierTacheOut,
+    UploadSessionCreate,
+    UploadSessionOut,
+    UploadFinalize,
 )
+from app.services.fieldsets import FieldSet, sparse_fields, TACHES, COMMENTAIRES
+from app.services.etags import etag_headers, raise_if_not_modified
+from app.services.list_cache import taches_list_cache
+from app.services.counter_buffers import view_counter, like_counter
 from app.services.taches import (
     create_tache_service,
     list_taches_service,
@@ -19,11 +35,24 @@ from app.services.taches import (
     update_tache_service,
     delete_tache_service,
     like_tache_service,
+    unlike_tache_service,
+    get_like_service,
     get_commentaires_service,
     add_commentaire_service,
     delete_file_service,
+    tache_etag,
+    taches_list_cache_key,
 )
-from app.auth import get_current_user
+from app.services.downloads import download_file_service
+from app.services.exports import export_tache_fichiers_service, export_equipe_fichiers_service
+from app.services.resumable_uploads import (
+    create_session_service,
+    get_session_service,
+    write_chunk_service,
+    finalize_session_service,
+    abort_session_service,
+)
+from app.auth import get_current_user, get_current_principal
 
 router = APIRouter()
 
@@ -66,7 +95,9 @@ async def create_tache(
         if not titre or not contenu:
             raise HTTPException(status_code=422, detail="titre et contenu sont obligatoires")
 
-    return create_tache_service(
+    # Service sync (DB + écriture des fichiers) exécuté hors boucle d'événements
+    return await run_in_threadpool(
+        create_tache_service,
         titre, contenu, auteur_id, equipe, priorite, categorie, fichiers, db, current_user
     )
 
@@ -78,12 +109,30 @@ def list_taches(
     search: str = Query("", description="Mot-clé"),
     author: str = Query("", description="Nom auteur"),
     assign_to: Optional[int] = Query(None, description="Filtrer les tâches assignées à un utilisateur"),  # 🔥 ajouté ici
-    sort: str = Query("date_desc", description="date_asc ou date_desc"),
+    sort: str = Query("date_desc", description="date_asc, date_desc ou relevance (avec search)"),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Curseur opaque (next_cursor / prev_cursor) ; remplace page"),
+    count: str = Query("exact", description="Calcul du total : exact, cached ou estimated"),
+    view: str = Query("full", pattern="^(full|summary)$", description="full (TacheOut) ou summary (TacheSummaryOut)"),
+    fieldset: Optional[FieldSet] = Depends(sparse_fields(TACHES)),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
-    current_user: Utilisateur = Depends(get_current_user),
+    current_user: Utilisateur = Depends(get_current_principal),
 ):
+    if fieldset is not None and view == "summary":
+        raise HTTPException(status_code=400, detail="fields/include ne s'appliquent pas à view=summary")
+
+    # ---------------- CACHE DE RÉPONSES ----------------
+    scope, cache_key = taches_list_cache_key(
+        current_user, search, author, assign_to, sort, page, limit, cursor, count, view, fieldset
+    )
+    cached = taches_list_cache.get(cache_key)
+    if cached is not None:
+        raise_if_not_modified(if_none_match, cached.etag)
+        return Response(content=cached.body, media_type="application/json", headers=etag_headers(cached.etag))
+
+    generation = taches_list_cache.generation()
     result = list_taches_service(
         search=search,
         author=author,
@@ -92,21 +141,55 @@ def list_taches(
         page=page,
         limit=limit,
         db=db,
-        current_user=current_user
+        current_user=current_user,
+        cursor=cursor,
+        count=count,
+        view=view,
+        fieldset=fieldset,
+        if_none_match=if_none_match,
     )
+    etag = result.pop("etag")
+    taches = result["taches"]
+
+    # Sérialisation directe (bytes mis en cache), sans revalidation par response_model.
+    # Les vues en attente d'écriture sont ajoutées à nb_vues.
+    if view == "summary":
+        # Vue compacte
+        payload = TachesSummaryResponse.model_validate({
+            **result,
+            "taches": [row._mapping for row in taches],
+        })
+        view_counter.add_pending(payload.taches)
+        like_counter.add_pending(payload.taches)
+        body = payload.model_dump_json().encode()
+    elif fieldset is not None:
+        # Sparse fieldset : seuls les champs demandés sont sérialisés
+        items = jsonable_encoder([fieldset.serialize(t) for t in taches])
+        view_counter.add_pending(items)
+        like_counter.add_pending(items)
+        body = json.dumps({**result, "taches": items}, ensure_ascii=False, separators=(",", ":")).encode()
+    else:
+        payload = TachesResponse.model_validate(result)
+        view_counter.add_pending(payload.taches)
+        like_counter.add_pending(payload.taches)
+        body = payload.model_dump_json().encode()
 
-    return {
-        "total": result["total"],
-        "page": page,
-        "limit": limit,
-        "taches": result["taches"],
-    }
+    taches_list_cache.put(cache_key, scope, body, etag, (t.id for t in taches), bool(search), generation)
+    return Response(content=body, media_type="application/json", headers=etag_headers(etag))
 
 
 # ---------------- DETAIL ----------------
 @router.get("/{tache_id}", response_model=TacheDetailOut)
-def get_tache_detail(tache_id: int, db: Session = Depends(get_db)):
-    return get_tache_detail_service(tache_id, db)
+def get_tache_detail(
+    tache_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
+    # 304 levé par le service avant la requête lourde
+    detail = get_tache_detail_service(tache_id, db, if_none_match=if_none_match)
+    response.headers.update(etag_headers(tache_etag(detail)))
+    return detail
 
 
 # ---------------- UPDATE ----------------
@@ -133,15 +216,55 @@ def delete_tache(tache_id: int, db: Session = Depends(get_db)):
 
 
 # ---------------- LIKE ----------------
+@router.get("/{tache_id}/like")
+def get_like(
+    tache_id: int,
+    db: Session = Depends(get_db),
+    current_user: Utilisateur = Depends(get_current_principal),
+):
+    return get_like_service(tache_id, db, current_user)
+
+
 @router.post("/{tache_id}/like")
-def like_tache(tache_id: int, db: Session = Depends(get_db)):
-    return like_tache_service(tache_id, db)
+def like_tache(
+    tache_id: int,
+    db: Session = Depends(get_db),
+    current_user: Utilisateur = Depends(get_current_user),
+):
+    return like_tache_service(tache_id, db, current_user)
+
+
+@router.delete("/{tache_id}/like")
+def unlike_tache(
+    tache_id: int,
+    db: Session = Depends(get_db),
+    current_user: Utilisateur = Depends(get_current_user),
+):
+    return unlike_tache_service(tache_id, db, current_user)
 
 
 # ---------------- COMMENTAIRES ----------------
-@router.get("/{tache_id}/commentaires", response_model=List[CommentaireOut])
-def get_commentaires(tache_id: int, db: Session = Depends(get_db)):
-    return get_commentaires_service(tache_id, db)
+@router.get("/{tache_id}/commentaires", response_model=List[CommentaireLiteOut])
+def get_commentaires(
+    tache_id: int,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Curseur opaque (X-Next-Cursor / X-Prev-Cursor)"),
+    limit: int = Query(settings.COMMENTS_PAGE_SIZE, ge=1, le=200),
+    fieldset: Optional[FieldSet] = Depends(sparse_fields(COMMENTAIRES)),
+    db: Session = Depends(get_db),
+):
+    # Corps inchangé (liste) ; total et curseurs passent dans les en-têtes
+    page = get_commentaires_service(tache_id, db, fieldset=fieldset, cursor=cursor, limit=limit)
+    headers = {"X-Total-Count": str(page["total"])}
+    if page["next_cursor"]:
+        headers["X-Next-Cursor"] = page["next_cursor"]
+    if page["prev_cursor"]:
+        headers["X-Prev-Cursor"] = page["prev_cursor"]
+
+    if fieldset is not None:
+        return JSONResponse(jsonable_encoder(page["commentaires"]), headers=headers)
+    response.headers.update(headers)
+    return page["commentaires"]
 
 
 @router.post("/{tache_id}/commentaires", response_model=CommentaireOut)
@@ -149,6 +272,94 @@ def add_commentaire(tache_id: int, commentaire: CommentaireCreate, db: Session =
     return add_commentaire_service(tache_id, commentaire, db)
 
 
+# ---------------- UPLOAD REPRENABLE ----------------
+# Routes à deux segments : pas de conflit avec /{tache_id}
+@router.post("/uploads", response_model=UploadSessionOut, status_code=201)
+def create_upload_session(
+    payload: UploadSessionCreate,
+    current_user: Utilisateur = Depends(get_current_user),
+):
+    return create_session_service(payload.nom_fichier, payload.taille, payload.sha256, current_user)
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadSessionOut)
+def get_upload_session(
+    upload_id: str,
+    response: Response,
+    current_user: Utilisateur = Depends(get_current_principal),
+):
+    session = get_session_service(upload_id, current_user)
+    response.headers["Upload-Offset"] = str(session["offset"])
+    return session
+
+
+@router.put("/uploads/{upload_id}", response_model=UploadSessionOut)
+async def put_upload_chunk(
+    upload_id: str,
+    request: Request,
+    response: Response,
+    offset: int = Query(..., ge=0),
+    x_chunk_sha256: Optional[str] = Header(None),
+    current_user: Utilisateur = Depends(get_current_user),
+):
+    # Corps brut (application/octet-stream) lu en flux, jamais en entier
+    session = await write_chunk_service(upload_id, offset, request.stream(), x_chunk_sha256, current_user)
+    response.headers["Upload-Offset"] = str(session["offset"])
+    return session
+
+
+@router.post("/uploads/{upload_id}/finalize", response_model=FichierTacheOut)
+def finalize_upload(
+    upload_id: str,
+    payload: UploadFinalize,
+    db: Session = Depends(get_db),
+    current_user: Utilisateur = Depends(get_current_user),
+):
+    return finalize_session_service(upload_id, payload.tache_id, db, current_user)
+
+
+@router.delete("/uploads/{upload_id}", status_code=204)
+def abort_upload(
+    upload_id: str,
+    current_user: Utilisateur = Depends(get_current_user),
+):
+    abort_session_service(upload_id, current_user)
+    return Response(status_code=204)
+
+
+# ---------------- TÉLÉCHARGEMENT DE FICHIER ----------------
+@router.api_route("/fichiers/{file_id}", methods=["GET", "HEAD"], response_class=Response)
+def download_file(
+    file_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: Utilisateur = Depends(get_current_principal),
+):
+    # Range, If-Range et HEAD traités par la réponse fichier
+    return download_file_service(file_id, db, current_user, if_none_match=if_none_match)
+
+
+# ---------------- EXPORT ZIP (en flux) ----------------
+@router.get("/{tache_id}/fichiers.zip", response_class=StreamingResponse)
+def export_tache_fichiers(
+    tache_id: int,
+    db: Session = Depends(get_db),
+    current_user: Utilisateur = Depends(get_current_principal),
+):
+    return export_tache_fichiers_service(tache_id, db, current_user)
+
+
+@router.get("/equipes/{equipe}/fichiers.zip", response_class=StreamingResponse)
+def export_equipe_fichiers(
+    equipe: str,
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: Utilisateur = Depends(get_current_principal),
+):
+    return export_equipe_fichiers_service(equipe, date_from, date_to, db, current_user)
+
+
 # ---------------- SUPPRESSION DE FICHIER ----------------
 @router.delete("/fichiers/{file_id}", response_model=dict)
 def delete_file(file_id: int, db: Session = Depends(get_db)):
@@ -1,33 +1,52 @@
 # app/routers/techniciens.py
 
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.db import get_db
 from app.models.utilisateur import Utilisateur
 from app.schemas.schemas import UtilisateurOut
-from app.auth import get_current_user
+from app.auth import get_current_principal
+from app.services.fieldsets import FieldSet, sparse_fields, UTILISATEURS
 
 router = APIRouter()
 
 
+def _check_relations(fieldset: Optional[FieldSet], current_user, tech_id: Optional[int] = None) -> None:
+    """Tâches et commentaires d'un technicien (include=, fields=taches.x) : admin ou lui-même."""
+    if fieldset is None or not fieldset.relations:
+        return
+    if current_user.type == "admin" or current_user.id == tech_id:
+        return
+    raise HTTPException(403, detail="Accès non autorisé aux tâches et commentaires des techniciens.")
+
+
 # ---------------- LISTE TECHNICIENS ----------------
 @router.get("/", response_model=dict)
 def list_techniciens(
+    fieldset: Optional[FieldSet] = Depends(sparse_fields(UTILISATEURS)),
     db: Session = Depends(get_db),
-    current_user: Utilisateur = Depends(get_current_user),
+    current_user: Utilisateur = Depends(get_current_principal),
 ):
+    _check_relations(fieldset, current_user)
+    query = db.query(Utilisateur)
+    if fieldset is not None:
+        query = query.options(*fieldset.options())
+
     techniciens = (
-        db.query(Utilisateur)
+        query
         .filter(Utilisateur.type == "technicien")
         .order_by(Utilisateur.nom)
         .all()
     )
 
-    # 🔥 Convertir en Pydantic
+    # 🔥 Convertir en Pydantic (ou champs demandés seulement)
+    serialize = fieldset.serialize if fieldset is not None else UtilisateurOut.model_validate
     return {
         "status": "success",
-        "data": [UtilisateurOut.model_validate(t) for t in techniciens],
+        "data": [serialize(t) for t in techniciens],
     }
 
 
@@ -35,11 +54,17 @@ def list_techniciens(
 @router.get("/{tech_id}", response_model=dict)
 def get_technicien(
     tech_id: int,
+    fieldset: Optional[FieldSet] = Depends(sparse_fields(UTILISATEURS)),
     db: Session = Depends(get_db),
-    current_user: Utilisateur = Depends(get_current_user),
+    current_user: Utilisateur = Depends(get_current_principal),
 ):
+    _check_relations(fieldset, current_user, tech_id)
+    query = db.query(Utilisateur)
+    if fieldset is not None:
+        query = query.options(*fieldset.options())
+
     tech = (
-        db.query(Utilisateur)
+        query
         .filter(Utilisateur.id == tech_id, Utilisateur.type == "technicien")
         .first()
     )
@@ -47,8 +72,9 @@ def get_technicien(
     if not tech:
         raise HTTPException(404, detail="Technicien non trouvé")
 
-    # 🔥 Convertir en Pydantic
+    # 🔥 Convertir en Pydantic (ou champs demandés seulement)
+    serialize = fieldset.serialize if fieldset is not None else UtilisateurOut.model_validate
     return {
         "status": "success",
-        "data": UtilisateurOut.model_validate(tech),
+        "data": serialize(tech),
     }
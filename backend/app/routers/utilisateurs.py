@@ -1,5 +1,7 @@
 # app/routers/utilisateurs.py
 
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, BackgroundTasks
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
@@ -13,10 +15,12 @@ from app.schemas.schemas import (
     PaginatedUsers,
     UtilisateurUpdate,
 )
-from app.auth import get_current_user
+from app.auth import get_current_user, get_current_principal
+from app.services.fieldsets import FieldSet, sparse_fields, UTILISATEURS
 
 from app.services.utilisateurs import (
     create_user_service,
+    import_users_service,
     list_users_service,
     get_user_detail_service,
     update_user_service,
@@ -44,6 +48,19 @@ def create_user(
     return {"status": "success", "data": new_user}
 
 
+# ---------------- IMPORT EN MASSE ----------------
+@router.post("/import", response_model=dict)
+def import_users(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(..., description="CSV (avec en-tête) ou NDJSON"),
+    db: Session = Depends(get_db),
+    current_user: Utilisateur = Depends(get_current_user),
+):
+    # Lu en flux par le service : plafond de lignes vérifié avant la fin du fichier
+    report = import_users_service(file.file, file.filename, db, current_user, background_tasks)
+    return {"status": "success", "data": report}
+
+
 # ---------------- LIST ----------------
 @router.get("/", response_model=dict)
 def list_users(
@@ -54,10 +71,15 @@ def list_users(
     sort: str = Query("nom_asc", description="nom_asc, nom_desc, date_asc, date_desc"),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    count: str = Query("exact", description="Calcul du total : exact, cached ou estimated"),
+    fieldset: Optional[FieldSet] = Depends(sparse_fields(UTILISATEURS)),
     db: Session = Depends(get_db),
-    current_user: Utilisateur = Depends(get_current_user),
+    current_user: Utilisateur = Depends(get_current_principal),
 ):
-    data = list_users_service(nom, email, equipe, type_, sort, page, limit, db, current_user)
+    data = list_users_service(
+        nom, email, equipe, type_, sort, page, limit, db, current_user,
+        count=count, fieldset=fieldset,
+    )
     return {"status": "success", "data": data}
 
 
@@ -65,10 +87,11 @@ def list_users(
 @router.get("/{user_id}", response_model=dict)
 def get_user_detail(
     user_id: int,
+    fieldset: Optional[FieldSet] = Depends(sparse_fields(UTILISATEURS)),
     db: Session = Depends(get_db),
-    current_user: Utilisateur = Depends(get_current_user),
+    current_user: Utilisateur = Depends(get_current_principal),
 ):
-    user = get_user_detail_service(user_id, db, current_user)
+    user = get_user_detail_service(user_id, db, current_user, fieldset=fieldset)
     return {"status": "success", "data": user}
 
 
@@ -66,6 +66,27 @@ class FichierTacheBase(BaseModel):
 class FichierTacheOut(FichierTacheBase):
     id: int
     tache_id: int
+    taille: Optional[int] = None
+
+
+# Upload reprenable (session, blocs PUT, finalisation)
+class UploadSessionCreate(BaseModel):
+    nom_fichier: str
+    taille: int = Field(..., ge=0)
+    sha256: Optional[str] = Field(None, pattern="^[0-9a-fA-F]{64}$")
+
+
+class UploadSessionOut(BaseModel):
+    upload_id: str
+    nom_fichier: str
+    taille: int
+    offset: int
+    chunk_size: int
+    expires_at: datetime
+
+
+class UploadFinalize(BaseModel):
+    tache_id: int
 
 
 # ======================================================
@@ -102,7 +123,11 @@ class TacheOut(TacheBase):
 
 
 class TacheDetailOut(TacheOut):
-    commentaires: List["CommentaireOut"] = []
+    # N commentaires les plus récents (ordre chronologique) ; la suite via
+    # GET /taches/{id}/commentaires?cursor=<commentaires_next_cursor>
+    commentaires: List["CommentaireLiteOut"] = []
+    nb_commentaires: int = 0
+    commentaires_next_cursor: Optional[str] = None
 
 
 class TachesResponse(BaseModel):
@@ -110,6 +135,38 @@ class TachesResponse(BaseModel):
     page: int
     limit: int
     taches: List[TacheOut]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    count_mode: str = "exact"
+
+
+class TacheSummaryOut(BaseModel):
+    """Vue compacte d'une tâche pour les listes (view=summary)."""
+    id: int
+    titre: str
+    equipe: Optional[str] = None
+    categorie: Optional[str] = None
+    priorite: Optional[str] = None
+    status: str
+    likes: Optional[int] = 0
+    nb_vues: Optional[int] = 0
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    auteur_id: Optional[int] = None
+    auteur_nom: Optional[str] = None
+    assign_to_id: Optional[int] = None
+    assign_to_nom: Optional[str] = None
+    nb_fichiers: int = 0
+
+
+class TachesSummaryResponse(BaseModel):
+    total: int
+    page: int
+    limit: int
+    taches: List[TacheSummaryOut]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    count_mode: str = "exact"
 
 
 # ======================================================
@@ -134,6 +191,23 @@ class CommentaireOut(CommentaireBase):
     tache: Optional[TacheOut] = None
 
 
+class AuteurRefOut(BaseModel):
+    """Référence compacte vers un utilisateur (listes de commentaires)."""
+    id: int
+    nom: str
+    avatar_url: Optional[str] = None
+
+
+class CommentaireLiteOut(CommentaireBase):
+    """Commentaire en liste : auteur compact, jamais la tâche parente."""
+    id: int
+    date: datetime
+    auteur_id: Optional[int] = None
+    tache_id: int
+
+    auteur: Optional[AuteurRefOut] = None
+
+
 # ======================================================
 # EMAIL
 # ======================================================
@@ -1,12 +1,13 @@
 # app/services/commentaires.py
 
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload, raiseload
 
 from app.models.commentaire import Commentaire
 from app.models.tache import Tache
 from app.models.utilisateur import Utilisateur
-from app.schemas.schemas import CommentaireCreate, CommentaireOut
+from app.schemas.schemas import CommentaireCreate, CommentaireOut, CommentaireLiteOut
+from app.services.list_cache import invalidate_tache_lists
 
 
 # ==========================================================
@@ -33,6 +34,7 @@ def add_commentaire_service(tache_id: int, commentaire: CommentaireCreate, db: S
     db.add(new_comment)
     db.commit()
     db.refresh(new_comment)
+    invalidate_tache_lists(tache_id, tache.assign_to_id)
 
     return CommentaireOut.model_validate(new_comment)
 
@@ -40,12 +42,28 @@ def add_commentaire_service(tache_id: int, commentaire: CommentaireCreate, db: S
 # ==========================================================
 #                OBTENIR COMMENTAIRES D'UNE TÂCHE
 # ==========================================================
+def commentaires_lite_options() -> list:
+    """
+    Chargement des listes de commentaires : auteurs distincts lus en une
+    requête (IN), colonnes de la référence compacte seulement ; la tâche
+    parente n'est jamais chargée (raiseload : une sérialisation qui la
+    réclamerait échoue au lieu de relancer une requête par commentaire).
+    """
+    return [
+        selectinload(Commentaire.auteur)
+        .load_only(Utilisateur.id, Utilisateur.nom, Utilisateur.avatar_url)
+        .lazyload("*"),
+        raiseload(Commentaire.tache),
+    ]
+
+
 def get_commentaires_service(tache_id: int, db: Session):
     commentaires = (
         db.query(Commentaire)
+        .options(*commentaires_lite_options())
         .filter(Commentaire.tache_id == tache_id)
         .order_by(Commentaire.id.asc())
         .all()
     )
 
-    return [CommentaireOut.model_validate(c) for c in commentaires]
+    return [CommentaireLiteOut.model_validate(c) for c in commentaires]
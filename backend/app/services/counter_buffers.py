@@ -0,0 +1,251 @@
+# app/services/counter_buffers.py
+import logging
+import threading
+import time
+
+from sqlalchemy import case, func, update
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.models.tache import Tache
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# 👁 COMPTEURS WRITE-BEHIND (vues, likes en mode regroupé)
+# ==========================================================
+# Les incréments sont agrégés en mémoire (tache_id -> delta) puis écrits
+# périodiquement par un thread, en un seul UPDATE par lot :
+#   UPDATE taches SET <colonne> = <colonne> + CASE id WHEN .. THEN .. END
+#   WHERE id IN (..)
+# La ligne d'une tâche populaire n'est plus verrouillée à chaque requête.
+# Les lectures ajoutent le delta en attente (tampon + lot en cours d'écriture)
+# à la valeur déjà lue en base, sans verrou global ni requête supplémentaire.
+#
+# Valeurs monotones : l'UPDATE renvoie (RETURNING) la valeur écrite, gardée
+# comme plancher jusqu'au lot suivant. Un id sort du lot en cours dès que son
+# plancher le contient ; la valeur affichée est max(base lue, plancher) +
+# delta pas encore écrit, que la base lue soit d'avant ou d'après le COMMIT.
+
+
+class CounterBuffer:
+
+    def __init__(self, column: str, flush_seconds: float, max_pending: int, batch_size: int):
+        self.column = column
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+
+        self._pending: dict[int, int] = {}
+        self._inflight: dict[int, int] = {}
+        self._floor: dict[int, int] = {}
+        self._oldest_pending: float | None = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()   # un seul lot en vol à la fois
+
+        self._session_factory: sessionmaker | None = None
+        self._thread: threading.Thread | None = None
+        self._wake = threading.Event()
+        self._stopping = False
+
+        self.recorded = 0
+        self.flushes = 0
+        self.flushed_total = 0
+        self.errors = 0
+        self.last_flush_at: float | None = None
+        self.last_flush_ms = 0.0
+
+    # ------------------------------------------------------
+    # Enregistrement / lecture
+    # ------------------------------------------------------
+    def record(self, tache_id: int, delta: int = 1) -> None:
+        with self._lock:
+            self._pending[tache_id] = self._pending.get(tache_id, 0) + delta
+            if self._oldest_pending is None:
+                self._oldest_pending = time.monotonic()
+            self.recorded += 1
+            full = len(self._pending) >= self.max_pending
+
+        if full:
+            self._wake.set()
+
+    def pending(self, tache_id: int) -> int:
+        """Delta pas encore écrit en base (tampon + lot en cours avant son UPDATE)."""
+        with self._lock:
+            return self._pending.get(tache_id, 0) + self._inflight.get(tache_id, 0)
+
+    def _value(self, tache_id: int, stored: int | None) -> int:
+        # Appelé sous self._lock
+        base = max(stored or 0, self._floor.get(tache_id, 0))
+        return base + self._pending.get(tache_id, 0) + self._inflight.get(tache_id, 0)
+
+    def read(self, tache_id: int, stored: int | None) -> int:
+        """Compteur affiché : valeur chargée en base (ou plancher du dernier lot) + delta en attente."""
+        with self._lock:
+            return self._value(tache_id, stored)
+
+    def add_pending(self, items) -> None:
+        """Applique `read` aux éléments sérialisés d'une liste (dicts ou modèles)."""
+        column = self.column
+        with self._lock:
+            if not self._pending and not self._inflight and not self._floor:
+                return
+            for item in items:
+                if isinstance(item, dict):
+                    if column in item and item.get("id") is not None:
+                        item[column] = self._value(item["id"], item[column])
+                elif getattr(item, "id", None) is not None and hasattr(item, column):
+                    setattr(item, column, self._value(item.id, getattr(item, column)))
+
+    # ------------------------------------------------------
+    # Écriture par lots
+    # ------------------------------------------------------
+    def flush(self) -> int:
+        """Écrit le tampon ; retourne le total des incréments écrits. En cas d'erreur, le lot est remis en attente."""
+        if self._session_factory is None:
+            return 0
+        with self._flush_lock:
+            return self._flush()
+
+    def _flush(self) -> int:
+        with self._lock:
+            if not self._pending:
+                # Lot précédent validé depuis au moins un intervalle : plancher inutile
+                self._floor = {}
+                return 0
+            self._inflight, self._pending = self._pending, {}
+            self._oldest_pending = None
+            batch = dict(self._inflight)
+            previous_floor = dict(self._floor)
+
+        started = time.perf_counter()
+        counter = getattr(Tache, self.column)
+        written: dict[int, int] = {}
+        db = None
+        try:
+            db = self._session_factory()
+            # Ordre des ids stable : verrous de lignes pris dans le même ordre
+            ids = sorted(batch)
+            for start in range(0, len(ids), self.batch_size):
+                chunk = ids[start:start + self.batch_size]
+                rows = db.execute(
+                    update(Tache)
+                    .where(Tache.id.in_(chunk))
+                    .values({
+                        counter: func.coalesce(counter, 0)
+                        + case({tache_id: batch[tache_id] for tache_id in chunk}, value=Tache.id, else_=0),
+                        # un compteur ne modifie pas la tâche (pas d'onupdate)
+                        Tache.updated_at: Tache.updated_at,
+                    })
+                    .returning(Tache.id, counter)
+                    .execution_options(synchronize_session=False)
+                ).all()
+                # Valeur écrite connue : le delta passe du lot au plancher
+                with self._lock:
+                    for tache_id, value in rows:
+                        written[tache_id] = value
+                        self._floor[tache_id] = value
+                        self._inflight.pop(tache_id, None)
+            db.commit()
+        except Exception:
+            if db is not None:
+                db.rollback()
+            with self._lock:
+                for tache_id, delta in batch.items():
+                    self._pending[tache_id] = self._pending.get(tache_id, 0) + delta
+                self._inflight = {}
+                self._floor = previous_floor
+                if self._oldest_pending is None:
+                    self._oldest_pending = time.monotonic()
+                self.errors += 1
+            logger.exception("Échec de l'écriture du compteur %s", self.column)
+            return 0
+        finally:
+            if db is not None:
+                db.close()
+
+        with self._lock:
+            # Tâches supprimées entre-temps : rien d'écrit, rien à garder
+            self._inflight = {}
+            # Seul le dernier lot sert de plancher (lectures encore en vol)
+            self._floor = written
+            self.flushes += 1
+            self.flushed_total += sum(batch.values())
+            self.last_flush_at = time.monotonic()
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+        return sum(batch.values())
+
+    # ------------------------------------------------------
+    # Cycle de vie
+    # ------------------------------------------------------
+    def start(self, session_factory: sessionmaker) -> None:
+        self._session_factory = session_factory
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stopping = False
+        self._wake.clear()
+        self._thread = threading.Thread(target=self._run, name=f"{self.column}-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Arrêt propre : réveille le thread, l'attend puis écrit le reste du tampon."""
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(self.flush_seconds, 1) * 2)
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            if self._stopping:
+                break
+            self.flush()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pending.clear()
+            self._inflight.clear()
+            self._floor.clear()
+            self._oldest_pending = None
+
+    # ------------------------------------------------------
+    # Métriques
+    # ------------------------------------------------------
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "running": self._thread is not None and self._thread.is_alive(),
+                "flush_seconds": self.flush_seconds,
+                "pending_taches": len(self._pending),
+                "pending_total": sum(self._pending.values()) + sum(self._inflight.values()),
+                # retard d'écriture : âge du plus ancien incrément non écrit
+                "flush_lag_seconds": round(now - self._oldest_pending, 3) if self._oldest_pending else 0.0,
+                "last_flush_age_seconds": round(now - self.last_flush_at, 3) if self.last_flush_at else None,
+                "last_flush_ms": self.last_flush_ms,
+                "recorded": self.recorded,
+                "flushes": self.flushes,
+                "flushed_total": self.flushed_total,
+                "errors": self.errors,
+            }
+
+
+view_counter = CounterBuffer(
+    "nb_vues",
+    flush_seconds=settings.VIEW_COUNTER_FLUSH_SECONDS,
+    max_pending=settings.VIEW_COUNTER_MAX_PENDING,
+    batch_size=settings.VIEW_COUNTER_BATCH_SIZE,
+)
+
+# Utilisé seulement si LIKES_COALESCE : la ligne du like par utilisateur est
+# écrite tout de suite (idempotence), l'incrément du total est regroupé
+like_counter = CounterBuffer(
+    "likes",
+    flush_seconds=settings.LIKES_COALESCE_FLUSH_SECONDS,
+    max_pending=settings.VIEW_COUNTER_MAX_PENDING,
+    batch_size=settings.VIEW_COUNTER_BATCH_SIZE,
+)
@@ -0,0 +1,137 @@
+# app/services/counts.py
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Query
+
+from app.config import settings
+
+# ==========================================================
+# 🔹 STRATÉGIES DE COMPTAGE POUR LA PAGINATION
+# ==========================================================
+# - exact     : COUNT(*) à chaque appel (comportement historique)
+# - cached    : COUNT(*) mémorisé par signature de filtres, TTL court,
+#               invalidé à chaque écriture sur la table
+# - estimated : estimation du planificateur PostgreSQL (EXPLAIN), sans
+#               parcourir les lignes ; repli sur `exact` ailleurs
+COUNT_MODES = ("exact", "cached", "estimated")
+
+
+class CountCache:
+    """Cache LRU + TTL des totaux, avec une génération par table pour l'invalidation."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[tuple, tuple[float, int, int]]" = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, table: str, signature: tuple) -> int | None:
+        now = time.monotonic()
+        key = (table, signature)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, generation, total = entry
+            if expires_at <= now or generation != self._generations.get(table, 0):
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return total
+
+    def generation(self, table: str) -> int:
+        with self._lock:
+            return self._generations.get(table, 0)
+
+    def put(self, table: str, signature: tuple, total: int, generation: int) -> None:
+        """`generation` est lue AVANT le COUNT : une écriture concurrente rend l'entrée périmée."""
+        key = (table, signature)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, generation, total)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, table: str) -> None:
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+count_cache = CountCache(
+    max_size=settings.COUNT_CACHE_MAX_SIZE,
+    ttl_seconds=settings.COUNT_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_counts(table: str) -> None:
+    """Hook appelé après toute écriture (création / suppression / changement de filtre)."""
+    count_cache.invalidate(table)
+
+
+# ==========================================================
+# 🔹 COMPTAGE
+# ==========================================================
+def _estimate_count(query: Query) -> int | None:
+    """Nombre de lignes estimé par le planificateur PostgreSQL, sans exécution."""
+    bind = query.session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+
+    compiled = query.statement.compile(dialect=bind.dialect)
+    result = query.session.connection().exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+    )
+    plan = result.scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_query(query: Query, mode: str, table: str, signature: tuple) -> tuple[int, str]:
+    """
+    Compte les lignes d'une requête filtrée (sans ORDER BY / LIMIT).
+    Retourne (total, mode réellement utilisé).
+    """
+    if mode not in COUNT_MODES:
+        raise HTTPException(status_code=400, detail=f"Mode de comptage invalide : {mode}")
+
+    if mode == "estimated":
+        estimate = _estimate_count(query)
+        if estimate is not None:
+            return estimate, "estimated"
+        mode = "exact"
+
+    if mode == "cached":
+        total = count_cache.get(table, signature)
+        if total is None:
+            generation = count_cache.generation(table)
+            total = query.count()
+            count_cache.put(table, signature, total, generation)
+        return total, "cached"
+
+    return query.count(), "exact"
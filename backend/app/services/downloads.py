@@ -0,0 +1,100 @@
+# app/services/downloads.py
+import os
+from mimetypes import guess_type
+from typing import Optional
+from urllib.parse import quote
+
+from fastapi import HTTPException, Response
+from fastapi.responses import FileResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.fichier import FichierTache
+from app.models.tache import Tache
+from app.services import uploads
+from app.services.etags import CACHE_CONTROL, raise_if_not_modified
+
+# ==========================================================
+# 📥 TÉLÉCHARGEMENT DES PIÈCES JOINTES
+# ==========================================================
+# - accès : administrateur, auteur ou assigné de la tâche
+# - contenu adressé par empreinte : ETag = sha256 et `immutable` (le contenu
+#   d'un FichierTache ne change jamais) ; fichier pas encore migré : ETag
+#   du système de fichiers et revalidation à chaque usage
+# - Range / If-Range gérés par FileResponse ; envoi sans copie (sendfile)
+#   par le serveur ASGI quand il propose l'extension `http.response.pathsend`
+# - FILES_ACCEL_REDIRECT_PREFIX : réponse sans corps, le proxy envoie le
+#   fichier depuis son emplacement interne
+IMMUTABLE = "private, max-age={max_age}, immutable"
+
+
+def can_access_tache(current_user, auteur_id: Optional[int], assign_to_id: Optional[int]) -> bool:
+    return current_user.type == "admin" or current_user.id in (auteur_id, assign_to_id)
+
+
+def _get_fichier(file_id: int, db: Session, current_user) -> FichierTache:
+    row = db.execute(
+        select(FichierTache, Tache.auteur_id, Tache.assign_to_id)
+        .outerjoin(Tache, Tache.id == FichierTache.tache_id)
+        .where(FichierTache.id == file_id)
+    ).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Fichier non trouvé")
+
+    fichier, auteur_id, assign_to_id = row
+    if not can_access_tache(current_user, auteur_id, assign_to_id):
+        raise HTTPException(status_code=403, detail="Accès refusé à ce fichier.")
+    return fichier
+
+
+def _content_disposition(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def _accel_path(chemin: str) -> Optional[str]:
+    """Chemin interne du proxy, ou None si le fichier est hors du dossier des uploads."""
+    relative = os.path.relpath(chemin, uploads.UPLOAD_DIR).replace(os.sep, "/")
+    if relative.startswith("../"):
+        return None
+    return settings.FILES_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + quote(relative)
+
+
+def download_file_service(file_id: int, db: Session, current_user, if_none_match: Optional[str] = None) -> Response:
+    fichier = _get_fichier(file_id, db, current_user)
+
+    headers = {"X-Content-Type-Options": "nosniff"}
+    if fichier.sha256:
+        cache_control = IMMUTABLE.format(max_age=settings.FILES_CACHE_MAX_AGE)
+        etag = f'"{fichier.sha256}"'
+        # 304 avant tout accès disque
+        raise_if_not_modified(if_none_match, etag, cache_control)
+        headers.update({"ETag": etag, "Cache-Control": cache_control})
+    else:
+        headers["Cache-Control"] = CACHE_CONTROL
+
+    try:
+        stat_result = os.stat(fichier.chemin)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Fichier introuvable sur le disque")
+
+    media_type = guess_type(fichier.nom_fichier)[0] or "application/octet-stream"
+
+    accel_path = _accel_path(fichier.chemin) if settings.FILES_ACCEL_REDIRECT_PREFIX else None
+    if accel_path is not None:
+        headers.update({
+            settings.FILES_ACCEL_HEADER: accel_path,
+            "Content-Disposition": _content_disposition(fichier.nom_fichier),
+        })
+        return Response(media_type=media_type, headers=headers)
+
+    return FileResponse(
+        fichier.chemin,
+        media_type=media_type,
+        filename=fichier.nom_fichier,
+        stat_result=stat_result,
+        headers=headers,
+    )
@@ -0,0 +1,38 @@
+# app/services/etags.py
+import hashlib
+
+from fastapi import HTTPException
+
+# ==========================================================
+# 🔹 ETAGS / REQUÊTES CONDITIONNELLES (If-None-Match)
+# ==========================================================
+# Les ETags sont forts : dérivés d'une "version" lue en base (updated_at,
+# compteurs, agrégats) et des paramètres de la requête. Un 304 est levé
+# AVANT la requête lourde et la sérialisation.
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Comparaison faible (RFC 9110 §13.1.2) : `*`, listes et préfixe W/ acceptés."""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return any(c == "*" or c.removeprefix("W/") == etag for c in candidates)
+
+
+def raise_if_not_modified(if_none_match: str | None, etag: str, cache_control: str = CACHE_CONTROL) -> None:
+    """Lève un 304 (sans corps) si le client possède déjà cette version."""
+    if etag_matches(if_none_match, etag):
+        raise HTTPException(
+            status_code=304,
+            headers=etag_headers(etag, cache_control),
+        )
+
+
+def etag_headers(etag: str, cache_control: str = CACHE_CONTROL) -> dict:
+    return {"ETag": etag, "Cache-Control": cache_control}
@@ -0,0 +1,211 @@
+# app/services/exports.py
+import os
+import re
+import zipfile
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Iterator, Optional
+from urllib.parse import quote
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.fichier import FichierTache
+from app.models.tache import Tache
+from app.services.downloads import can_access_tache
+
+# ==========================================================
+# 🗜 EXPORT ZIP DES PIÈCES JOINTES (en flux)
+# ==========================================================
+# L'archive est produite pendant l'envoi : zipfile écrit dans un tampon
+# non repositionnable (descripteurs de données après chaque entrée, ZIP64
+# au besoin), vidé vers le client après chaque bloc lu sur le disque.
+# - ni fichier temporaire, ni archive en mémoire : au plus un bloc
+#   (UPLOAD_CHUNK_BYTES) et le tampon du compresseur
+# - formats déjà compressés (images, vidéos, archives, PDF, Office)
+#   simplement stockés ; les autres compressés (deflate)
+# - métadonnées lues avant la réponse : aucune session SQL ouverte
+#   pendant le transfert
+# - un fichier absent du disque est sauté et listé dans FICHIERS_MANQUANTS.txt
+STORED_EXTENSIONS = frozenset("""
+    zip gz tgz bz2 xz 7z rar zst lz4 jar apk
+    jpg jpeg png gif webp heic heif avif
+    mp3 m4a aac ogg oga opus flac mp4 m4v mov avi mkv webm
+    pdf docx xlsx pptx odt ods odp epub
+""".split())
+MISSING_FILE = "FICHIERS_MANQUANTS.txt"
+_UNSAFE_RE = re.compile(r'[\\/:*?"<>|\x00-\x1f]+')
+
+
+@dataclass(frozen=True)
+class ExportEntry:
+    arcname: str
+    chemin: str
+
+
+class _Sink:
+    """Flux d'écriture non repositionnable : zipfile y écrit, le générateur le vide."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _safe_part(name: str, fallback: str) -> str:
+    name = _UNSAFE_RE.sub("_", name or "").strip(" .")
+    return name[:100] or fallback
+
+
+def _compress_type(nom_fichier: str) -> int:
+    extension = nom_fichier.rsplit(".", 1)[-1].lower() if "." in nom_fichier else ""
+    return zipfile.ZIP_STORED if extension in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+
+
+def _unique(arcname: str, used: set[str]) -> str:
+    """Deux fichiers de même nom dans un dossier : « nom (2).ext »."""
+    if arcname not in used:
+        used.add(arcname)
+        return arcname
+    stem, dot, extension = arcname.rpartition(".")
+    if not dot or "/" in extension:
+        stem, dot, extension = arcname, "", ""
+    n = 2
+    while (candidate := f"{stem} ({n}){dot}{extension}") in used:
+        n += 1
+    used.add(candidate)
+    return candidate
+
+
+def _zip_info(entry: ExportEntry, stat_result: os.stat_result) -> zipfile.ZipInfo:
+    modified = datetime.fromtimestamp(max(stat_result.st_mtime, 315532800))   # ZIP : >= 1980
+    info = zipfile.ZipInfo(entry.arcname, date_time=modified.timetuple()[:6])
+    info.compress_type = _compress_type(entry.arcname)
+    info.file_size = stat_result.st_size          # ZIP64 décidé d'après la taille
+    info.external_attr = 0o644 << 16
+    return info
+
+
+def stream_zip(entries: list[ExportEntry]) -> Iterator[bytes]:
+    sink = _Sink()
+    missing = []
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+        for entry in entries:
+            try:
+                src = open(entry.chemin, "rb")
+            except OSError:
+                missing.append(entry.arcname)
+                continue
+            with src, archive.open(_zip_info(entry, os.fstat(src.fileno())), "w") as dest:
+                while chunk := src.read(settings.UPLOAD_CHUNK_BYTES):
+                    dest.write(chunk)
+                    if data := sink.drain():
+                        yield data
+            if data := sink.drain():      # descripteur de données de l'entrée
+                yield data
+
+        if missing:
+            archive.writestr(MISSING_FILE, "\n".join(missing) + "\n")
+    # Répertoire central écrit à la fermeture
+    yield sink.drain()
+
+
+def _zip_response(entries: list[ExportEntry], filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        stream_zip(entries),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f"attachment; filename*=utf-8''{quote(filename)}",
+            "Cache-Control": "private, no-store",
+        },
+    )
+
+
+def _check_size(count: int) -> None:
+    if count > settings.EXPORT_MAX_FILES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Export trop volumineux (max {settings.EXPORT_MAX_FILES} fichiers) : réduisez la période.",
+        )
+
+
+# ==========================================================
+# 🔹 UNE TÂCHE
+# ==========================================================
+def export_tache_fichiers_service(tache_id: int, db: Session, current_user) -> StreamingResponse:
+    tache = db.execute(
+        select(Tache.id, Tache.titre, Tache.auteur_id, Tache.assign_to_id).where(Tache.id == tache_id)
+    ).first()
+    if tache is None:
+        raise HTTPException(status_code=404, detail="Tâche non trouvée")
+    if not can_access_tache(current_user, tache.auteur_id, tache.assign_to_id):
+        raise HTTPException(status_code=403, detail="Accès refusé à cette tâche.")
+
+    rows = db.execute(
+        select(FichierTache.nom_fichier, FichierTache.chemin)
+        .where(FichierTache.tache_id == tache_id)
+        .order_by(FichierTache.id)
+    ).all()
+    _check_size(len(rows))
+
+    used: set[str] = set()
+    entries = [
+        ExportEntry(_unique(_safe_part(row.nom_fichier, "fichier"), used), row.chemin)
+        for row in rows
+    ]
+    return _zip_response(entries, f"tache-{tache_id}-{_safe_part(tache.titre, 'fichiers')}.zip")
+
+
+# ==========================================================
+# 🔹 UNE ÉQUIPE, SUR UNE PÉRIODE
+# ==========================================================
+def export_equipe_fichiers_service(
+    equipe: str,
+    date_from: Optional[date],
+    date_to: Optional[date],
+    db: Session,
+    current_user,
+) -> StreamingResponse:
+    if current_user.type != "admin":
+        raise HTTPException(status_code=403, detail="Action réservée aux administrateurs.")
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="Période invalide : date_from postérieure à date_to.")
+
+    query = (
+        select(Tache.id, Tache.titre, FichierTache.nom_fichier, FichierTache.chemin)
+        .join(FichierTache, FichierTache.tache_id == Tache.id)
+        .where(Tache.equipe == equipe)
+        .order_by(Tache.created_at, Tache.id, FichierTache.id)
+    )
+    if date_from:
+        query = query.where(Tache.created_at >= datetime.combine(date_from, time.min))
+    if date_to:
+        # Borne incluse : jusqu'à la fin de la journée
+        query = query.where(Tache.created_at < datetime.combine(date_to + timedelta(days=1), time.min))
+
+    rows = db.execute(query.limit(settings.EXPORT_MAX_FILES + 1)).all()
+    _check_size(len(rows))
+
+    used: set[str] = set()
+    entries = [
+        ExportEntry(
+            _unique(f"{row.id} - {_safe_part(row.titre, 'tache')}/{_safe_part(row.nom_fichier, 'fichier')}", used),
+            row.chemin,
+        )
+        for row in rows
+    ]
+    period = f"{date_from or 'debut'}_{date_to or 'fin'}"
+    return _zip_response(entries, f"equipe-{_safe_part(equipe, 'equipe')}-{period}.zip")
@@ -0,0 +1,190 @@
+# app/services/fieldsets.py
+from dataclasses import dataclass, field
+
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only, lazyload, selectinload
+
+from app.models.tache import Tache
+from app.models.utilisateur import Utilisateur
+from app.models.commentaire import Commentaire
+from app.schemas.schemas import (
+    TacheOut,
+    UtilisateurOut,
+    FichierTacheOut,
+    CommentaireOut,
+)
+
+# ==========================================================
+# 🔹 SPARSE FIELDSETS (?fields= / ?include=)
+# ==========================================================
+# - fields=titre,status,auteur.nom : colonnes renvoyées (et colonnes des
+#   relations avec la notation pointée) ; `id` est toujours présent
+# - include=auteur,fichiers        : relations chargées et sérialisées en entier
+# Sans aucun des deux paramètres, les routes gardent leur réponse complète.
+# Les colonnes non demandées ne sont pas lues (load_only) et seules les
+# relations demandées sont chargées (selectinload), les autres restent paresseuses.
+
+
+def _schema_columns(schema: type[BaseModel], model) -> tuple[str, ...]:
+    """Champs du schéma qui sont des colonnes du modèle (hors relations)."""
+    column_keys = set(inspect(model).column_attrs.keys())
+    return tuple(name for name in schema.model_fields if name in column_keys)
+
+
+@dataclass(frozen=True)
+class Resource:
+    """Ressource exposable en sparse fieldset : modèle, schéma, relations autorisées."""
+    name: str
+    model: type
+    schema: type[BaseModel]
+    relations: dict[str, type[BaseModel]] = field(default_factory=dict)
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return _schema_columns(self.schema, self.model)
+
+    def related_model(self, relation: str):
+        return inspect(self.model).relationships[relation].mapper.class_
+
+    def relation_columns(self, relation: str) -> tuple[str, ...]:
+        return _schema_columns(self.relations[relation], self.related_model(relation))
+
+
+TACHES = Resource(
+    "taches", Tache, TacheOut,
+    relations={
+        "auteur": UtilisateurOut,
+        "assign_to": UtilisateurOut,
+        "fichiers": FichierTacheOut,
+        "commentaires": CommentaireOut,
+    },
+)
+
+UTILISATEURS = Resource(
+    "utilisateurs", Utilisateur, UtilisateurOut,
+    relations={
+        "taches": TacheOut,
+        "assignations": TacheOut,
+        "commentaires": CommentaireOut,
+    },
+)
+
+COMMENTAIRES = Resource(
+    "commentaires", Commentaire, CommentaireOut,
+    relations={
+        "auteur": UtilisateurOut,
+        "tache": TacheOut,
+    },
+)
+
+
+@dataclass(frozen=True)
+class FieldSet:
+    resource: Resource
+    columns: tuple[str, ...]
+    # relation -> colonnes demandées (toutes si include=)
+    relations: dict[str, tuple[str, ...]]
+
+    # ------------------------------------------------------
+    # Chargement SQL
+    # ------------------------------------------------------
+    def options(self, *required: str) -> list:
+        """
+        Options de chargement pour `query.options(...)`.
+        `required` : colonnes lues mais non renvoyées (ex. clé de tri du curseur).
+        """
+        model = self.resource.model
+        mapper = inspect(model)
+
+        keys = set(self.columns) | set(required)
+        for relation in self.relations:
+            # Clés étrangères locales nécessaires au chargement des many-to-one
+            for column in mapper.relationships[relation].local_columns:
+                keys.add(mapper.get_property_by_column(column).key)
+
+        opts = [load_only(*(getattr(model, key) for key in sorted(keys))), lazyload("*")]
+        for relation, sub_columns in self.relations.items():
+            target = self.resource.related_model(relation)
+            # Options chaînées : un lazyload("*") passé via .options() ne
+            # s'appliquerait pas aux relations lazy="selectin" de la cible
+            opts.append(
+                selectinload(getattr(model, relation))
+                .load_only(*(getattr(target, key) for key in sub_columns))
+                .lazyload("*")
+            )
+        return opts
+
+    # ------------------------------------------------------
+    # Sérialisation
+    # ------------------------------------------------------
+    def serialize(self, obj) -> dict:
+        data = {key: getattr(obj, key) for key in self.columns}
+        for relation, sub_columns in self.relations.items():
+            value = getattr(obj, relation)
+            if value is None:
+                data[relation] = None
+            elif isinstance(value, list):
+                data[relation] = [{key: getattr(v, key) for key in sub_columns} for v in value]
+            else:
+                data[relation] = {key: getattr(value, key) for key in sub_columns}
+        return data
+
+
+def _split(value: str | None) -> list[str]:
+    return [part.strip() for part in (value or "").split(",") if part.strip()]
+
+
+def parse_fieldset(resource: Resource, fields: str | None, include: str | None) -> FieldSet | None:
+    """Valide `fields` / `include` ; retourne None si aucun n'est fourni."""
+    if not _split(fields) and not _split(include):
+        return None
+
+    columns: list[str] = ["id"]
+    partial: dict[str, list[str]] = {}
+    full = set(_split(include))
+
+    for name in full:
+        if name not in resource.relations:
+            raise HTTPException(status_code=400, detail=f"Relation inconnue pour {resource.name} : {name}")
+
+    for name in _split(fields):
+        relation, _, sub = name.partition(".")
+        if sub:
+            if relation not in resource.relations or sub not in resource.relation_columns(relation):
+                raise HTTPException(status_code=400, detail=f"Champ inconnu pour {resource.name} : {name}")
+            partial.setdefault(relation, ["id"])
+            if sub not in partial[relation]:
+                partial[relation].append(sub)
+        elif name in resource.relations:
+            full.add(name)
+        elif name in resource.columns:
+            if name not in columns:
+                columns.append(name)
+        else:
+            raise HTTPException(status_code=400, detail=f"Champ inconnu pour {resource.name} : {name}")
+
+    # include= seul : toutes les colonnes de la ressource
+    if not _split(fields):
+        columns = list(resource.columns)
+
+    relations = {
+        name: resource.relation_columns(name) if name in full else tuple(partial[name])
+        for name in resource.relations
+        if name in full or name in partial
+    }
+
+    return FieldSet(resource, tuple(columns), relations)
+
+
+def sparse_fields(resource: Resource):
+    """Dépendance FastAPI : lit ?fields= et ?include= pour la ressource donnée."""
+
+    def dependency(
+        fields: str | None = Query(None, description="Champs à renvoyer (ex. id,titre,auteur.nom)"),
+        include: str | None = Query(None, description="Relations à charger (ex. auteur,fichiers)"),
+    ) -> FieldSet | None:
+        return parse_fieldset(resource, fields, include)
+
+    return dependency
@@ -0,0 +1,150 @@
+# app/services/hashing.py
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.config import settings
+
+# ==========================================================
+# 🔹 CONTEXTE BCRYPT (unique pour toute l'application)
+# ==========================================================
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class HashingService:
+    """
+    Exécute bcrypt (~250 ms CPU par appel) sur un pool de threads dédié.
+    bcrypt relâche le GIL : des threads suffisent, sans coût de process.
+    Le nombre de jobs en cours + en attente est borné ; au-delà, l'appel est
+    rejeté immédiatement (503) au lieu de s'empiler.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: ThreadPoolExecutor | None = None
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    # ------------------------------------------------------
+    # Soumission bornée
+    # ------------------------------------------------------
+    def _submit(self, fn, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Service d’authentification saturé, réessayez dans un instant.",
+                headers={"Retry-After": "1"},
+            )
+
+        with self._lock:
+            self.in_flight += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="hashing"
+                )
+            executor = self._executor
+
+        try:
+            return executor.submit(self._run, fn, *args)
+        except Exception:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+            raise
+
+    def _run(self, fn, *args):
+        # Slot rendu dans le job, avant la publication du résultat : quand
+        # `.result()` retourne, le slot est déjà libre (un done-callback
+        # peut s'exécuter après)
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+            self._slots.release()
+
+    # ------------------------------------------------------
+    # API sync (routes def, scripts) et async (routes async def)
+    # ------------------------------------------------------
+    def hash(self, password: str) -> str:
+        return self._submit(pwd_context.hash, password).result()
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self._submit(pwd_context.verify, plain_password, hashed_password).result()
+
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(pwd_context.hash, password))
+
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(
+            self._submit(pwd_context.verify, plain_password, hashed_password)
+        )
+
+    # ------------------------------------------------------
+    # Métriques / arrêt
+    # ------------------------------------------------------
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self) -> None:
+        """Termine les jobs en cours ; le pool est recréé au prochain appel."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+hashing_service = HashingService(
+    max_workers=settings.HASHING_MAX_WORKERS,
+    max_pending=settings.HASHING_MAX_PENDING,
+)
+
+
+# ==========================================================
+# 🔹 RACCOURCIS
+# ==========================================================
+def hash_password(password: str) -> str:
+    return hashing_service.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return hashing_service.verify(plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    return await hashing_service.hash_async(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hashing_service.verify_async(plain_password, hashed_password)
+
+
+def hash_passwords_bulk(passwords: list[str]) -> list[str]:
+    """
+    Hache une liste de mots de passe sur tous les cœurs (imports en masse).
+    Pool séparé et éphémère : ne consomme pas les slots réservés au login.
+    """
+    if not passwords:
+        return []
+
+    workers = settings.HASHING_BULK_WORKERS or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=min(workers, len(passwords)), thread_name_prefix="hashing-bulk") as pool:
+        return list(pool.map(pwd_context.hash, passwords))
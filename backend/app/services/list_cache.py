@@ -0,0 +1,157 @@
+# app/services/list_cache.py
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.config import settings
+
+# ==========================================================
+# 🔹 CACHE DES RÉPONSES DE LISTE (GET /taches)
+# ==========================================================
+# Corps JSON déjà sérialisé + ETag, par (périmètre, filtres normalisés).
+# Chaque entrée est étiquetée par son périmètre de visibilité ("admin" ou
+# id de l'assigné) et les ids des tâches de la page, ce qui permet une
+# invalidation ciblée :
+# - changement d'appartenance (création, suppression, assignation) :
+#   toutes les entrées des périmètres touchés
+# - modification en place (édition, fermeture, commentaire, like, fichier) :
+#   les pages qui contiennent la tâche, et les recherches de ces périmètres
+# Les vues ne l'invalident pas : le TTL borne le retard du compteur.
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    scope: object
+    tache_ids: frozenset
+    searched: bool
+    expires_at: float
+
+
+class ResponseCache:
+    """Cache LRU + TTL borné en nombre d'entrées et en octets. Thread-safe."""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[tuple, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # ------------------------------------------------------
+    # Lecture / écriture
+    # ------------------------------------------------------
+    def get(self, key: tuple) -> CachedResponse | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= now:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def put(self, key: tuple, scope, body: bytes, etag: str, tache_ids, searched: bool, generation: int) -> None:
+        """`generation` est lue AVANT le calcul : une invalidation concurrente annule l'écriture."""
+        if self.max_entries <= 0 or self.ttl_seconds <= 0 or len(body) > self.max_bytes:
+            return
+
+        entry = CachedResponse(
+            body=body,
+            etag=etag,
+            scope=scope,
+            tache_ids=frozenset(tache_ids),
+            searched=searched,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        with self._lock:
+            if generation != self._generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = entry
+            self._bytes += len(body)
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    # ------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------
+    def invalidate_tache(self, tache_id: int | None, *user_ids: int | None, membership: bool = False) -> None:
+        """
+        Invalide les réponses qu'une écriture sur `tache_id` peut changer.
+        `user_ids` : assignés concernés (ancien et nouveau) ; le périmètre
+        admin est toujours concerné.
+        """
+        scopes = {"admin", *(uid for uid in user_ids if uid is not None)}
+        with self._lock:
+            self._generation += 1
+            stale = [
+                key for key, entry in self._entries.items()
+                if entry.scope in scopes
+                and (membership or entry.searched or tache_id in entry.tache_ids)
+            ]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: tuple) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+
+    # ------------------------------------------------------
+    # Métriques
+    # ------------------------------------------------------
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+taches_list_cache = ResponseCache(
+    max_entries=settings.TACHES_LIST_CACHE_MAX_ENTRIES,
+    max_bytes=settings.TACHES_LIST_CACHE_MAX_BYTES,
+    ttl_seconds=settings.TACHES_LIST_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_tache_lists(tache_id: int | None, *user_ids: int | None, membership: bool = False) -> None:
+    """Hook appelé après toute écriture sur une tâche (voir en-tête du module)."""
+    taches_list_cache.invalidate_tache(tache_id, *user_ids, membership=membership)
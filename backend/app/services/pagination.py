@@ -0,0 +1,92 @@
+# app/services/pagination.py
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import inspect, tuple_
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex
+
+from app.models.commentaire import Commentaire
+from app.models.tache import Tache
+
+# Index servant l'ORDER BY (date, id) des pages keyset
+KEYSET_INDEXES = {
+    Tache.__table__: "idx_tache_created_id",
+    Commentaire.__table__: "idx_commentaire_tache_date_id",
+}
+
+# ==========================================================
+# 🔹 CURSEURS OPAQUES (pagination keyset)
+# ==========================================================
+# Un curseur encode la clé de tri de la ligne limite (date, id) et le sens
+# de lecture ("next" = après la ligne, "prev" = avant la ligne).
+
+
+def encode_cursor(created_at: datetime, row_id: int, direction: str) -> str:
+    raw = json.dumps({"c": created_at.isoformat(), "i": row_id, "d": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction = data["d"]
+        if direction not in ("next", "prev"):
+            raise ValueError(direction)
+        return datetime.fromisoformat(data["c"]), int(data["i"]), direction
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Curseur de pagination invalide.")
+
+
+def keyset_page(query, date_col, id_col, cursor: str | None, limit: int, descending: bool):
+    """
+    Applique la pagination keyset sur (date_col, id_col).
+    Retourne (lignes, curseur_suivant, curseur_précédent).
+    Une ligne de plus que `limit` est lue pour savoir s'il reste des pages.
+    """
+    direction = "next"
+    if cursor:
+        c_date, c_id, direction = decode_cursor(cursor)
+        key = tuple_(date_col, id_col)
+        # Lire "après" en ordre décroissant = valeurs plus petites, et inversement
+        forward = (direction == "next") == descending
+        query = query.filter(key < tuple_(c_date, c_id) if forward else key > tuple_(c_date, c_id))
+
+    # En sens "prev", on lit à rebours puis on remet les lignes dans l'ordre
+    reverse = direction == "prev"
+    ascending = descending == reverse
+    order = (date_col.asc(), id_col.asc()) if ascending else (date_col.desc(), id_col.desc())
+
+    rows = query.order_by(*order).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if reverse:
+        rows.reverse()
+
+    if not rows:
+        return rows, None, None
+
+    first, last = rows[0], rows[-1]
+    date_key, id_key = date_col.key, id_col.key
+    if reverse:
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, cursor is not None
+
+    next_cursor = encode_cursor(getattr(last, date_key), getattr(last, id_key), "next") if has_next else None
+    prev_cursor = encode_cursor(getattr(first, date_key), getattr(first, id_key), "prev") if has_prev else None
+    return rows, next_cursor, prev_cursor
+
+
+def ensure_keyset_indexes(engine: Engine) -> None:
+    """Crée (idempotent) les index keyset sur une base créée avant leur ajout."""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table, name in KEYSET_INDEXES.items():
+            if not inspector.has_table(table.name):
+                continue
+            index = next(i for i in table.indexes if i.name == name)
+            conn.execute(CreateIndex(index, if_not_exists=True))
@@ -0,0 +1,169 @@
+# app/services/principal_cache.py
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.config import settings
+from app.models.utilisateur import Utilisateur
+from app.services.token_versions import token_versions
+from app.services.list_cache import taches_list_cache
+
+# ==========================================================
+# 🔹 CONFIGURATION
+# ==========================================================
+# Colonnes gardées en cache : le hash du mot de passe n'y est jamais stocké,
+# il est rechargé à la demande par SQLAlchemy si une route en a besoin.
+PRINCIPAL_COLUMNS = (
+    "id",
+    "nom",
+    "email",
+    "type",
+    "equipe",
+    "poste",
+    "telephone",
+    "adresse",
+    "date_embauche",
+    "date",
+    "is_active",
+    "avatar_url",
+    "token_version",
+)
+
+
+class PrincipalCache:
+    """
+    Cache LRU + TTL des utilisateurs authentifiés, indexé par le `sub` du JWT.
+    Thread-safe : les routes sync de FastAPI tournent dans un pool de threads.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self._subs_by_user: dict[int, set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # ------------------------------------------------------
+    # Lecture / écriture
+    # ------------------------------------------------------
+    def get(self, sub: str) -> dict | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(sub)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, data = entry
+            if expires_at <= now:
+                self._remove(sub)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(sub)
+            self.hits += 1
+            return data
+
+    def put(self, sub: str, data: dict) -> None:
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+
+        with self._lock:
+            if sub in self._entries:
+                self._remove(sub)
+
+            self._entries[sub] = (time.monotonic() + self.ttl_seconds, data)
+            self._subs_by_user.setdefault(data["id"], set()).add(sub)
+
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    # ------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------
+    def invalidate(self, user_id: int | None = None, email: str | None = None) -> None:
+        """Supprime toutes les entrées d'un utilisateur (par id et/ou email)."""
+        with self._lock:
+            subs = set()
+            if user_id is not None:
+                subs |= self._subs_by_user.get(user_id, set())
+                subs.add(str(user_id))
+            if email:
+                subs.add(email)
+
+            for sub in subs:
+                if sub in self._entries:
+                    self._remove(sub)
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._subs_by_user.clear()
+
+    def _remove(self, sub: str) -> None:
+        _, data = self._entries.pop(sub)
+        subs = self._subs_by_user.get(data["id"])
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._subs_by_user[data["id"]]
+
+    # ------------------------------------------------------
+    # Métriques
+    # ------------------------------------------------------
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+# ==========================================================
+# 🔹 HELPERS
+# ==========================================================
+def snapshot_user(user: Utilisateur) -> dict:
+    """Copie les colonnes utiles d'un utilisateur ORM dans un dict immuable."""
+    return {col: getattr(user, col) for col in PRINCIPAL_COLUMNS}
+
+
+def attach_user(data: dict, db: Session) -> Utilisateur:
+    """
+    Reconstruit un `Utilisateur` persistant dans la session courante à partir
+    d'un snapshot, sans SELECT. Les colonnes absentes (mot de passe) et les
+    relations sont chargées à la demande.
+    """
+    user = Utilisateur(**data)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
+
+def invalidate_user(user_id: int | None = None, email: str | None = None) -> None:
+    """Hook appelé après toute écriture qui modifie un utilisateur."""
+    principal_cache.invalidate(user_id=user_id, email=email)
+    if user_id is not None:
+        token_versions.forget(user_id)
+    # Les listes de tâches embarquent les profils (auteur, assigné)
+    taches_list_cache.clear()
@@ -0,0 +1,356 @@
+# app/services/resumable_uploads.py
+import hashlib
+import json
+import os
+import re
+import secrets
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.fichier import FichierTache
+from app.models.tache import Tache
+from app.services import uploads
+from app.services.downloads import can_access_tache
+from app.services.list_cache import invalidate_tache_lists
+from app.services.uploads import StoredUpload, acquire_blobs, discard_uploads, new_fichier, safe_filename
+
+# ==========================================================
+# ⏯ UPLOAD REPRENABLE (connexions instables)
+# ==========================================================
+# 1. POST   /taches/uploads                   -> session (upload_id, chunk_size)
+# 2. PUT    /taches/uploads/{id}?offset=N     -> un bloc, écrit à l'offset N
+#    GET    /taches/uploads/{id}              -> offset atteint, pour reprendre
+# 3. POST   /taches/uploads/{id}/finalize     -> fichier publié dans le magasin
+#                                                et rattaché à une tâche
+# Une session = un dossier uploads/sessions/<id> (meta.json + data.part), sur
+# le même système de fichiers que les blobs (publication par lien/renommage).
+# - blocs strictement séquentiels : un offset en avance -> 409 avec l'offset
+#   attendu ; un bloc déjà reçu (réponse perdue) et identique est accepté
+# - empreinte SHA-256 de chaque bloc gardée dans meta.json ; en-tête
+#   X-Chunk-SHA256 facultatif vérifié à la réception, sha256 du fichier
+#   (facultatif) vérifié à la finalisation
+# - expiration glissante (RESUMABLE_SESSION_TTL_SECONDS) ; les sessions
+#   expirées sont supprimées au plus toutes les RESUMABLE_GC_INTERVAL_SECONDS
+SESSION_DIR = "sessions"
+_ID_RE = re.compile(r"^[A-Za-z0-9_-]{22}$")
+_WRITE_BYTES = 1024 * 1024    # écritures disque regroupées par Mo
+
+_busy: set[str] = set()
+_busy_lock = threading.Lock()
+_last_gc = 0.0
+
+
+def _sessions_root() -> str:
+    return os.path.join(uploads.UPLOAD_DIR, SESSION_DIR)
+
+
+def _session_dir(upload_id: str) -> str:
+    if not _ID_RE.match(upload_id):
+        raise HTTPException(status_code=404, detail="Session d'upload inconnue ou expirée.")
+    return os.path.join(_sessions_root(), upload_id)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _expires_at() -> str:
+    return (_now() + timedelta(seconds=settings.RESUMABLE_SESSION_TTL_SECONDS)).isoformat()
+
+
+# ==========================================================
+# 💾 MÉTADONNÉES
+# ==========================================================
+def _read_meta(directory: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_meta(directory: str, meta: dict) -> None:
+    """Écriture atomique : une coupure ne laisse jamais un meta.json tronqué."""
+    path = os.path.join(directory, "meta.json")
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def _expired(meta: dict) -> bool:
+    return datetime.fromisoformat(meta["expires_at"]) <= _now()
+
+
+def _load(upload_id: str, current_user) -> tuple[str, dict]:
+    directory = _session_dir(upload_id)
+    meta = _read_meta(directory)
+    if meta is None or _expired(meta):
+        if meta is not None:
+            _remove_session(directory)
+        raise HTTPException(status_code=404, detail="Session d'upload inconnue ou expirée.")
+    if meta["owner_id"] != current_user.id:
+        raise HTTPException(status_code=403, detail="Session d'upload d'un autre utilisateur.")
+    return directory, meta
+
+
+def _remove_session(directory: str) -> None:
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def session_out(meta: dict) -> dict:
+    return {
+        "upload_id": meta["id"],
+        "nom_fichier": meta["nom_fichier"],
+        "taille": meta["taille"],
+        "offset": meta["offset"],
+        "chunk_size": settings.RESUMABLE_CHUNK_BYTES,
+        "expires_at": meta["expires_at"],
+    }
+
+
+class _Busy:
+    """Un seul PUT / une seule finalisation à la fois par session (dans ce processus)."""
+
+    def __init__(self, upload_id: str):
+        self.upload_id = upload_id
+
+    def __enter__(self):
+        with _busy_lock:
+            if self.upload_id in _busy:
+                raise HTTPException(status_code=409, detail="Bloc déjà en cours d'écriture pour cette session.")
+            _busy.add(self.upload_id)
+
+    def __exit__(self, *exc):
+        with _busy_lock:
+            _busy.discard(self.upload_id)
+
+
+# ==========================================================
+# 1️⃣ CRÉATION / ÉTAT / ABANDON
+# ==========================================================
+def create_session_service(nom_fichier: str, taille: int, sha256: Optional[str], current_user) -> dict:
+    nom_fichier = safe_filename(nom_fichier)
+    if taille > settings.RESUMABLE_MAX_FILE_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Fichier trop volumineux : {nom_fichier} "
+                   f"(max {settings.RESUMABLE_MAX_FILE_BYTES // (1024 * 1024)} Mo).",
+        )
+
+    maybe_gc_sessions()
+    if _count_sessions(current_user.id) >= settings.RESUMABLE_MAX_SESSIONS_PER_USER:
+        raise HTTPException(status_code=429, detail="Trop d'uploads en cours : terminez ou annulez-en un.")
+
+    upload_id = secrets.token_urlsafe(16)
+    directory = _session_dir(upload_id)
+    os.makedirs(directory)
+    open(os.path.join(directory, "data.part"), "wb").close()
+
+    meta = {
+        "id": upload_id,
+        "owner_id": current_user.id,
+        "nom_fichier": nom_fichier,
+        "taille": taille,
+        "sha256": sha256.lower() if sha256 else None,
+        "offset": 0,
+        "chunks": [],                 # [offset, longueur, sha256]
+        "created_at": _now().isoformat(),
+        "expires_at": _expires_at(),
+    }
+    _write_meta(directory, meta)
+    return session_out(meta)
+
+
+def get_session_service(upload_id: str, current_user) -> dict:
+    return session_out(_load(upload_id, current_user)[1])
+
+
+def abort_session_service(upload_id: str, current_user) -> None:
+    directory, _ = _load(upload_id, current_user)
+    with _Busy(upload_id):
+        _remove_session(directory)
+
+
+# ==========================================================
+# 2️⃣ BLOCS
+# ==========================================================
+def _conflict(meta: dict) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail=f"Offset inattendu : reprendre à {meta['offset']}.",
+        headers={"Upload-Offset": str(meta["offset"])},
+    )
+
+
+async def _receive(stream: AsyncIterator[bytes], out, limit: int, too_large: str):
+    """Écrit le corps par paquets d'au plus _WRITE_BYTES ; retourne (taille, sha256)."""
+    digest = hashlib.sha256()
+    size = 0
+    buffer = bytearray()
+    async for piece in stream:
+        size += len(piece)
+        if size > limit:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=too_large)
+        digest.update(piece)
+        if out is not None:
+            buffer += piece
+            if len(buffer) >= _WRITE_BYTES:
+                await run_in_threadpool(out.write, bytes(buffer))
+                buffer.clear()
+    if out is not None and buffer:
+        await run_in_threadpool(out.write, bytes(buffer))
+    return size, digest.hexdigest()
+
+
+async def write_chunk_service(upload_id: str, offset: int, stream: AsyncIterator[bytes],
+                              chunk_sha256: Optional[str], current_user) -> dict:
+    directory, meta = await run_in_threadpool(_load, upload_id, current_user)
+    with _Busy(upload_id):
+        meta = await run_in_threadpool(_read_meta, directory) or meta
+
+        # Bloc déjà reçu (réponse perdue) : accepté s'il est identique
+        if offset < meta["offset"]:
+            size, digest = await _receive(stream, None, settings.RESUMABLE_CHUNK_BYTES, "Bloc trop volumineux.")
+            if [offset, size, digest] in meta["chunks"]:
+                return session_out(meta)
+            raise _conflict(meta)
+        if offset > meta["offset"]:
+            raise _conflict(meta)
+
+        limit = min(settings.RESUMABLE_CHUNK_BYTES, meta["taille"] - offset)
+        path = os.path.join(directory, "data.part")
+        out = await run_in_threadpool(open, path, "r+b")
+        try:
+            # Reste d'un bloc interrompu au-delà de l'offset validé : écrasé
+            await run_in_threadpool(out.truncate, offset)
+            await run_in_threadpool(out.seek, offset)
+            size, digest = await _receive(
+                stream, out, limit,
+                f"Bloc trop volumineux (max {limit} octets à l'offset {offset}).",
+            )
+            if chunk_sha256 and chunk_sha256.lower() != digest:
+                await run_in_threadpool(out.truncate, offset)
+                raise HTTPException(status_code=400, detail="Somme de contrôle du bloc invalide.")
+        finally:
+            await run_in_threadpool(out.close)
+
+        if size:
+            meta["offset"] = offset + size
+            meta["chunks"].append([offset, size, digest])
+        meta["expires_at"] = _expires_at()
+        await run_in_threadpool(_write_meta, directory, meta)
+    return session_out(meta)
+
+
+# ==========================================================
+# 3️⃣ FINALISATION
+# ==========================================================
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(settings.UPLOAD_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def finalize_session_service(upload_id: str, tache_id: int, db: Session, current_user) -> FichierTache:
+    directory, meta = _load(upload_id, current_user)
+    with _Busy(upload_id):
+        if meta["offset"] != meta["taille"]:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Upload incomplet : {meta['offset']}/{meta['taille']} octets reçus.",
+                headers={"Upload-Offset": str(meta["offset"])},
+            )
+        tache = db.execute(
+            select(Tache.id, Tache.auteur_id, Tache.assign_to_id).where(Tache.id == tache_id)
+        ).first()
+        if tache is None:
+            raise HTTPException(status_code=404, detail="Tâche non trouvée")
+        # Mêmes droits que pour lire les pièces jointes de la tâche
+        if not can_access_tache(current_user, tache.auteur_id, tache.assign_to_id):
+            raise HTTPException(status_code=403, detail="Accès refusé à cette tâche.")
+
+        path = os.path.join(directory, "data.part")
+        sha256 = _hash_file(path)
+        if meta["sha256"] and meta["sha256"] != sha256:
+            _remove_session(directory)
+            raise HTTPException(status_code=400, detail="Somme de contrôle du fichier invalide : upload à recommencer.")
+
+        chemin, created, mtime_ns = uploads.place_blob(path, sha256)
+        stored = StoredUpload(
+            nom_fichier=meta["nom_fichier"], chemin=chemin, taille=meta["taille"], sha256=sha256,
+            created=created, mtime_ns=mtime_ns,
+        )
+        fichier = new_fichier(stored, tache_id=tache_id)
+        db.add(fichier)
+        try:
+            acquire_blobs(db, [stored])
+            db.commit()
+        except Exception:
+            db.rollback()
+            discard_uploads([stored], db)
+            raise
+        _remove_session(directory)
+
+    db.refresh(fichier)
+    invalidate_tache_lists(tache_id, tache.assign_to_id)
+    return fichier
+
+
+# ==========================================================
+# 🧹 SESSIONS ABANDONNÉES
+# ==========================================================
+def _iter_sessions():
+    root = _sessions_root()
+    if not os.path.isdir(root):
+        return
+    for entry in os.scandir(root):
+        if entry.is_dir():
+            yield entry
+
+
+def _count_sessions(owner_id: int) -> int:
+    count = 0
+    for entry in _iter_sessions():
+        meta = _read_meta(entry.path)
+        count += int(meta is not None and meta["owner_id"] == owner_id and not _expired(meta))
+    return count
+
+
+def gc_sessions() -> int:
+    """Supprime les sessions expirées (ou sans meta.json depuis plus d'un TTL) ; retourne leur nombre."""
+    removed = 0
+    for entry in _iter_sessions():
+        with _busy_lock:
+            if entry.name in _busy:
+                continue
+        meta = _read_meta(entry.path)
+        if meta is None:
+            stale = time.time() - entry.stat().st_mtime > settings.RESUMABLE_SESSION_TTL_SECONDS
+        else:
+            stale = _expired(meta)
+        if stale:
+            _remove_session(entry.path)
+            removed += 1
+    return removed
+
+
+def maybe_gc_sessions() -> int:
+    """Nettoyage au fil des créations de session, au plus une fois par intervalle."""
+    global _last_gc
+    now = time.monotonic()
+    with _busy_lock:
+        if now - _last_gc < settings.RESUMABLE_GC_INTERVAL_SECONDS and _last_gc:
+            return 0
+        _last_gc = now
+    return gc_sessions()
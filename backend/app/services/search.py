@@ -0,0 +1,96 @@
+# app/services/search.py
+import re
+
+from sqlalchemy import func, literal_column, select, text, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query
+
+from app.config import settings
+from app.models.tache import Tache, SEARCH_DDL_POSTGRESQL, SEARCH_DDL_SQLITE
+from app.models.utilisateur import TRIGRAM_DDL_POSTGRESQL
+
+# ==========================================================
+# 🔎 RECHERCHE PLEIN TEXTE DES TÂCHES
+# ==========================================================
+# - PostgreSQL : taches.search_vector @@ websearch_to_tsquery('french', ...)
+#                servi par l'index GIN idx_tache_search, classement ts_rank_cd
+# - SQLite     : table FTS5 taches_fts (préfixes, sans stemming), classement bm25
+# - Sinon, ou SEARCH_BACKEND=ilike : ancien filtre ILIKE '%terme%' (aussi
+#   pour une saisie sans aucun mot sous SQLite)
+SEARCH_DIALECTS = ("postgresql", "sqlite")
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def search_backend(query: Query) -> str:
+    if settings.SEARCH_BACKEND == "ilike":
+        return "ilike"
+    dialect = query.session.get_bind().dialect.name
+    return dialect if dialect in SEARCH_DIALECTS else "ilike"
+
+
+def _fts5_expression(search: str) -> str | None:
+    """Transforme la saisie libre en requête FTS5 sûre : chaque mot en préfixe, ET implicite."""
+    tokens = _TOKEN_RE.findall(search)
+    if not tokens:
+        return None
+    return " ".join(f'"{tok}"*' for tok in tokens)
+
+
+def apply_search(query: Query, search: str):
+    """
+    Filtre `query` (sur Tache) par recherche plein texte.
+    Retourne (query, ordre_pertinence) ; l'ordre est None pour le repli ILIKE.
+    L'ordre est appliqué par l'appelant, après le comptage.
+    """
+    backend = search_backend(query)
+
+    if backend == "postgresql":
+        tsquery = func.websearch_to_tsquery("french", search)
+        vector = literal_column("taches.search_vector")
+        query = query.filter(vector.op("@@")(tsquery))
+        return query, (func.ts_rank_cd(vector, tsquery).desc(), Tache.created_at.desc(), Tache.id.desc())
+
+    # Saisie sans mot (ponctuation seule) : pas de requête FTS5, repli ILIKE
+    expression = _fts5_expression(search) if backend == "sqlite" else None
+    if expression is not None:
+        matches = (
+            select(
+                literal_column("rowid").label("tache_id"),
+                literal_column("bm25(taches_fts, 2.0, 1.0)").label("score"),
+            )
+            .select_from(text("taches_fts"))
+            .where(text("taches_fts MATCH :fts_query").bindparams(fts_query=expression))
+            .subquery("fts")
+        )
+        query = query.join(matches, matches.c.tache_id == Tache.id)
+        # bm25 : plus petit = plus pertinent
+        return query, (matches.c.score.asc(), Tache.created_at.desc(), Tache.id.desc())
+
+    query = query.filter(
+        Tache.titre.ilike(f"%{search}%") |
+        Tache.contenu.ilike(f"%{search}%")
+    )
+    return query, None
+
+
+def ensure_search_schema(engine: Engine) -> None:
+    """
+    Crée (idempotent) la colonne/index ou la table FTS5, ainsi que les index
+    trigrammes des utilisateurs, sur une base créée avant leur ajout.
+    """
+    dialect = engine.dialect.name
+    if dialect not in SEARCH_DIALECTS or not inspect(engine).has_table("taches"):
+        return
+
+    with engine.begin() as conn:
+        if dialect == "postgresql":
+            for stmt in SEARCH_DDL_POSTGRESQL + TRIGRAM_DDL_POSTGRESQL:
+                conn.exec_driver_sql(stmt)
+            return
+
+        existed = inspect(conn).has_table("taches_fts")
+        for stmt in SEARCH_DDL_SQLITE:
+            conn.exec_driver_sql(stmt)
+        if not existed:
+            conn.exec_driver_sql("INSERT INTO taches_fts(taches_fts) VALUES ('rebuild')")
@@ -1,16 +1,21 @@
 # some_ai_module.py
-from textwrap import shorten
+from app.services.summarizer import summarize, summarize_batch
+
+PREFIX = "Résumé automatique : "
+
 
 def generate_summary(contenu: str) -> str:
     """
     Génère un résumé automatique du texte.
-    Pour l'instant : version simplifiée sans IA (tronque le texte proprement)
+    Résumé extractif hors ligne (TextRank, voir app/services/summarizer.py) :
+    les phrases les plus représentatives, 200 caractères au plus.
     """
     if not contenu:
         return ""
 
-    # Si tu veux faire un résumé plus "intelligent", tu pourras ici
-    # utiliser un vrai modèle (HuggingFace, OpenAI, etc.)
-    resume = shorten(contenu, width=200, placeholder="...")
+    return f"{PREFIX}{summarize(contenu)}"
+
 
-    return f"Résumé automatique : {resume}"
\ No newline at end of file
+def generate_summaries(contenus: list[str]) -> list[str]:
+    """Version par lot de `generate_summary` (rattrapages, imports en masse)."""
+    return [f"{PREFIX}{resume}" if contenu else "" for contenu, resume in zip(contenus, summarize_batch(contenus))]
@@ -0,0 +1,210 @@
+# app/services/summaries.py
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.models.tache import Tache
+from app.services.some_ai_module import generate_summary
+from app.services.list_cache import invalidate_tache_lists
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# 🧠 RÉSUMÉS IA EN ARRIÈRE-PLAN
+# ==========================================================
+# Le résumé n'est plus calculé sur le chemin de lecture (GET /taches/{id}) :
+# création et modification du contenu soumettent un job, le détail se
+# contente de lire `resume_ia`.
+# - un job par tâche : déjà en attente -> ignoré ; en cours -> relancé une
+#   fois terminé (le contenu a pu changer entre-temps)
+# - pool borné : au-delà de max_workers + max_pending, le job est abandonné
+#   (compté dans `rejected`) ; la tâche reste sans résumé jusqu'au prochain
+#   changement de contenu ou à un rattrapage
+# - l'écriture est conditionnée au contenu lu : un résumé périmé n'est jamais posé
+MIN_CONTENU_LENGTH = 100
+
+
+def needs_summary(contenu: str | None) -> bool:
+    return bool(contenu) and len(contenu) > MIN_CONTENU_LENGTH
+
+
+def summarize_tache(tache_id: int, session_factory: sessionmaker) -> bool:
+    """Calcule et enregistre le résumé d'une tâche ; True si une ligne a été écrite."""
+    with session_factory() as db:
+        row = db.execute(
+            select(Tache.contenu, Tache.resume_ia, Tache.assign_to_id).where(Tache.id == tache_id)
+        ).first()
+        if row is None or row.resume_ia or not needs_summary(row.contenu):
+            return False
+
+        resume = generate_summary(row.contenu)
+
+        result = db.execute(
+            update(Tache)
+            .where(Tache.id == tache_id, Tache.contenu == row.contenu)
+            # updated_at inchangé : un résumé n'est pas une modification utilisateur
+            .values({Tache.resume_ia: resume, Tache.updated_at: Tache.updated_at})
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+    if not result.rowcount:
+        return False
+    invalidate_tache_lists(tache_id, row.assign_to_id)
+    return True
+
+
+class SummaryQueue:
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: ThreadPoolExecutor | None = None
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+
+        self._session_factory: sessionmaker | None = None
+        self._queued: set[int] = set()
+        self._running: set[int] = set()
+        self._rerun: set[int] = set()
+
+        self.submitted = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self.completed = 0
+        self.written = 0
+        self.errors = 0
+        self.last_job_ms = 0.0
+
+    # ------------------------------------------------------
+    # Soumission (dédoublonnée, bornée, sans jamais bloquer l'appelant)
+    # ------------------------------------------------------
+    def submit(self, tache_id: int) -> bool:
+        with self._lock:
+            if self._session_factory is None:
+                return False
+            if tache_id in self._queued:
+                self.deduplicated += 1
+                return True
+            if tache_id in self._running:
+                self._rerun.add(tache_id)
+                self.deduplicated += 1
+                return True
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            logger.warning("File des résumés saturée : tâche %s ignorée", tache_id)
+            return False
+
+        with self._lock:
+            self.submitted += 1
+            self._queued.add(tache_id)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="summaries"
+                )
+            executor = self._executor
+
+        try:
+            executor.submit(self._run, tache_id)
+        except Exception:
+            with self._lock:
+                self._queued.discard(tache_id)
+                self._idle.notify_all()
+            self._slots.release()
+            raise
+        return True
+
+    def _run(self, tache_id: int) -> None:
+        with self._lock:
+            self._queued.discard(tache_id)
+            self._running.add(tache_id)
+            session_factory = self._session_factory
+
+        t0 = time.perf_counter()
+        written = False
+        failed = False
+        try:
+            written = session_factory is not None and summarize_tache(tache_id, session_factory)
+        except Exception:
+            failed = True
+            logger.exception("Échec du résumé de la tâche %s", tache_id)
+
+        with self._lock:
+            self._running.discard(tache_id)
+            rerun = tache_id in self._rerun
+            self._rerun.discard(tache_id)
+            self.completed += 1
+            self.written += int(written)
+            self.errors += int(failed)
+            self.last_job_ms = (time.perf_counter() - t0) * 1000
+            self._idle.notify_all()
+        self._slots.release()
+
+        if rerun:
+            self.submit(tache_id)
+
+    # ------------------------------------------------------
+    # Cycle de vie
+    # ------------------------------------------------------
+    def start(self, session_factory: sessionmaker) -> None:
+        """Active la file ; sans session factory (tests, scripts), `submit` ne fait rien."""
+        with self._lock:
+            self._session_factory = session_factory
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """Attend que la file soit vide ; False si `timeout` est atteint avant."""
+        with self._idle:
+            return self._idle.wait_for(
+                lambda: not self._queued and not self._running, timeout=timeout
+            )
+
+    def shutdown(self) -> None:
+        """Termine les jobs en cours puis désactive la file."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        with self._lock:
+            self._session_factory = None
+
+    def clear(self) -> None:
+        self.drain()
+        with self._lock:
+            self._rerun.clear()
+            self.submitted = self.deduplicated = self.rejected = 0
+            self.completed = self.written = self.errors = 0
+            self.last_job_ms = 0.0
+
+    # ------------------------------------------------------
+    # Métriques
+    # ------------------------------------------------------
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "running": self._session_factory is not None,
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "queued": len(self._queued),
+                "in_progress": len(self._running),
+                "submitted": self.submitted,
+                "deduplicated": self.deduplicated,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "written": self.written,
+                "errors": self.errors,
+                "last_job_ms": round(self.last_job_ms, 2),
+            }
+
+
+summary_queue = SummaryQueue(
+    max_workers=settings.SUMMARY_MAX_WORKERS,
+    max_pending=settings.SUMMARY_MAX_PENDING,
+)
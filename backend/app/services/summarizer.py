@@ -0,0 +1,185 @@
+# app/services/summarizer.py
+import re
+from textwrap import shorten
+
+import numpy as np
+
+# ==========================================================
+# 🧠 RÉSUMÉ EXTRACTIF (TextRank sur TF-IDF, hors ligne)
+# ==========================================================
+# 1. découpage en phrases, mots en minuscules sans mots vides (FR + EN)
+# 2. TF-IDF par phrase (IDF calculé sur les phrases de la tâche)
+# 3. similarité cosinus entre phrases, puis PageRank sur ce graphe
+# 4. les phrases les mieux classées sont gardées, dans l'ordre du texte,
+#    jusqu'à `max_chars`
+# Étape 2-3 : par document, à partir des seules occurrences (représentation
+# creuse) ; la matrice dense (phrases × termes) n'est construite que par
+# tranches de TERM_CHUNK termes. Mémoire : O(occurrences + phrases²).
+# Étape 3 (PageRank) : vectorisée par lots de tâches de taille voisine,
+# tenseur (tâches × phrases × phrases) borné par MAX_SENTENCES.
+# Le résultat d'une tâche ne dépend pas du lot dans lequel elle est traitée.
+MAX_CHARS = 200
+MAX_SENTENCES = 100       # au-delà, les phrases suivantes sont ignorées
+BLOCK_SIZE = 128          # tâches par passe vectorisée (PageRank)
+TERM_CHUNK = 4096         # termes par produit dense dans la similarité
+DAMPING = 0.85
+ITERATIONS = 30
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?…])\s+|\s*[\r\n]+\s*")
+# Lettres uniquement : les élisions (l', qu', d'...) tombent d'elles-mêmes
+_WORD_RE = re.compile(r"[^\W\d_]{2,}")
+
+STOPWORDS = frozenset("""
+    au aux avec ce ces cet cette dans de des du elle elles en et eux il ils je la le les leur
+    leurs lui ma mais me meme même mes moi mon ne nos notre nous on ou où par pas pour qu que
+    qui sa se ses son sur ta te tes toi ton tu un une vos votre vous est sont ai as avons avez
+    ont été être avoir fait faire plus moins très tout tous toute toutes aussi alors donc car
+    ni si comme quand depuis encore déjà bien sans sous entre vers chez cela ça ceci celui
+    celle ceux dont lors puis ici là y
+
+    a an and are as at be been but by can could did do does for from had has have he her his
+    how i if in into is it its just me my no not of on or our out she so than that the their
+    them then there these they this those to too up us was we were what when where which who
+    why will with would you your yours all any also after before about again more most only
+    other some such very should
+""".split())
+
+
+def _split_sentences(text: str) -> list[str]:
+    sentences = [s.strip() for s in _SENTENCE_RE.split(text)]
+    return [s for s in sentences if s][:MAX_SENTENCES]
+
+
+def _tokenize(sentence: str) -> list[str]:
+    return [w for w in _WORD_RE.findall(sentence.lower()) if w not in STOPWORDS]
+
+
+class _Document:
+    """Phrases d'une tâche et leurs termes (identifiants locaux à la tâche)."""
+    __slots__ = ("text", "sentences", "rows", "cols", "n_terms")
+
+    def __init__(self, text: str):
+        self.text = " ".join(text.split())
+        self.sentences = _split_sentences(text)
+
+        vocabulary: dict[str, int] = {}
+        rows: list[int] = []
+        cols: list[int] = []
+        for i, sentence in enumerate(self.sentences):
+            for word in _tokenize(sentence):
+                rows.append(i)
+                cols.append(vocabulary.setdefault(word, len(vocabulary)))
+        self.rows = rows
+        self.cols = cols
+        self.n_terms = len(vocabulary)
+
+
+def _similarity(doc: _Document) -> np.ndarray:
+    """
+    Similarité cosinus TF-IDF entre les phrases d'un document (sans boucles).
+    IDF calculé sur les phrases du document, vecteurs normalisés (L2).
+    """
+    k, v = len(doc.sentences), doc.n_terms
+    # Occurrences regroupées par (phrase, terme) : tf des seules cases non nulles
+    keys, tf = np.unique(
+        np.asarray(doc.rows, dtype=np.int64) * v + np.asarray(doc.cols, dtype=np.int64),
+        return_counts=True,
+    )
+    rows, cols = keys // v, keys % v
+
+    df = np.bincount(cols, minlength=v)
+    idf = np.log((1.0 + k) / (1.0 + df)) + 1.0
+    weights = tf * idf[cols]
+    # Une phrase présente ici a au moins un terme : norme > 0
+    weights /= np.sqrt(np.bincount(rows, weights=weights * weights, minlength=k))[rows]
+
+    sim = np.zeros((k, k))
+    for start in range(0, v, TERM_CHUNK):
+        in_chunk = (cols >= start) & (cols < start + TERM_CHUNK)
+        dense = np.zeros((k, min(TERM_CHUNK, v - start)))
+        dense[rows[in_chunk], cols[in_chunk] - start] = weights[in_chunk]
+        sim += dense @ dense.T
+    np.fill_diagonal(sim, 0.0)
+    return sim
+
+
+def _textrank_block(docs: list[_Document]) -> list[np.ndarray]:
+    """Scores TextRank de chaque phrase, pour un lot de documents, en une passe."""
+    b = len(docs)
+    k = max(len(d.sentences) for d in docs)
+
+    # Graphes de similarité complétés par des zéros (documents × phrases × phrases)
+    sim = np.zeros((b, k, k))
+    for n, doc in enumerate(docs):
+        size = len(doc.sentences)
+        sim[n, :size, :size] = _similarity(doc)
+
+    n_sent = np.array([len(d.sentences) for d in docs], dtype=float)
+    valid = np.arange(k)[None, :] < n_sent[:, None]                  # (b, k)
+
+    # Matrice de transition ; une phrase isolée redistribue uniformément
+    out_weight = sim.sum(axis=2, keepdims=True)
+    uniform = valid[:, None, :] / n_sent[:, None, None]
+    transition = np.where(out_weight > 0, sim / np.where(out_weight > 0, out_weight, 1.0), uniform)
+
+    scores = valid / n_sent[:, None]
+    teleport = (1.0 - DAMPING) * scores
+    for _ in range(ITERATIONS):
+        scores = teleport + DAMPING * np.einsum("bij,bi->bj", transition, scores)
+        scores *= valid
+
+    return [scores[n, : len(d.sentences)] for n, d in enumerate(docs)]
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    """Coupe sur un mot si possible, sinon au caractère (mot unique trop long)."""
+    short = shorten(text, width=max_chars, placeholder="...")
+    return short if short != "..." else text[: max_chars - 3] + "..."
+
+
+def _select(doc: _Document, scores: np.ndarray, max_chars: int) -> str:
+    """Meilleures phrases dans l'ordre du texte, dans la limite de `max_chars`."""
+    chosen: list[int] = []
+    length = 0
+    # Tri stable : à score égal, la phrase la plus proche du début l'emporte
+    for i in np.argsort(-scores, kind="stable"):
+        size = len(doc.sentences[i]) + (1 if chosen else 0)
+        if length + size <= max_chars:
+            chosen.append(int(i))
+            length += size
+
+    if not chosen:
+        best = int(np.argmax(scores))
+        return _truncate(doc.sentences[best], max_chars)
+    return " ".join(doc.sentences[i] for i in sorted(chosen))
+
+
+def summarize_batch(texts: list[str], max_chars: int = MAX_CHARS) -> list[str]:
+    """Résume plusieurs textes ; coût linéaire en nombre de textes."""
+    results: list[str] = [""] * len(texts)
+    to_rank: list[tuple[int, _Document]] = []
+
+    for n, text in enumerate(texts):
+        if not text or not text.strip():
+            continue
+        doc = _Document(text)
+        if len(doc.text) <= max_chars:
+            results[n] = doc.text
+        elif len(doc.sentences) < 2 or doc.n_terms == 0:
+            results[n] = _truncate(doc.text, max_chars)
+        else:
+            to_rank.append((n, doc))
+
+    # Lots de documents de taille voisine : peu de remplissage dans le tenseur
+    to_rank.sort(key=lambda item: len(item[1].sentences))
+    for start in range(0, len(to_rank), BLOCK_SIZE):
+        block = to_rank[start:start + BLOCK_SIZE]
+        scores = _textrank_block([doc for _, doc in block])
+        for (n, doc), doc_scores in zip(block, scores):
+            results[n] = _select(doc, doc_scores, max_chars)
+
+    return results
+
+
+def summarize(text: str, max_chars: int = MAX_CHARS) -> str:
+    return summarize_batch([text], max_chars)[0]
@@ -1,19 +1,36 @@
 from fastapi import HTTPException, UploadFile
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload, aliased
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import select, func, update, delete, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from typing import List, Optional
-import os, shutil
 from datetime import datetime
 
 from app.models.tache import Tache
 from app.models.commentaire import Commentaire
 from app.models.utilisateur import Utilisateur
 from app.models.fichier import FichierTache
-from app.schemas.schemas import CommentaireCreate, CommentaireOut
+from app.models.like import TacheLike
+from app.schemas.schemas import CommentaireCreate, CommentaireOut, CommentaireLiteOut, TacheOut, TacheDetailOut
+
+from app.services.pagination import keyset_page, encode_cursor
+from app.services.counts import count_cache, count_query, invalidate_counts
+from app.services.search import apply_search
+from app.services.fieldsets import FieldSet
+from app.services.etags import make_etag, raise_if_not_modified
+from app.services.list_cache import invalidate_tache_lists
+from app.services.counter_buffers import view_counter, like_counter
+from app.services.commentaires import commentaires_lite_options
+from app.services.uploads import (
+    store_uploads, store_uploads_async, discard_uploads,
+    new_fichier, acquire_blobs, release_fichiers,
+)
+from app.services.summaries import summary_queue, needs_summary
+from app.config import settings
 
-from app.services.some_ai_module import generate_summary
-
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 
 # ==========================================================
@@ -24,6 +41,12 @@ def create_tache_service(
 ):
     final_auteur_id = auteur_id or current_user.id
 
+    # ---------------- FICHIERS ----------------
+    # Écrits avant la tâche (en flux, en parallèle : app/services/uploads.py) :
+    # une limite dépassée (413) ne laisse pas de tâche sans ses pièces jointes.
+    # Contenus dédoublonnés : compteurs de références validés avec la tâche.
+    stored_files = store_uploads(fichiers)
+
     tache = Tache(
         titre=titre,
         contenu=contenu,
@@ -31,47 +54,128 @@ def create_tache_service(
         auteur_id=final_auteur_id,
         priorite=priorite,
         categorie=categorie,
-        status="en_attente"   # 👈 nouvelle logique
+        status="en_attente",   # 👈 nouvelle logique
+        fichiers=[new_fichier(stored) for stored in stored_files],
     )
 
     db.add(tache)
-    db.commit()
+    try:
+        acquire_blobs(db, stored_files)
+        db.commit()
+    except Exception:
+        db.rollback()
+        discard_uploads(stored_files, db)
+        raise
+    invalidate_counts("taches")
     db.refresh(tache)
 
-    # ---------------- FICHIERS ----------------
-    if fichiers:
-        for f in fichiers:
-            filename = f.filename.replace("\\", "/").split("/")[-1]
-            file_path = os.path.join(UPLOAD_DIR, filename)
-
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(f.file, buffer)
-
-            new_file = FichierTache(
-                nom_fichier=filename,
-                chemin=file_path,
-                tache_id=tache.id
-            )
-            db.add(new_file)
-
-        db.commit()
-        db.refresh(tache)
+    invalidate_tache_lists(tache.id, tache.assign_to_id, membership=True)
 
+    # ---------------- RÉSUMÉ IA (arrière-plan) ----------------
+    if needs_summary(tache.contenu):
+        summary_queue.submit(tache.id)
     return tache
 
 
 # ==========================================================
 #                     LISTE FILTRÉE
 # ==========================================================
+def _summary_columns():
+    """
+    Projection de la vue `summary` : colonnes affichées par la liste seulement.
+    Noms et nombre de fichiers via sous-requêtes corrélées (PK / idx_fichier_tache),
+    pour ne pas entrer en conflit avec la jointure du filtre auteur.
+    """
+    auteur, assignee = aliased(Utilisateur), aliased(Utilisateur)
+    auteur_nom = select(auteur.nom).where(auteur.id == Tache.auteur_id).scalar_subquery()
+    assign_to_nom = select(assignee.nom).where(assignee.id == Tache.assign_to_id).scalar_subquery()
+    nb_fichiers = (
+        select(func.count(FichierTache.id))
+        .where(FichierTache.tache_id == Tache.id)
+        .scalar_subquery()
+    )
+    return (
+        Tache.id,
+        Tache.titre,
+        Tache.equipe,
+        Tache.categorie,
+        Tache.priorite,
+        Tache.status,
+        Tache.likes,
+        Tache.nb_vues,
+        Tache.created_at,
+        Tache.updated_at,
+        Tache.auteur_id,
+        auteur_nom.label("auteur_nom"),
+        Tache.assign_to_id,
+        assign_to_nom.label("assign_to_nom"),
+        nb_fichiers.label("nb_fichiers"),
+    )
+
+
+# Colonnes de version lues en plus des champs demandés par un sparse fieldset
+VERSION_COLUMNS = ("updated_at", "nb_vues", "likes")
+
+
+def _page_version(taches, view: str) -> tuple:
+    """
+    Version de la page renvoyée, lue sur les lignes déjà chargées (aucune
+    requête) : ce qui change sans toucher updated_at (vues, likes, pièces
+    jointes, résumé IA). Les profils embarqués (auteur, assigné) n'en font
+    pas partie.
+    """
+    if view == "summary":
+        return tuple((t.id, t.updated_at, t.nb_vues, t.likes, t.nb_fichiers) for t in taches)
+
+    def version(tache):
+        # Seulement les attributs chargés : un sparse fieldset n'en lit qu'une partie
+        loaded = inspect(tache).dict
+        fichiers = loaded.get("fichiers") or ()
+        return (
+            tache.id, loaded.get("updated_at"), loaded.get("nb_vues"), loaded.get("likes"),
+            loaded.get("resume_ia") is not None, tuple(sorted(f.id for f in fichiers)),
+        )
+
+    return tuple(version(t) for t in taches)
+
+
+def _fieldset_key(fieldset: Optional[FieldSet]):
+    return None if fieldset is None else (fieldset.columns, tuple(fieldset.relations.items()))
+
+
+def taches_list_cache_key(
+    current_user, search, author, assign_to, sort, page, limit, cursor, count, view, fieldset
+) -> tuple:
+    """
+    (périmètre, clé) du cache de réponses de GET /taches : filtres normalisés
+    comme le service les interprète, plus les paramètres de présentation.
+    """
+    is_admin = current_user.type == "admin"
+    scope = "admin" if is_admin else current_user.id
+
+    search = " ".join((search or "").split()).lower()          # recherche insensible à la casse
+    author = " ".join((author or "").split()).lower() if is_admin else ""  # ignoré hors admin
+    if sort not in ("date_asc", "relevance") or (sort == "relevance" and not search):
+        sort = "date_desc"
+
+    key = (scope, search, author, assign_to, sort, page, limit, cursor, count, view, _fieldset_key(fieldset))
+    return scope, key
+
+
 def list_taches_service(
     search,
     author,
-    assign_to,
     sort,
     page,
     limit,
     db: Session,
-    current_user: Utilisateur
+    current_user: Utilisateur,
+    assign_to: Optional[int] = None,
+    cursor: Optional[str] = None,
+    count: str = "exact",
+    view: str = "full",
+    fieldset: Optional[FieldSet] = None,
+    if_none_match: Optional[str] = None,
 ):
     # Admin = voit tout
     if current_user.type == "admin":
@@ -84,57 +188,167 @@ def list_taches_service(
     if assign_to:
         query = query.filter(Tache.assign_to_id == assign_to)
 
-    # Recherche
+    # Recherche plein texte (tsvector / FTS5, repli ILIKE)
+    relevance_order = None
     if search:
-        query = query.filter(
-            Tache.titre.ilike(f"%{search}%") |
-            Tache.contenu.ilike(f"%{search}%")
-        )
+        query, relevance_order = apply_search(query, search)
 
-    # Filtre auteur (admin only)
+    # Filtre auteur (admin only) — ILIKE servi par idx_utilisateur_nom_trgm
     if author and current_user.type == "admin":
         query = query.join(Tache.auteur).filter(
             Utilisateur.nom.ilike(f"%{author}%")
         )
 
-    # Tri
-    if sort == "date_asc":
-        query = query.order_by(Tache.created_at.asc())
+    descending = sort != "date_asc"
+
+    # Signature des filtres + périmètre de visibilité (clé du cache de total)
+    scope = "admin" if current_user.type == "admin" else current_user.id
+    signature = (scope, assign_to, search or "", (author or "") if current_user.type == "admin" else "")
+    # Génération de la table (créations / suppressions), lue avant le comptage
+    generation = count_cache.generation("taches")
+    total, count_mode = count_query(query, count, "taches", signature)
+
+    if view == "summary":
+        # Lignes Core (pas d'identity map, pas de relations chargées)
+        query = query.with_entities(*_summary_columns())
+    elif fieldset is not None:
+        # Sparse fieldset : colonnes et relations demandées seulement
+        query = query.options(*fieldset.options("created_at", *VERSION_COLUMNS))
     else:
-        query = query.order_by(Tache.created_at.desc())
-
-    total = query.count()
-
-    taches = (
-        query.options(
+        query = query.options(
             joinedload(Tache.auteur),
             joinedload(Tache.assign_to),
             joinedload(Tache.fichiers)
         )
-        .offset((page - 1) * limit)
-        .limit(limit)
-        .all()
+
+    # ---------------- TRI PAR PERTINENCE (opt-in) ----------------
+    if sort == "relevance" and relevance_order is not None:
+        if cursor:
+            raise HTTPException(status_code=400, detail="Le tri par pertinence ne supporte pas le mode curseur.")
+        taches = query.order_by(*relevance_order).offset((page - 1) * limit).limit(limit).all()
+        next_cursor = prev_cursor = None
+    # ---------------- MODE CURSEUR (keyset) ----------------
+    # Tri stable (created_at, id) servi par idx_tache_created_id
+    elif cursor:
+        taches, next_cursor, prev_cursor = keyset_page(
+            query, Tache.created_at, Tache.id, cursor, limit, descending
+        )
+    # ---------------- MODE PAGE (offset, compatibilité) ----------------
+    else:
+        if descending:
+            query = query.order_by(Tache.created_at.desc(), Tache.id.desc())
+        else:
+            query = query.order_by(Tache.created_at.asc(), Tache.id.asc())
+
+        taches = query.offset((page - 1) * limit).limit(limit).all()
+
+        next_cursor = prev_cursor = None
+        if taches and page * limit < total:
+            next_cursor = encode_cursor(taches[-1].created_at, taches[-1].id, "next")
+        if taches and page > 1:
+            prev_cursor = encode_cursor(taches[0].created_at, taches[0].id, "prev")
+
+    # ETag : lignes de la page renvoyée + total + génération de la table +
+    # paramètres de présentation. 304 levé avant la sérialisation.
+    etag = make_etag(
+        "taches", signature, generation, total, _page_version(taches, view),
+        sort, page, limit, cursor, count, view, _fieldset_key(fieldset),
     )
+    raise_if_not_modified(if_none_match, etag)
 
     return {
         "total": total,
         "page": page,
         "limit": limit,
-        "taches": taches
+        "taches": taches,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor,
+        "count_mode": count_mode,
+        "etag": etag,
     }
 
 
 # ==========================================================
 #                     DÉTAIL TÂCHE
 # ==========================================================
-def get_tache_detail_service(tache_id: int, db: Session):
+def _detail_etag(tache_id, updated_at, nb_vues, likes, has_resume, nb_comments, last_comment, nb_files, last_file) -> str:
+    """
+    Version du détail : la ligne (updated_at, vues, likes, résumé) + agrégats
+    des commentaires et fichiers. Les profils embarqués n'en font pas partie.
+    """
+    return make_etag(
+        "tache", tache_id, updated_at, nb_vues or 0, likes or 0, bool(has_resume),
+        nb_comments or 0, last_comment, nb_files or 0, last_file,
+    )
+
+
+def _current_tache_etag(tache_id: int, db: Session) -> Optional[str]:
+    """ETag actuel lu par une seule requête sur la clé primaire (None si absente)."""
+    def aggregate(fn, model):
+        return select(fn(model.id)).where(model.tache_id == Tache.id).scalar_subquery()
+
+    # Commentaire le plus récent (date, id) : premier élément de la page du détail
+    dernier_commentaire = (
+        select(Commentaire.id)
+        .where(Commentaire.tache_id == Tache.id)
+        .order_by(Commentaire.date.desc(), Commentaire.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+    row = (
+        db.query(
+            Tache.updated_at,
+            Tache.nb_vues,
+            Tache.likes,
+            Tache.resume_ia.isnot(None),
+            aggregate(func.count, Commentaire),
+            dernier_commentaire,
+            aggregate(func.count, FichierTache),
+            aggregate(func.max, FichierTache),
+        )
+        .filter(Tache.id == tache_id)
+        .first()
+    )
+    if row is None:
+        return None
+    updated_at, nb_vues, likes, *rest = row
+    return _detail_etag(
+        tache_id, updated_at,
+        view_counter.read(tache_id, nb_vues),
+        like_counter.read(tache_id, likes),
+        *rest,
+    )
+
+
+def tache_etag(detail: TacheDetailOut) -> str:
+    """ETag d'un détail déjà construit (même valeur que `_current_tache_etag`)."""
+    commentaires, fichiers = detail.commentaires, detail.fichiers or []
+    return _detail_etag(
+        detail.id, detail.updated_at, detail.nb_vues, detail.likes, detail.resume_ia is not None,
+        detail.nb_commentaires, commentaires[-1].id if commentaires else None,
+        len(fichiers), max((f.id for f in fichiers), default=None),
+    )
+
+
+def get_tache_detail_service(tache_id: int, db: Session, if_none_match: Optional[str] = None):
+    # ---------------- REQUÊTE CONDITIONNELLE ----------------
+    # Une revalidation (304) ne compte pas de vue : le client affiche une
+    # représentation déjà comptée. Sinon le compteur changerait l'ETag à
+    # chaque appel et aucun 304 ne serait possible.
+    if if_none_match:
+        etag = _current_tache_etag(tache_id, db)
+        if etag is not None:
+            raise_if_not_modified(if_none_match, etag)
+
+    # Profils en jointure (many-to-one), fichiers en requête séparée : pas de
+    # produit cartésien. Les commentaires ne sont pas chargés via la relation.
     tache = (
         db.query(Tache)
         .options(
-            joinedload(Tache.commentaires),
             joinedload(Tache.auteur),
             joinedload(Tache.assign_to),
-            joinedload(Tache.fichiers)
+            selectinload(Tache.fichiers)
         )
         .filter(Tache.id == tache_id)
         .first()
@@ -143,20 +357,24 @@ def get_tache_detail_service(tache_id: int, db: Session):
     if not tache:
         raise HTTPException(status_code=404, detail="Tâche non trouvée")
 
-    # ---------------- RESUME IA AUTOMATIQUE ----------------
-    if not tache.resume_ia and tache.contenu and len(tache.contenu) > 100:
-        try:
-            tache.resume_ia = generate_summary(tache.contenu)
-            db.commit()
-        except Exception:
-            db.rollback()
+    # Le résumé IA est calculé en arrière-plan (app/services/summaries.py) :
+    # lecture seule ici, `resume_ia` peut encore être vide juste après l'écriture.
 
     # ---------------- Compteur de vues ----------------
-    tache.nb_vues = (tache.nb_vues or 0) + 1
-    db.commit()
-
-    db.refresh(tache)
-    return tache
+    # Tampon write-behind (app/services/counter_buffers.py) : pas d'écriture ici.
+    # Valeur affichée = base + vues en attente, posée sans marquer l'objet modifié.
+    view_counter.record(tache_id)
+    set_committed_value(tache, "nb_vues", view_counter.read(tache_id, tache.nb_vues))
+    set_committed_value(tache, "likes", like_counter.read(tache_id, tache.likes))
+
+    # ---------------- Commentaires : N plus récents + total ----------------
+    page = _commentaires_page(tache_id, db, None, settings.DETAIL_COMMENTS_LIMIT)
+    return TacheDetailOut(
+        **dict(TacheOut.model_validate(tache)),
+        commentaires=[CommentaireLiteOut.model_validate(c) for c in page["commentaires"]],
+        nb_commentaires=page["total"],
+        commentaires_next_cursor=page["next_cursor"],
+    )
 
 
 # ==========================================================
@@ -167,27 +385,34 @@ async def update_tache_service(tache_id, titre, contenu, equipe, categorie, prio
     if not tache:
         raise HTTPException(status_code=404, detail="Tâche non trouvée")
 
+    contenu_modifie = contenu != tache.contenu
     tache.titre = titre
     tache.contenu = contenu
+    if contenu_modifie:
+        tache.resume_ia = None   # recalculé en arrière-plan
     tache.equipe = equipe or tache.equipe
     tache.categorie = categorie or tache.categorie
     tache.priorite = priorite or tache.priorite
 
     # ---------------- AJOUT FICHIERS ----------------
-    for f in fichiers:
-        file_location = f"uploads/{f.filename}"
-        with open(file_location, "wb") as buffer:
-            buffer.write(await f.read())
-
-        new_file = FichierTache(
-            nom_fichier=f.filename,
-            chemin=file_location,
-            tache_id=tache.id
-        )
-        db.add(new_file)
+    # Écriture en flux hors boucle d'événements, fichiers en parallèle
+    stored_files = await store_uploads_async(fichiers)
+    for stored in stored_files:
+        db.add(new_fichier(stored, tache_id=tache.id))
 
-    db.commit()
+    try:
+        acquire_blobs(db, stored_files)
+        db.commit()
+    except Exception:
+        db.rollback()
+        discard_uploads(stored_files, db)
+        raise
+    invalidate_counts("taches")
     db.refresh(tache)
+    invalidate_tache_lists(tache.id, tache.assign_to_id)
+
+    if contenu_modifie and needs_summary(tache.contenu):
+        summary_queue.submit(tache.id)
     return tache
 
 
@@ -199,8 +424,16 @@ def delete_tache_service(tache_id: int, db: Session):
     if not tache:
         raise HTTPException(status_code=404, detail="Tâche non trouvée")
 
+    assign_to_id = tache.assign_to_id
+    db.execute(delete(TacheLike).where(TacheLike.tache_id == tache_id))
+    # Pièces jointes supprimées en cascade : références rendues, fichiers effacés au commit
+    release_fichiers(db, db.execute(
+        select(FichierTache.sha256, FichierTache.chemin).where(FichierTache.tache_id == tache_id)
+    ).all())
     db.delete(tache)
     db.commit()
+    invalidate_counts("taches")
+    invalidate_tache_lists(tache_id, assign_to_id, membership=True)
 
     return None
 
@@ -208,27 +441,148 @@ def delete_tache_service(tache_id: int, db: Session):
 # ==========================================================
 #                     LIKE TÂCHE
 # ==========================================================
-def like_tache_service(tache_id: int, db: Session):
-    tache = db.query(Tache).filter(Tache.id == tache_id).first()
-    if not tache:
-        raise HTTPException(status_code=404, detail="Tâche non trouvée")
+# Une ligne TacheLike par (tâche, utilisateur) rend le like idempotent ;
+# le total `taches.likes` est mis à jour par un UPDATE atomique
+# (likes = likes + 1 ... RETURNING), ou regroupé par lots si LIKES_COALESCE.
+def _insert_like(db: Session, tache_id: int, user_id: int) -> bool:
+    """INSERT ... ON CONFLICT DO NOTHING ; True si le like est nouveau."""
+    values = {"tache_id": tache_id, "utilisateur_id": user_id}
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        insert = pg_insert if dialect == "postgresql" else sqlite_insert
+        result = db.execute(insert(TacheLike).values(**values).on_conflict_do_nothing())
+        return result.rowcount == 1
+
+    try:
+        with db.begin_nested():
+            db.execute(TacheLike.__table__.insert().values(**values))
+        return True
+    except IntegrityError:
+        return False
+
+
+def _add_likes(db: Session, tache_id: int, delta: int):
+    """Incrément atomique du total ; retourne (likes, assign_to_id) ou None si la tâche n'existe pas."""
+    stmt = (
+        update(Tache)
+        .where(Tache.id == tache_id)
+        .values({Tache.likes: func.coalesce(Tache.likes, 0) + delta, Tache.updated_at: Tache.updated_at})
+        .execution_options(synchronize_session=False)
+    )
+    if db.get_bind().dialect.update_returning:
+        return db.execute(stmt.returning(Tache.likes, Tache.assign_to_id)).first()
+
+    if db.execute(stmt).rowcount == 0:
+        return None
+    return db.execute(select(Tache.likes, Tache.assign_to_id).where(Tache.id == tache_id)).first()
+
+
+def _like_state(db: Session, tache_id: int):
+    return db.execute(select(Tache.likes, Tache.assign_to_id).where(Tache.id == tache_id)).first()
+
+
+def _change_like(tache_id: int, db: Session, current_user, liked: bool):
+    user_id = current_user.id
+
+    if liked:
+        try:
+            changed = _insert_like(db, tache_id, user_id)
+        except IntegrityError:
+            # clé étrangère : tâche inexistante
+            db.rollback()
+            raise HTTPException(status_code=404, detail="Tâche non trouvée")
+    else:
+        changed = db.execute(
+            delete(TacheLike).where(TacheLike.tache_id == tache_id, TacheLike.utilisateur_id == user_id)
+        ).rowcount == 1
+
+    delta = 1 if liked else -1
+    if not changed:
+        # Déjà dans l'état demandé : aucune écriture sur la tâche
+        row = _like_state(db, tache_id)
+    elif settings.LIKES_COALESCE:
+        # Mode rafale : la ligne chaude n'est pas verrouillée, l'incrément est regroupé
+        row = _like_state(db, tache_id)
+    else:
+        row = _add_likes(db, tache_id, delta)
 
-    tache.likes = (tache.likes or 0) + 1
+    if row is None:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Tâche non trouvée")
     db.commit()
-    db.refresh(tache)
 
-    return {"likes": tache.likes}
+    if changed and settings.LIKES_COALESCE:
+        like_counter.record(tache_id, delta)
+    if changed:
+        invalidate_tache_lists(tache_id, row.assign_to_id)
+
+    return {"likes": like_counter.read(tache_id, row.likes), "liked": liked}
+
+
+def ensure_likes_schema(engine: Engine) -> None:
+    """Crée (idempotent) la table des likes sur une base créée avant elle."""
+    if inspect(engine).has_table(Tache.__tablename__):
+        TacheLike.__table__.create(engine, checkfirst=True)
+
+
+def like_tache_service(tache_id: int, db: Session, current_user):
+    return _change_like(tache_id, db, current_user, liked=True)
+
+
+def unlike_tache_service(tache_id: int, db: Session, current_user):
+    return _change_like(tache_id, db, current_user, liked=False)
+
+
+def get_like_service(tache_id: int, db: Session, current_user):
+    """« A-t-il liké ? » : lecture de la clé primaire (tache_id, utilisateur_id)."""
+    row = _like_state(db, tache_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Tâche non trouvée")
+
+    liked = db.get(TacheLike, (tache_id, current_user.id)) is not None
+    return {"likes": like_counter.read(tache_id, row.likes), "liked": liked}
 
 
 # ==========================================================
 #                     COMMENTAIRES
 # ==========================================================
-def get_commentaires_service(tache_id: int, db: Session):
-    tache = db.query(Tache).filter(Tache.id == tache_id).first()
-    if not tache:
+def _commentaires_page(tache_id: int, db: Session, cursor: Optional[str], limit: int,
+                       fieldset: Optional[FieldSet] = None) -> dict:
+    """
+    Page keyset des commentaires, du plus récent au plus ancien (date, id) ;
+    chaque page est rendue en ordre chronologique. `next_cursor` mène aux
+    commentaires plus anciens. Servie par idx_commentaire_tache_date_id.
+    """
+    query = db.query(Commentaire).filter(Commentaire.tache_id == tache_id)
+    if fieldset is not None:
+        query = query.options(*fieldset.options("date"))
+    else:
+        query = query.options(*commentaires_lite_options())
+
+    commentaires, next_cursor, prev_cursor = keyset_page(
+        query, Commentaire.date, Commentaire.id, cursor, limit, descending=True
+    )
+    commentaires.reverse()
+
+    total = db.query(func.count(Commentaire.id)).filter(Commentaire.tache_id == tache_id).scalar()
+    return {
+        "commentaires": commentaires,
+        "total": total,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor,
+    }
+
+
+def get_commentaires_service(tache_id: int, db: Session, fieldset: Optional[FieldSet] = None,
+                             cursor: Optional[str] = None, limit: Optional[int] = None) -> dict:
+    if not db.query(Tache.id).filter(Tache.id == tache_id).first():
         raise HTTPException(status_code=404, detail="Tâche non trouvée")
 
-    return tache.commentaires
+    page = _commentaires_page(tache_id, db, cursor, limit or settings.COMMENTS_PAGE_SIZE, fieldset)
+    serialize = fieldset.serialize if fieldset is not None else CommentaireLiteOut.model_validate
+    page["commentaires"] = [serialize(c) for c in page["commentaires"]]
+    return page
 
 
 def add_commentaire_service(tache_id: int, commentaire: CommentaireCreate, db: Session):
@@ -248,6 +602,7 @@ def add_commentaire_service(tache_id: int, commentaire: CommentaireCreate, db: S
     db.add(new_comment)
     db.commit()
     db.refresh(new_comment)
+    invalidate_tache_lists(tache_id, tache.assign_to_id)
 
     return CommentaireOut.model_validate(new_comment)
 
@@ -260,10 +615,13 @@ def delete_file_service(file_id: int, db: Session):
     if not fichier:
         raise HTTPException(status_code=404, detail="Fichier non trouvé")
 
-    if os.path.exists(fichier.chemin):
-        os.remove(fichier.chemin)
+    tache_id = fichier.tache_id
+    assign_to_id = fichier.tache.assign_to_id if fichier.tache else None
 
+    # Fichier effacé seulement si la suppression est validée
+    release_fichiers(db, [(fichier.sha256, fichier.chemin)])
     db.delete(fichier)
     db.commit()
+    invalidate_tache_lists(tache_id, assign_to_id)
 
     return {"detail": "Fichier supprimé avec succès"}
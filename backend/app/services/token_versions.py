@@ -0,0 +1,99 @@
+# app/services/token_versions.py
+import threading
+import time
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.utilisateur import Utilisateur
+
+
+class TokenVersionRegistry:
+    """
+    Table compacte `user_id -> token_version` utilisée pour révoquer les tokens
+    à claims sans requête SQL par appel. Elle est rechargée en entier (une seule
+    requête sur deux colonnes) au plus une fois par TTL ; un id inconnu est lu
+    individuellement puis mémorisé. `None` = utilisateur supprimé.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._versions: dict[int, int | None] = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self.reloads = 0
+        self.single_lookups = 0
+
+    def current(self, user_id: int, db: Session) -> int | None:
+        now = time.monotonic()
+        with self._lock:
+            stale = now - self._loaded_at >= self.ttl_seconds
+            known = user_id in self._versions
+            version = self._versions.get(user_id)
+
+        if stale:
+            self._reload(db)
+            with self._lock:
+                known = user_id in self._versions
+                version = self._versions.get(user_id)
+
+        if not known:
+            row = (
+                db.query(Utilisateur.token_version)
+                .filter(Utilisateur.id == user_id)
+                .first()
+            )
+            version = (row[0] or 0) if row else None
+            with self._lock:
+                self._versions[user_id] = version
+                self.single_lookups += 1
+
+        return version
+
+    def forget(self, user_id: int) -> None:
+        """Force la relecture de la version au prochain contrôle."""
+        with self._lock:
+            self._versions.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._versions.clear()
+            self._loaded_at = 0.0
+
+    def _reload(self, db: Session) -> None:
+        rows = db.query(Utilisateur.id, Utilisateur.token_version).all()
+        with self._lock:
+            self._versions = {uid: (v or 0) for uid, v in rows}
+            self._loaded_at = time.monotonic()
+            self.reloads += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._versions),
+                "ttl_seconds": self.ttl_seconds,
+                "reloads": self.reloads,
+                "single_lookups": self.single_lookups,
+            }
+
+
+token_versions = TokenVersionRegistry(ttl_seconds=settings.TOKEN_VERSION_TTL_SECONDS)
+
+
+def bump_token_version(user: Utilisateur) -> None:
+    """Invalide tous les tokens à claims émis pour cet utilisateur (avant commit)."""
+    user.token_version = (user.token_version or 0) + 1
+
+
+def ensure_token_version_schema(engine: Engine) -> None:
+    """Ajoute (idempotent) la colonne token_version sur une base créée avant elle."""
+    inspector = inspect(engine)
+    if not inspector.has_table(Utilisateur.__tablename__):
+        return
+
+    columns = {c["name"] for c in inspector.get_columns(Utilisateur.__tablename__)}
+    if "token_version" not in columns:
+        with engine.begin() as conn:
+            conn.exec_driver_sql("ALTER TABLE utilisateurs ADD COLUMN token_version INTEGER NOT NULL DEFAULT 0")
@@ -0,0 +1,448 @@
+# app/services/uploads.py
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable
+
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import Engine, delete, event, inspect, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.fichier import FichierBlob, FichierTache
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# 📎 PIÈCES JOINTES : ÉCRITURE EN FLUX
+# ==========================================================
+# Le contenu n'est jamais lu en entier en mémoire : copie par blocs de
+# UPLOAD_CHUNK_BYTES depuis le fichier temporaire de la requête vers un
+# fichier temporaire du magasin, haché (SHA-256) pendant la copie.
+# - les fichiers d'une même requête sont écrits en parallèle sur un pool de
+#   threads dédié (E/S disque hors boucle d'événements)
+# - limites par fichier et par requête vérifiées pendant la copie : au
+#   premier dépassement, 413 et aucun fichier de la requête n'est conservé
+#
+# Magasin adressé par contenu : uploads/blobs/ab/cd/abcd… (empreinte
+# complète, deux niveaux de répertoires pour garder des dossiers courts).
+# Un même contenu n'est stocké qu'une fois ; `fichiers_blobs.refcount`
+# compte les FichierTache qui le référencent, le fichier est effacé quand
+# il n'en reste aucun. Le nom d'origine reste dans `nom_fichier`.
+UPLOAD_DIR = "uploads"
+BLOB_DIR = "blobs"
+# mkstemp crée en 0600 : le proxy inverse (FILES_ACCEL_REDIRECT_PREFIX), souvent
+# sous un autre utilisateur, doit pouvoir lire les blobs
+BLOB_MODE = 0o644
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+
+def blob_path(sha256: str) -> str:
+    return os.path.join(UPLOAD_DIR, BLOB_DIR, sha256[:2], sha256[2:4], sha256)
+
+
+@dataclass(frozen=True)
+class StoredUpload:
+    nom_fichier: str
+    chemin: str
+    taille: int
+    sha256: str
+    # True si cette écriture a créé le blob (sinon il existait déjà)
+    created: bool = False
+    # Date (mtime, ns) donnée au blob créé ; une réutilisation la change
+    mtime_ns: int | None = None
+
+
+class _Aborted(Exception):
+    """Écriture arrêtée parce qu'un autre fichier de la requête a échoué."""
+
+
+class UploadBudget:
+    """Octets restants pour une requête, partagés entre les écritures parallèles."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.remaining = max_bytes
+        self._lock = threading.Lock()
+        self._hashes: set[str] = set()
+        self.aborted = threading.Event()
+
+    def claim(self, sha256: str) -> bool:
+        """False si un autre fichier de la requête publie déjà ce contenu."""
+        with self._lock:
+            if sha256 in self._hashes:
+                return False
+            self._hashes.add(sha256)
+            return True
+
+    def consume(self, size: int) -> None:
+        with self._lock:
+            self.remaining -= size
+            over = self.remaining < 0
+        if over:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Pièces jointes trop volumineuses (max {self.max_bytes // (1024 * 1024)} Mo par requête).",
+            )
+
+
+def safe_filename(filename: str | None) -> str:
+    """Nom de base seulement (pas de chemin client, ni de ../)."""
+    name = (filename or "").replace("\\", "/").split("/")[-1].strip()
+    if name in ("", ".", ".."):
+        raise HTTPException(status_code=400, detail="Nom de fichier invalide.")
+    return name
+
+
+def place_blob(tmp_path: str, sha256: str) -> tuple[str, bool, int | None]:
+    """
+    Publie le fichier temporaire sous son empreinte ; (chemin, créé, mtime).
+    Le blob créé est daté d'une seconde plus tôt : le `os.utime` d'une
+    réutilisation concurrente le rend toujours plus récent (voir
+    `discard_uploads`).
+    """
+    dest = blob_path(sha256)
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    os.chmod(tmp_path, BLOB_MODE)
+    mtime_ns = time.time_ns() - 1_000_000_000
+    os.utime(tmp_path, ns=(mtime_ns, mtime_ns))
+    try:
+        # Lien dur : échoue si le blob existe déjà, un seul écrivain le « crée »
+        os.link(tmp_path, dest)
+        created = True
+    except FileExistsError:
+        created = False
+        # Contenu réutilisé : rajeuni pour que le ramasse-miettes (app/gc_uploads.py)
+        # ne le prenne pas pour un orphelin avant le commit de la référence
+        os.utime(dest)
+    except OSError:
+        # Système de fichiers sans liens durs
+        created = not os.path.exists(dest)
+        if created:
+            os.replace(tmp_path, dest)
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    return dest, created, mtime_ns if created else None
+
+
+def store_upload(f: UploadFile, budget: UploadBudget, max_file_bytes: int) -> StoredUpload:
+    """Copie et hache un fichier par blocs ; lève 413 dès qu'une limite est dépassée."""
+    filename = safe_filename(f.filename)
+    tmp_dir = os.path.join(UPLOAD_DIR, BLOB_DIR)
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, prefix=".upload-", suffix=".part")
+    size = 0
+    digest = hashlib.sha256()
+    try:
+        src = f.file
+        src.seek(0)
+        with os.fdopen(fd, "wb") as out:
+            while chunk := src.read(settings.UPLOAD_CHUNK_BYTES):
+                if budget.aborted.is_set():
+                    raise _Aborted()
+                size += len(chunk)
+                if size > max_file_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Fichier trop volumineux : {filename} (max {max_file_bytes // (1024 * 1024)} Mo).",
+                    )
+                budget.consume(len(chunk))
+                digest.update(chunk)
+                out.write(chunk)
+        if budget.claim(digest.hexdigest()):
+            dest, created, mtime_ns = place_blob(tmp_path, digest.hexdigest())
+        else:
+            # Doublon dans la requête : pas de `os.utime`, qui passerait pour
+            # une réutilisation concurrente (voir `discard_uploads`)
+            dest, created, mtime_ns = blob_path(digest.hexdigest()), False, None
+            os.remove(tmp_path)
+    except BaseException:
+        budget.aborted.set()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return StoredUpload(nom_fichier=filename, chemin=dest, taille=size, sha256=digest.hexdigest(),
+                        created=created, mtime_ns=mtime_ns)
+
+
+# ==========================================================
+# 🔹 POOL D'ÉCRITURE
+# ==========================================================
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.UPLOAD_MAX_WORKERS, thread_name_prefix="uploads")
+        return _executor
+
+
+def _submit_all(files: list[UploadFile], max_file_bytes: int | None, max_request_bytes: int | None) -> list[Future]:
+    budget = UploadBudget(max_request_bytes or settings.UPLOAD_MAX_REQUEST_BYTES)
+    max_file = max_file_bytes or settings.UPLOAD_MAX_FILE_BYTES
+    executor = _get_executor()
+    return [executor.submit(store_upload, f, budget, max_file) for f in files]
+
+
+def _collect(futures: list[Future]) -> list[StoredUpload]:
+    """Résultats dans l'ordre des fichiers ; au moindre échec, tout est supprimé."""
+    stored, error = [], None
+    for future in futures:
+        try:
+            stored.append(future.result())
+        except _Aborted:
+            continue
+        except BaseException as exc:
+            error = error or exc
+    if error is not None:
+        discard_uploads(stored)
+        raise error
+    return stored
+
+
+def discard_uploads(stored: list[StoredUpload], db: Session | None = None) -> None:
+    """
+    Efface les blobs créés par une requête qui n'aboutit pas. Un blob déjà
+    présent avant la requête n'est jamais touché ; avec `db`, un blob créé
+    mais référencé entre-temps (même contenu envoyé en parallèle) est gardé,
+    de même qu'un blob rajeuni depuis sa création (réutilisé par un envoi
+    parallèle pas encore validé).
+    """
+    created = {upload.sha256: upload.mtime_ns for upload in stored if upload.created}
+    if created and db is not None:
+        for sha256 in db.scalars(select(FichierBlob.sha256).where(FichierBlob.sha256.in_(created))):
+            created.pop(sha256)
+    for sha256, mtime_ns in created.items():
+        _remove_blob_file(sha256, mtime_ns)
+
+
+def store_uploads(files: list[UploadFile] | None, max_file_bytes: int | None = None,
+                  max_request_bytes: int | None = None) -> list[StoredUpload]:
+    """Version bloquante (services sync, exécutés hors boucle d'événements)."""
+    if not files:
+        return []
+    return _collect(_submit_all(files, max_file_bytes, max_request_bytes))
+
+
+async def store_uploads_async(files: list[UploadFile] | None, max_file_bytes: int | None = None,
+                              max_request_bytes: int | None = None) -> list[StoredUpload]:
+    """Version async : la boucle d'événements attend sans bloquer."""
+    if not files:
+        return []
+    futures = _submit_all(files, max_file_bytes, max_request_bytes)
+    await asyncio.wait([asyncio.wrap_future(f) for f in futures])
+    return _collect(futures)
+
+
+def shutdown() -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+# ==========================================================
+# 🔢 COMPTEURS DE RÉFÉRENCES
+# ==========================================================
+# Mis à jour dans la transaction de l'appelant, avec les lignes
+# FichierTache : la référence et son compteur sont validés ensemble.
+def new_fichier(stored: StoredUpload, **values) -> FichierTache:
+    return FichierTache(
+        nom_fichier=stored.nom_fichier,
+        chemin=stored.chemin,
+        sha256=stored.sha256,
+        taille=stored.taille,
+        **values,
+    )
+
+
+def acquire_blobs(db: Session, stored: Iterable[StoredUpload]) -> None:
+    """refcount += n par contenu (INSERT ... ON CONFLICT DO UPDATE)."""
+    counts = Counter()
+    sizes = {}
+    for upload in stored:
+        counts[upload.sha256] += 1
+        sizes[upload.sha256] = upload.taille
+    dialect = db.get_bind().dialect.name
+
+    for sha256, n in sorted(counts.items()):   # ordre fixe : pas d'interblocage
+        values = {"sha256": sha256, "taille": sizes[sha256], "refcount": n}
+        if dialect in ("postgresql", "sqlite"):
+            insert = pg_insert if dialect == "postgresql" else sqlite_insert
+            stmt = insert(FichierBlob).values(**values)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[FichierBlob.sha256],
+                set_={"refcount": FichierBlob.refcount + n},
+            ))
+            continue
+
+        if _increment(db, sha256, n):
+            continue
+        try:
+            with db.begin_nested():
+                db.execute(FichierBlob.__table__.insert().values(**values))
+        except IntegrityError:
+            _increment(db, sha256, n)
+
+
+def _increment(db: Session, sha256: str, n: int) -> bool:
+    stmt = (
+        update(FichierBlob)
+        .where(FichierBlob.sha256 == sha256)
+        .values(refcount=FichierBlob.refcount + n)
+        .execution_options(synchronize_session=False)
+    )
+    return db.execute(stmt).rowcount == 1
+
+
+def release_blobs(db: Session, hashes: Iterable[str | None]) -> list[str]:
+    """
+    refcount -= n par contenu ; retourne les empreintes qui ne sont plus
+    référencées (lignes supprimées). Les fichiers sont effacés par
+    `remove_orphan_blobs`, après le commit (voir `release_fichiers`).
+    """
+    orphans = []
+    for sha256, n in sorted(Counter(h for h in hashes if h).items()):
+        _increment(db, sha256, -n)
+        result = db.execute(
+            delete(FichierBlob)
+            .where(FichierBlob.sha256 == sha256, FichierBlob.refcount <= 0)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            orphans.append(sha256)
+    return orphans
+
+
+def remove_orphan_blobs(db: Session, hashes: list[str]) -> int:
+    """
+    Efface les fichiers des contenus sans référence. Un contenu ré-envoyé
+    depuis est gardé : déjà référencé, ou rajeuni par `place_blob` depuis
+    moins de UPLOAD_BLOB_GRACE_SECONDS (référence pas encore validée) ;
+    ce dernier cas est laissé au ramasse-miettes.
+    """
+    if not hashes:
+        return 0
+    referenced = set(db.scalars(select(FichierBlob.sha256).where(FichierBlob.sha256.in_(hashes))))
+    max_mtime_ns = time.time_ns() - settings.UPLOAD_BLOB_GRACE_SECONDS * 1_000_000_000
+    removed = 0
+    for sha256 in hashes:
+        if sha256 not in referenced:
+            removed += _remove_blob_file(sha256, max_mtime_ns)
+    return removed
+
+
+def remove_unreferenced_paths(db: Session, paths: list[str]) -> int:
+    """Efface les fichiers non migrés (`sha256 IS NULL`) qu'aucune ligne ne référence plus."""
+    if not paths:
+        return 0
+    referenced = set(db.scalars(select(FichierTache.chemin).where(FichierTache.chemin.in_(paths))))
+    removed = 0
+    for path in paths:
+        if path not in referenced and os.path.isfile(path):
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def _remove_blob_file(sha256: str, max_mtime_ns: int | None) -> bool:
+    """Efface le blob, sauf s'il a été touché après `max_mtime_ns`."""
+    path = blob_path(sha256)
+    try:
+        if max_mtime_ns is not None and os.stat(path).st_mtime_ns > max_mtime_ns:
+            return False
+        os.remove(path)
+    except FileNotFoundError:
+        return False
+    # Répertoires de répartition vidés : retirés (sans erreur s'ils resservent)
+    for directory in (os.path.dirname(path), os.path.dirname(os.path.dirname(path))):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break
+    return True
+
+
+# ==========================================================
+# 🧹 NETTOYAGE APRÈS COMMIT
+# ==========================================================
+# Les fichiers d'une suppression ne sont effacés qu'une fois la transaction
+# validée (after_commit) ; un rollback annule le nettoyage prévu. Un échec
+# ici (disque, arrêt brutal) laisse au pire un orphelin, que le
+# ramasse-miettes (app/gc_uploads.py) retrouve ; de même pour un blob
+# rajeuni récemment, qu'un envoi en cours va peut-être référencer.
+_CLEANUP_KEY = "uploads_cleanup"
+
+
+def schedule_cleanup(db: Session, blobs: Iterable[str] = (), paths: Iterable[str] = ()) -> None:
+    pending_blobs, pending_paths = db.info.setdefault(_CLEANUP_KEY, (set(), set()))
+    pending_blobs.update(blobs)
+    pending_paths.update(paths)
+
+
+def release_fichiers(db: Session, fichiers: Iterable[tuple[str | None, str]]) -> None:
+    """
+    Références des FichierTache (sha256, chemin) supprimés dans la
+    transaction courante : compteurs décrémentés tout de suite, fichiers
+    effacés au commit.
+    """
+    fichiers = list(fichiers)
+    orphans = release_blobs(db, [sha256 for sha256, _ in fichiers])
+    schedule_cleanup(db, blobs=orphans, paths=[chemin for sha256, chemin in fichiers if sha256 is None])
+
+
+@event.listens_for(Session, "after_commit")
+def _cleanup_after_commit(session: Session) -> None:
+    pending = session.info.pop(_CLEANUP_KEY, None)
+    if not pending:
+        return
+    blobs, paths = pending
+    try:
+        # La session qui vient de valider ne peut plus émettre de SQL ici
+        with Session(bind=session.get_bind()) as check:
+            remove_orphan_blobs(check, sorted(blobs))
+            remove_unreferenced_paths(check, sorted(paths))
+    except Exception:
+        logger.exception("Nettoyage des pièces jointes après commit : laissé au ramasse-miettes")
+
+
+@event.listens_for(Session, "after_rollback")
+def _cleanup_cancelled(session: Session) -> None:
+    session.info.pop(_CLEANUP_KEY, None)
+
+
+# ==========================================================
+# 🧱 SCHÉMA (bases créées avant le magasin)
+# ==========================================================
+def ensure_blob_schema(engine: Engine) -> None:
+    """Ajoute (idempotent) la table des blobs et les colonnes sha256/taille."""
+    inspector = inspect(engine)
+    if not inspector.has_table(FichierTache.__tablename__):
+        return
+
+    FichierBlob.__table__.create(engine, checkfirst=True)
+    columns = {c["name"] for c in inspector.get_columns(FichierTache.__tablename__)}
+    indexes = {i["name"] for i in inspector.get_indexes(FichierTache.__tablename__)}
+    with engine.begin() as conn:
+        if "sha256" not in columns:
+            conn.exec_driver_sql("ALTER TABLE fichiers_taches ADD COLUMN sha256 VARCHAR(64)")
+        if "taille" not in columns:
+            conn.exec_driver_sql("ALTER TABLE fichiers_taches ADD COLUMN taille BIGINT")
+        if "idx_fichier_sha256" not in indexes:
+            conn.exec_driver_sql("CREATE INDEX idx_fichier_sha256 ON fichiers_taches (sha256)")
@@ -1,21 +1,33 @@
+from sqlalchemy import select, update, func
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.exc import IntegrityError
+from pydantic import ValidationError
 from fastapi import HTTPException, UploadFile, BackgroundTasks, status
 from fastapi.responses import FileResponse
 from app.models.utilisateur import Utilisateur
 from app.models.tache import Tache
+from app.models.like import TacheLike
+from app.models.fichier import FichierTache
 from app.schemas.schemas import (
+    UtilisateurCreate,
     UtilisateurOut,
     UtilisateurDetailOut,
     TacheOut
 )
-from app.emails import send_activation_email, send_registration_email
+from app.emails import send_activation_email, send_registration_email, send_bulk_registration_emails
+from app.services.principal_cache import invalidate_user
+from app.services.token_versions import bump_token_version
+from app.services.hashing import hash_password, hash_passwords_bulk
+from app.services.counts import count_query, invalidate_counts
+from app.services.fieldsets import FieldSet
+from app.services.list_cache import invalidate_tache_lists
+from app.services.uploads import release_fichiers
 from app.config import settings
-from passlib.context import CryptContext
 from jose import jwt
+from app.auth import create_activation_token
 from datetime import datetime, timedelta, timezone
-import os, shutil
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+import os, shutil, csv, io, json
+from typing import BinaryIO, Optional
 
 
 # Répertoire avatars
@@ -56,7 +68,7 @@ def create_user_service(user_data, db: Session, current_user, background_tasks:
             detail="Un utilisateur avec cet email existe déjà."
         )
 
-    hashed_password = pwd_context.hash(user_data.mot_de_passe or "changeme123")
+    hashed_password = hash_password(user_data.mot_de_passe or "changeme123")
 
     new_user = Utilisateur(
         nom=user_data.nom,
@@ -73,6 +85,7 @@ def create_user_service(user_data, db: Session, current_user, background_tasks:
 
     db.add(new_user)
     db.commit()
+    invalidate_counts("utilisateurs")
     db.refresh(new_user)
 
     # ------ Token activation ------
@@ -107,24 +120,220 @@ def create_user_service(user_data, db: Session, current_user, background_tasks:
     return UtilisateurOut.model_validate(new_user)
 
 
+# ======================================================
+# 🔸 IMPORT EN MASSE (CSV / NDJSON)
+# ======================================================
+DEFAULT_PASSWORD = "changeme123"
+
+
+def _too_many_rows() -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail=f"Trop de lignes (max {settings.USER_IMPORT_MAX_ROWS})."
+    )
+
+
+def _parse_import_rows(content: bytes | BinaryIO, filename: str):
+    """
+    Retourne [(ligne, dict | None, erreur | None), ...].
+    NDJSON si le fichier finit par .ndjson/.jsonl, CSV (avec en-tête) sinon.
+    Lecture en flux : le plafond de lignes est vérifié au fil de la lecture.
+    """
+    stream = io.BytesIO(content) if isinstance(content, bytes) else content
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    rows = []
+
+    try:
+        if (filename or "").lower().endswith((".ndjson", ".jsonl")):
+            for line_no, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                if len(rows) >= settings.USER_IMPORT_MAX_ROWS:
+                    raise _too_many_rows()
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError as e:
+                    rows.append((line_no, None, f"JSON invalide : {e.msg}"))
+                    continue
+                if not isinstance(data, dict):
+                    rows.append((line_no, None, "Objet JSON attendu."))
+                    continue
+                rows.append((line_no, data, None))
+        else:
+            reader = csv.DictReader(text)
+            for line_no, data in enumerate(reader, start=2):
+                if len(rows) >= settings.USER_IMPORT_MAX_ROWS:
+                    raise _too_many_rows()
+                # Cellules vides ignorées : les valeurs par défaut du schéma s'appliquent
+                rows.append((line_no, {k: v for k, v in data.items() if k and v}, None))
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=400,
+            detail="Encodage non pris en charge : le fichier doit être en UTF-8 "
+                   "(depuis Excel : « CSV UTF-8 (délimité par des virgules) »).",
+        )
+    finally:
+        # Le fichier de l'upload reste ouvert : il appartient à l'appelant
+        text.detach()
+
+    return rows
+
+
+def _new_user(user_data: UtilisateurCreate, hashed_password: str) -> Utilisateur:
+    return Utilisateur(
+        nom=user_data.nom,
+        email=user_data.email,
+        mot_de_passe=hashed_password,
+        equipe=user_data.equipe,
+        type=user_data.type or "user",
+        poste=user_data.poste,
+        telephone=user_data.telephone,
+        adresse=user_data.adresse,
+        date_embauche=user_data.date_embauche,
+        is_active=False,
+    )
+
+
+def import_users_service(content: bytes | BinaryIO, filename: str, db: Session, current_user, background_tasks: BackgroundTasks):
+
+    if not _is_admin(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Seuls les administrateurs peuvent créer des utilisateurs."
+        )
+
+    rows = _parse_import_rows(content, filename)
+
+    report = {}
+    valid = []
+    seen = set()
+
+    # ------ Validation ligne par ligne ------
+    for line_no, data, error in rows:
+        if error:
+            report[line_no] = {"line": line_no, "email": None, "status": "error", "detail": error}
+            continue
+        try:
+            user_data = UtilisateurCreate(**data)
+        except ValidationError as e:
+            report[line_no] = {
+                "line": line_no,
+                "email": data.get("email"),
+                "status": "error",
+                "detail": "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()),
+            }
+            continue
+
+        if user_data.email in seen:
+            report[line_no] = {"line": line_no, "email": user_data.email, "status": "duplicate",
+                               "detail": "Email présent plusieurs fois dans le fichier."}
+            continue
+
+        seen.add(user_data.email)
+        valid.append((line_no, user_data))
+
+    # ------ Doublons en base : une seule requête ------
+    existing = set()
+    if valid:
+        existing = {
+            email for (email,) in db.query(Utilisateur.email)
+            .filter(Utilisateur.email.in_([u.email for _, u in valid]))
+        }
+
+    to_create = []
+    for line_no, user_data in valid:
+        if user_data.email in existing:
+            report[line_no] = {"line": line_no, "email": user_data.email, "status": "duplicate",
+                               "detail": "Un utilisateur avec cet email existe déjà."}
+        else:
+            to_create.append((line_no, user_data))
+
+    # ------ Hachage parallèle ------
+    hashes = hash_passwords_bulk([u.mot_de_passe or DEFAULT_PASSWORD for _, u in to_create])
+
+    # ------ Insertion par lots : un commit par lot ------
+    created = []
+    batch_size = max(1, settings.USER_IMPORT_BATCH_SIZE)
+    for start in range(0, len(to_create), batch_size):
+        chunk = [
+            (line_no, user_data, _new_user(user_data, hashed))
+            for (line_no, user_data), hashed in zip(to_create[start:start + batch_size], hashes[start:start + batch_size])
+        ]
+
+        try:
+            db.add_all([u for _, _, u in chunk])
+            db.flush()
+            ids = [u.id for _, _, u in chunk]
+            db.commit()
+            invalidate_counts("utilisateurs")
+            created.extend((line_no, user_data, user_id) for (line_no, user_data, _), user_id in zip(chunk, ids))
+        except IntegrityError:
+            # Conflit concurrent dans le lot : on retombe sur du ligne par ligne
+            db.rollback()
+            for line_no, user_data, user in chunk:
+                user = _new_user(user_data, user.mot_de_passe)
+                try:
+                    db.add(user)
+                    db.flush()
+                    user_id = user.id
+                    db.commit()
+                    invalidate_counts("utilisateurs")
+                    created.append((line_no, user_data, user_id))
+                except IntegrityError:
+                    db.rollback()
+                    report[line_no] = {"line": line_no, "email": user_data.email, "status": "duplicate",
+                                       "detail": "Un utilisateur avec cet email existe déjà."}
+
+    # ------ Emails : une seule tâche de fond pour tout le lot ------
+    recipients = []
+    for line_no, user_data, user_id in created:
+        report[line_no] = {"line": line_no, "email": user_data.email, "status": "created", "id": user_id}
+        recipients.append({
+            "email": user_data.email,
+            "nom": user_data.nom,
+            "password": user_data.mot_de_passe or DEFAULT_PASSWORD,
+            "token": create_activation_token(user_data.email),
+        })
+
+    if recipients:
+        background_tasks.add_task(send_bulk_registration_emails, recipients)
+
+    results = [report[k] for k in sorted(report)]
+    return {
+        "total": len(results),
+        "created": len(created),
+        "errors": len(results) - len(created),
+        "rows": results,
+    }
+
+
 # ======================================================
 # 🔸 LISTER UTILISATEURS
 # ======================================================
-def list_users_service(nom, email, equipe, type_, sort, page, limit, db: Session, current_user):
+def list_users_service(
+    nom, email, equipe, type_, sort, page, limit, db: Session, current_user,
+    count: str = "exact",
+    fieldset: Optional[FieldSet] = None,
+):
 
     if not _is_admin(current_user):
         raise HTTPException(status_code=403, detail="Action réservée aux administrateurs.")
 
     query = db.query(Utilisateur)
 
+    # Recherche partielle : servie par les index trigrammes (PostgreSQL)
     if nom:
         query = query.filter(Utilisateur.nom.ilike(f"%{nom}%"))
     if email:
         query = query.filter(Utilisateur.email.ilike(f"%{email}%"))
+    # Valeurs fermées : égalité exacte, servie par les index B-tree
     if equipe:
-        query = query.filter(Utilisateur.equipe.ilike(f"%{equipe}%"))
+        query = query.filter(Utilisateur.equipe == equipe)
     if type_:
-        query = query.filter(Utilisateur.type.ilike(f"%{type_}%"))
+        query = query.filter(Utilisateur.type == type_)
+
+    # Total calculé avant le tri (mode exact / cached / estimated)
+    total, count_mode = count_query(query, count, "utilisateurs", (nom, email, equipe, type_))
 
     # Tri
     if sort == "nom_desc":
@@ -136,28 +345,38 @@ def list_users_service(nom, email, equipe, type_, sort, page, limit, db: Session
     else:
         query = query.order_by(Utilisateur.nom.asc())
 
-    total = query.count()
+    if fieldset is not None:
+        query = query.options(*fieldset.options())
 
     users = query.offset((page - 1) * limit).limit(limit).all()
+    serialize = fieldset.serialize if fieldset is not None else UtilisateurOut.model_validate
 
     return {
         "total": total,
         "page": page,
         "limit": limit,
-        "users": [UtilisateurOut.model_validate(u) for u in users],
+        "users": [serialize(u) for u in users],
+        "count_mode": count_mode,
     }
 
 
 # ======================================================
 # 🔸 DÉTAIL UTILISATEUR
 # ======================================================
-def get_user_detail_service(user_id: int, db: Session, current_user):
+def get_user_detail_service(user_id: int, db: Session, current_user, fieldset: Optional[FieldSet] = None):
 
     current_id = _user_id(current_user)
 
     if not _is_admin(current_user) and current_id != user_id:
         raise HTTPException(status_code=403, detail="Accès non autorisé.")
 
+    # Sparse fieldset : une requête par relation demandée, rien d'autre
+    if fieldset is not None:
+        user = db.query(Utilisateur).options(*fieldset.options()).filter(Utilisateur.id == user_id).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="Utilisateur non trouvé.")
+        return fieldset.serialize(user)
+
     user = db.query(Utilisateur).options(
         joinedload(Utilisateur.taches),             # tâches créées
         joinedload(Utilisateur.commentaires)        # commentaires écrits
@@ -210,11 +429,24 @@ def update_user_service(user_id: int, updated_data, db: Session, current_user):
         if exists:
             raise HTTPException(status_code=400, detail="Email déjà utilisé.")
 
+    old_email = user.email
+
     # Mise à jour simple
     for key, value in data.items():
         setattr(user, key, value)
 
+    # Rôle / équipe / mot de passe modifiés → anciens tokens à claims révoqués
+    if data.keys() & {"type", "equipe", "is_active", "mot_de_passe"}:
+        bump_token_version(user)
+
     db.commit()
+    invalidate_user(user_id=user_id, email=old_email)
+    invalidate_counts("utilisateurs")
+    # Profil embarqué dans les listes de tâches (auteur, assigné) : réponses
+    # en cache retirées ; la génération "taches" renouvelle aussi les ETags
+    # de liste (et le total du filtre auteur quand le nom change)
+    invalidate_counts("taches")
+    invalidate_tache_lists(None, membership=True)
     db.refresh(user)
     return user
 
@@ -230,8 +462,31 @@ def delete_user_service(user_id: int, db: Session, current_user):
     if not user:
         raise HTTPException(status_code=404, detail="Utilisateur non trouvé.")
 
+    email = user.email
+
+    # Likes de l'utilisateur (la cascade SQL ne s'applique pas sous SQLite sans PRAGMA) :
+    # retirés des totaux `taches.likes` puis supprimés
+    db.execute(
+        update(Tache)
+        .where(Tache.id.in_(select(TacheLike.tache_id).where(TacheLike.utilisateur_id == user_id)))
+        .values({Tache.likes: func.coalesce(Tache.likes, 0) - 1, Tache.updated_at: Tache.updated_at})
+        .execution_options(synchronize_session=False)
+    )
+    db.query(TacheLike).filter(TacheLike.utilisateur_id == user_id).delete(synchronize_session=False)
+    # Pièces jointes de ses tâches (supprimées en cascade) : références
+    # rendues, fichiers effacés au commit
+    release_fichiers(db, db.execute(
+        select(FichierTache.sha256, FichierTache.chemin)
+        .join(Tache, Tache.id == FichierTache.tache_id)
+        .where(Tache.auteur_id == user_id)
+    ).all())
     db.delete(user)
     db.commit()
+    invalidate_user(user_id=user_id, email=email)
+    invalidate_counts("utilisateurs")
+    invalidate_counts("taches")
+    # Ses tâches (supprimées en cascade) ne doivent plus être servies par le cache
+    invalidate_tache_lists(None, membership=True)
     return {"message": "Utilisateur supprimé avec succès."}
 
 
@@ -264,6 +519,7 @@ async def upload_avatar_service(user_id: int, file: UploadFile, db: Session):
     user.avatar_url = f"http://127.0.0.1:8000/uploads/avatars/{filename}"
 
     db.commit()
+    invalidate_user(user_id=user_id, email=user.email)
     db.refresh(user)
 
     return {"avatar_url": user.avatar_url}
@@ -308,6 +564,8 @@ def assign_tache_to_user_service(user_id: int, tache_id: int, current_user, db:
     tache.updated_at = datetime.utcnow()
 
     db.commit()
+    invalidate_counts("taches")
+    invalidate_tache_lists(tache_id, old_assign, user_id, membership=True)
     db.refresh(tache)
 
     return {
@@ -335,6 +593,8 @@ def unassign_tache_from_user_service(tache_id: int, current_user, db: Session):
     tache.updated_at = datetime.utcnow()
 
     db.commit()
+    invalidate_counts("taches")
+    invalidate_tache_lists(tache_id, old_assign, membership=True)
     db.refresh(tache)
 
     return {
@@ -359,6 +619,8 @@ def close_tache_service(tache_id: int, current_user, db: Session):
     tache.updated_at = datetime.utcnow()
 
     db.commit()
+    invalidate_counts("taches")
+    invalidate_tache_lists(tache_id, tache.assign_to_id)
     db.refresh(tache)
 
     return {
@@ -16,8 +16,14 @@ from app.main import app
 from app.db import Base, get_db
 from app import emails
 from app.models.utilisateur import Utilisateur
-from app.auth import hash_password, get_current_user as auth_dep
+from app.auth import hash_password, get_current_user as auth_dep, get_current_principal
 from app.config import settings
+from app.services.principal_cache import principal_cache
+from app.services.token_versions import token_versions
+from app.services.counts import count_cache
+from app.services.list_cache import taches_list_cache
+from app.services.counter_buffers import view_counter, like_counter
+from app.services.summaries import summary_queue
 
 
 # ==========================================================
@@ -158,6 +164,7 @@ def override_get_current_user(request: Request):
 
 # ✅ override auth global
 app.dependency_overrides[auth_dep] = override_get_current_user
+app.dependency_overrides[get_current_principal] = override_get_current_user
 
 
 # ✅ override des modules
@@ -195,9 +202,19 @@ def reset_db():
     Base.metadata.create_all(bind=engine)
 
     current_test_user.clear()
+    principal_cache.clear()
+    token_versions.clear()
+    count_cache.clear()
+    taches_list_cache.clear()
+    view_counter.clear()
+    like_counter.clear()
 
     yield
 
+    # File des résumés : activée seulement par les tests qui la démarrent
+    summary_queue.shutdown()
+    summary_queue.clear()
+
 
 # ==========================================================
 # ✅ CLIENT FASTAPI
@@ -1,6 +1,16 @@
 #test_auth.py
 from app.config import settings
 from jose import jwt
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, inspect
+from app.auth import build_access_claims, create_access_token, get_current_principal, get_current_user, Principal
+from app.main import app
+from app.services.principal_cache import invalidate_user
+from app.services.token_versions import bump_token_version, ensure_token_version_schema
+from app.models.utilisateur import Utilisateur
+from app.routers.router_password_change import admin_change_user_password, AdminChangePasswordRequest
+from app.tests.conftest import TestingSessionLocal
 
 def test_login(client):    
     # Create user (non activé par défaut)
@@ -44,3 +54,92 @@ def test_login(client):
 def test_login_wrong_password(client):
     r = client.post("/login", data={"username": "admin@test.com", "password": "wrong"})
     assert r.status_code == 401
+
+
+# ==========================================================
+# 🔹 TOKENS À CLAIMS (authentification sans DB)
+# ==========================================================
+@pytest.fixture
+def claims_user(monkeypatch):
+    monkeypatch.setattr(settings, "ACCESS_TOKEN_CLAIMS", True)
+    db = TestingSessionLocal()
+    user = Utilisateur(nom="Claire", email="claire@test.com", mot_de_passe="x", type="admin", equipe="QA", is_active=True)
+    db.add(user)
+    db.commit()
+    yield db, user
+    db.close()
+
+
+def test_claims_token_builds_principal_from_claims(claims_user):
+    db, user = claims_user
+    token = create_access_token(build_access_claims(user))
+
+    principal = get_current_principal(token=token, db=db)
+
+    assert principal == Principal(id=user.id, type="admin", equipe="QA", is_active=True)
+
+
+def test_claims_token_revoked_after_password_change(claims_user):
+    db, user = claims_user
+    token = create_access_token(build_access_claims(user))
+    get_current_principal(token=token, db=db)
+
+    admin_change_user_password(user.id, AdminChangePasswordRequest(new_password="nouveau123"), db, user)
+
+    with pytest.raises(HTTPException) as exc:
+        get_current_principal(token=token, db=db)
+    assert exc.value.status_code == 401
+
+
+def test_legacy_token_falls_back_to_db_lookup(claims_user):
+    db, user = claims_user
+    token = create_access_token({"sub": str(user.id)})
+
+    principal = get_current_principal(token=token, db=db)
+
+    assert principal["id"] == user.id
+
+
+def test_claims_token_revoked_for_get_current_user(claims_user):
+    db, user = claims_user
+    token = create_access_token(build_access_claims(user))
+    assert get_current_user(token=token, db=db)["id"] == user.id
+
+    bump_token_version(user)
+    db.commit()
+    invalidate_user(user_id=user.id, email=user.email)
+
+    with pytest.raises(HTTPException) as exc:
+        get_current_user(token=token, db=db)
+    assert exc.value.status_code == 401
+
+
+def test_revoked_claims_token_rejected_on_write_route(claims_user, client, monkeypatch):
+    db, user = claims_user
+    token = create_access_token(build_access_claims(user))
+    bump_token_version(user)
+    db.commit()
+    invalidate_user(user_id=user.id, email=user.email)
+
+    # Vraie dépendance d'authentification (pas l'override des tests)
+    monkeypatch.delitem(app.dependency_overrides, get_current_user)
+    r = client.post("/taches/", data={"titre": "T", "contenu": "C"}, headers={"Authorization": f"Bearer {token}"})
+
+    assert r.status_code == 401
+    assert "révoqué" in r.json()["detail"]
+
+
+def test_ensure_token_version_schema_on_old_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE utilisateurs (id INTEGER PRIMARY KEY, nom VARCHAR(100))")
+        conn.exec_driver_sql("INSERT INTO utilisateurs (id, nom) VALUES (1, 'Ancien')")
+
+    ensure_token_version_schema(engine)
+    ensure_token_version_schema(engine)   # idempotent
+
+    columns = {c["name"] for c in inspect(engine).get_columns("utilisateurs")}
+    assert "token_version" in columns
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT token_version FROM utilisateurs").scalar() == 0
+    engine.dispose()
@@ -0,0 +1,68 @@
+# app/tests/test_backfill_summaries.py
+import json
+
+from app.tests.conftest import TestingSessionLocal, engine
+from app.models.tache import Tache
+from app.backfill_summaries import backfill
+
+LONG = "Le serveur de fichiers ne répond plus depuis ce matin. Les partages réseau sont inaccessibles. " * 2
+
+
+def _populate(n_long, n_short=2):
+    with TestingSessionLocal() as db:
+        db.add_all([Tache(titre=f"L{i}", contenu=f"{LONG} Poste {i}.") for i in range(n_long)])
+        db.add_all([Tache(titre=f"C{i}", contenu="court") for i in range(n_short)])
+        db.add(Tache(titre="Déjà", contenu=LONG, resume_ia="existant"))
+        db.commit()
+
+
+def _resumes():
+    with TestingSessionLocal() as db:
+        return {t.titre: t.resume_ia for t in db.query(Tache).all()}
+
+
+def test_backfill_fills_missing_summaries(tmp_path):
+    _populate(5)
+    checkpoint = tmp_path / "checkpoint.json"
+
+    result = backfill(engine, batch_size=2, checkpoint=str(checkpoint), log=lambda *_: None)
+
+    resumes = _resumes()
+    assert all(resumes[f"L{i}"].startswith("Résumé automatique") for i in range(5))
+    assert resumes["C0"] is None and resumes["C1"] is None
+    assert resumes["Déjà"] == "existant"
+    assert result["scanned"] == 5 and result["written"] == 5
+    assert json.loads(checkpoint.read_text())["last_id"] == result["last_id"]
+
+
+def test_backfill_resumes_from_checkpoint(tmp_path):
+    _populate(5)
+    checkpoint = str(tmp_path / "checkpoint.json")
+    quiet = {"checkpoint": checkpoint, "batch_size": 2, "log": lambda *_: None}
+
+    first = backfill(engine, limit=3, **quiet)
+    assert first["written"] == 3
+    assert sum(1 for r in _resumes().values() if r and r != "existant") == 3
+
+    second = backfill(engine, **quiet)
+    assert second["last_id"] > first["last_id"]
+    assert second["written"] == 5          # cumul sur les deux exécutions
+    assert all(r for t, r in _resumes().items() if t.startswith("L"))
+
+
+def test_backfill_skips_rows_changed_meanwhile(tmp_path, monkeypatch):
+    from app import backfill_summaries
+
+    _populate(1, n_short=0)
+    original = backfill_summaries.summarize_rows
+
+    def edit_then_summarize(contenus):
+        with TestingSessionLocal() as db:
+            db.query(Tache).filter(Tache.titre == "L0").one().contenu = LONG + " (modifié)"
+            db.commit()
+        return original(contenus)
+
+    monkeypatch.setattr(backfill_summaries, "summarize_rows", edit_then_summarize)
+    result = backfill(engine, checkpoint=str(tmp_path / "c.json"), log=lambda *_: None)
+    assert result["written"] == 0
+    assert _resumes()["L0"] is None
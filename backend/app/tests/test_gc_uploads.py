@@ -0,0 +1,107 @@
+# app/tests/test_gc_uploads.py
+import hashlib
+import os
+import time
+
+import pytest
+
+from app.gc_uploads import QUARANTINE_DIR, collect, purge_quarantine
+from app.models.fichier import FichierBlob, FichierTache
+from app.services import uploads
+from app.tests.conftest import TestingSessionLocal, engine
+
+
+def _blob(data: bytes) -> str:
+    sha = hashlib.sha256(data).hexdigest()
+    path = uploads.blob_path(sha)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return sha
+
+
+def _age(path, hours=2):
+    old = time.time() - hours * 3600
+    os.utime(path, (old, old))
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Magasin : blob et ancien fichier référencés, orphelins, fichiers ignorés."""
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", str(tmp_path))
+    kept, orphan = _blob(b"garde"), _blob(b"orphelin")
+    (tmp_path / "ancien.txt").write_bytes(b"ancien")
+    (tmp_path / "perdu.txt").write_bytes(b"perdu")
+    (tmp_path / "avatars").mkdir()
+    (tmp_path / "avatars" / "a.png").write_bytes(b"png")
+    for path in [uploads.blob_path(kept), uploads.blob_path(orphan), tmp_path / "ancien.txt",
+                 tmp_path / "perdu.txt", tmp_path / "avatars" / "a.png"]:
+        _age(path)
+    (tmp_path / "recent.txt").write_bytes(b"upload en cours")
+
+    with TestingSessionLocal() as db:
+        db.add_all([
+            FichierTache(nom_fichier="g.txt", chemin=uploads.blob_path(kept), sha256=kept, tache_id=1),
+            FichierTache(nom_fichier="ancien.txt", chemin=str(tmp_path / "ancien.txt"), tache_id=1),
+            FichierBlob(sha256=kept, taille=5, refcount=1),
+            # Compteur resté sans ligne (suppression SQL en cascade)
+            FichierBlob(sha256=orphan, taille=8, refcount=1),
+        ])
+        db.commit()
+    return {"root": tmp_path, "kept": kept, "orphan": orphan}
+
+
+def test_dry_run_reports_without_changes(store):
+    stats = collect(engine, dry_run=True, log=lambda *_: None)
+
+    assert (stats["scanned"], stats["orphans"], stats["recent"]) == (5, 2, 1)
+    assert stats["bytes"] == len(b"orphelin") + len(b"perdu")
+    assert os.path.exists(uploads.blob_path(store["orphan"]))
+    with TestingSessionLocal() as db:
+        assert db.get(FichierBlob, store["orphan"]) is not None
+
+
+def test_collect_deletes_orphans(store):
+    stats = collect(engine, batch_size=2, log=lambda *_: None)
+
+    assert (stats["removed"], stats["stale_refcounts"]) == (2, 1)
+    assert not os.path.exists(uploads.blob_path(store["orphan"]))
+    assert not (store["root"] / "perdu.txt").exists()
+    assert os.path.exists(uploads.blob_path(store["kept"]))
+    assert (store["root"] / "ancien.txt").exists()
+    assert (store["root"] / "recent.txt").exists()
+    assert (store["root"] / "avatars" / "a.png").exists()
+    with TestingSessionLocal() as db:
+        assert db.get(FichierBlob, store["orphan"]) is None
+        assert db.get(FichierBlob, store["kept"]).refcount == 1
+
+
+def test_collect_keeps_blob_reused_after_classification(store, monkeypatch):
+    from app import gc_uploads
+
+    find_orphans = gc_uploads.find_orphans
+    def reused_meanwhile(session, paths, root):
+        found = find_orphans(session, paths, root)
+        # Même contenu envoyé entre le classement et la suppression
+        os.utime(uploads.blob_path(store["orphan"]))
+        return found
+    monkeypatch.setattr(gc_uploads, "find_orphans", reused_meanwhile)
+
+    stats = collect(engine, log=lambda *_: None)
+
+    assert (stats["removed"], stats["orphans"], stats["recent"]) == (1, 1, 2)
+    assert os.path.exists(uploads.blob_path(store["orphan"]))
+    assert not (store["root"] / "perdu.txt").exists()
+
+
+def test_quarantine_then_purge(store):
+    stats = collect(engine, quarantine=True, log=lambda *_: None)
+
+    assert stats["quarantined"] == 2
+    (run,) = os.listdir(store["root"] / QUARANTINE_DIR)
+    assert (store["root"] / QUARANTINE_DIR / run / "perdu.txt").read_bytes() == b"perdu"
+    # Une quarantaine n'est jamais réexaminée
+    assert collect(engine, log=lambda *_: None)["orphans"] == 0
+
+    assert purge_quarantine(str(store["root"]), older_than_days=1, log=lambda *_: None) == 0
+    assert purge_quarantine(str(store["root"]), older_than_days=-1, log=lambda *_: None) == 1
@@ -0,0 +1,59 @@
+# app/tests/test_migrate_uploads.py
+import hashlib
+import os
+
+import pytest
+
+from app.migrate_uploads import migrate
+from app.models.fichier import FichierBlob, FichierTache
+from app.models.tache import Tache
+from app.models.utilisateur import Utilisateur
+from app.services import uploads
+from app.tests.conftest import TestingSessionLocal, engine
+
+
+@pytest.fixture
+def legacy(tmp_path, monkeypatch):
+    """Trois lignes : deux fichiers au contenu identique, un fichier absent."""
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", str(tmp_path))
+    (tmp_path / "a.txt").write_bytes(b"meme contenu")
+    (tmp_path / "b.txt").write_bytes(b"meme contenu")
+
+    with TestingSessionLocal() as db:
+        user = Utilisateur(nom="Mig", email="mig@test.com", mot_de_passe="x", type="admin")
+        db.add(user)
+        db.flush()
+        tache = Tache(titre="T", contenu="C", auteur_id=user.id, fichiers=[
+            FichierTache(nom_fichier="a.txt", chemin=str(tmp_path / "a.txt")),
+            FichierTache(nom_fichier="b.txt", chemin=str(tmp_path / "b.txt")),
+            FichierTache(nom_fichier="perdu.txt", chemin=str(tmp_path / "perdu.txt")),
+        ])
+        db.add(tache)
+        db.commit()
+    return tmp_path
+
+
+def test_dry_run_writes_nothing(legacy):
+    stats = migrate(engine, dry_run=True, log=lambda *_: None)
+
+    assert (stats["scanned"], stats["migrated"], stats["missing"], stats["deduplicated"]) == (3, 0, 1, 1)
+    assert not os.path.exists(legacy / uploads.BLOB_DIR)
+    with TestingSessionLocal() as db:
+        assert db.query(FichierTache).filter(FichierTache.sha256.isnot(None)).count() == 0
+
+
+def test_migrate_deduplicates_and_is_idempotent(legacy):
+    stats = migrate(engine, batch_size=1, log=lambda *_: None)
+
+    assert (stats["migrated"], stats["missing"], stats["originals_removed"]) == (2, 1, 2)
+    sha = hashlib.sha256(b"meme contenu").hexdigest()
+    with TestingSessionLocal() as db:
+        rows = db.query(FichierTache).filter(FichierTache.sha256 == sha).all()
+        assert {r.chemin for r in rows} == {uploads.blob_path(sha)}
+        assert {r.nom_fichier for r in rows} == {"a.txt", "b.txt"}
+        assert db.get(FichierBlob, sha).refcount == 2
+    assert open(uploads.blob_path(sha), "rb").read() == b"meme contenu"
+    assert not (legacy / "a.txt").exists()
+
+    again = migrate(engine, log=lambda *_: None)
+    assert (again["scanned"], again["migrated"]) == (1, 0)    # seule la ligne sans fichier reste
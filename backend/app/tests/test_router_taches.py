@@ -43,6 +43,17 @@ def test_list_taches_router(client, create_test_user):
     assert r.json()["total"] == initial_total + 1
 
 
+def test_list_taches_summary_router(client, create_test_user):
+    client.post("/taches/", json={"titre": "S", "contenu": "long", "auteur_id": create_test_user["id"]})
+
+    r = client.get("/taches/", params={"view": "summary"})
+    assert r.status_code == 200
+    tache = r.json()["taches"][0]
+    assert tache["titre"] == "S"
+    assert "contenu" not in tache
+    assert tache["nb_fichiers"] == 0
+
+
 # -----------------------------------------------------------------
 # ✅ TEST DETAIL
 # -----------------------------------------------------------------
@@ -66,6 +77,11 @@ def test_like_tache_router(create_test_user):
     assert r.status_code == 200
     assert r.json()["likes"] == 1
 
+    # Idempotent pour un même utilisateur
+    assert client.post(f"/taches/{tache_id}/like").json() == {"likes": 1, "liked": True}
+    assert client.get(f"/taches/{tache_id}/like").json()["liked"] is True
+    assert client.delete(f"/taches/{tache_id}/like").json() == {"likes": 0, "liked": False}
+
 
 # -----------------------------------------------------------------
 # ✅ TEST COMMENTAIRES
@@ -94,6 +110,10 @@ def test_get_commentaires_router(create_test_user):
     assert r.status_code == 200
     assert len(r.json()) == 1
 
+    r = client.get(f"/taches/{tache_id}/commentaires", params={"fields": "contenu,auteur.nom"})
+    assert r.json()[0]["auteur"]["nom"] == create_test_user["nom"]
+    assert "tache" not in r.json()[0]
+
 
 # -----------------------------------------------------------------
 # ✅ TEST DELETE TACHE
@@ -118,3 +138,310 @@ def test_create_tache_missing_title(client, create_test_user):
 def test_get_tache_not_found(client):
     r = client.get("/taches/999")
     assert r.status_code == 404
+
+
+# -----------------------------------------------------------------
+# ✅ SPARSE FIELDSETS
+# -----------------------------------------------------------------
+def test_list_taches_sparse_fields(client, create_test_user):
+    client.post("/taches/", json={"titre": "F", "contenu": "long", "auteur_id": create_test_user["id"]})
+
+    r = client.get("/taches/", params={"fields": "titre,auteur.nom", "include": "fichiers"})
+    assert r.status_code == 200
+    tache = r.json()["taches"][0]
+    assert set(tache) == {"id", "titre", "auteur", "fichiers"}
+    assert set(tache["auteur"]) == {"id", "nom"}
+
+    assert client.get("/taches/", params={"fields": "inconnu"}).status_code == 400
+    assert client.get("/taches/", params={"fields": "titre", "view": "summary"}).status_code == 400
+
+
+# -----------------------------------------------------------------
+# ✅ ETAG / IF-NONE-MATCH
+# -----------------------------------------------------------------
+def test_detail_etag_not_modified(create_test_user):
+    create = client.post("/taches/", json={"titre": "E", "contenu": "court", "auteur_id": create_test_user["id"]})
+    tache_id = create.json()["id"]
+
+    r = client.get(f"/taches/{tache_id}")
+    etag = r.headers["etag"]
+    assert r.json()["nb_vues"] == 1
+
+    # Revalidation : 304 sans corps, pas de vue comptée
+    r = client.get(f"/taches/{tache_id}", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+
+    # Un commentaire change la représentation
+    client.post(f"/taches/{tache_id}/commentaires", json={"contenu": "Hop", "auteur_id": create_test_user["id"]})
+    r = client.get(f"/taches/{tache_id}", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()["nb_vues"] == 2
+    assert r.headers["etag"] != etag
+
+
+def test_list_etag_not_modified(create_test_user):
+    client.post("/taches/", json={"titre": "L1", "contenu": "x", "auteur_id": create_test_user["id"]})
+
+    r = client.get("/taches/")
+    etag = r.headers["etag"]
+    assert client.get("/taches/", headers={"If-None-Match": etag}).status_code == 304
+
+    # Autre projection = autre ETag
+    assert client.get("/taches/", params={"view": "summary"}, headers={"If-None-Match": etag}).status_code == 200
+
+    client.post("/taches/", json={"titre": "L2", "contenu": "y", "auteur_id": create_test_user["id"]})
+    r = client.get("/taches/", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()["total"] == 2
+
+
+# -----------------------------------------------------------------
+# ✅ CACHE DE RÉPONSES DE LISTE
+# -----------------------------------------------------------------
+def test_list_response_cache_hit_and_invalidation(create_test_user):
+    from app.services.list_cache import taches_list_cache
+
+    create = client.post("/taches/", json={"titre": "C1", "contenu": "x", "auteur_id": create_test_user["id"]})
+    tache_id = create.json()["id"]
+
+    first = client.get("/taches/", params={"search": "  C1 "})
+    hits = taches_list_cache.stats()["hits"]
+    second = client.get("/taches/", params={"search": "c1"})   # même clé normalisée
+    assert taches_list_cache.stats()["hits"] == hits + 1
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+
+    # Un commentaire sur une tâche de la page invalide l'entrée
+    client.post(f"/taches/{tache_id}/commentaires", json={"contenu": "c", "auteur_id": create_test_user["id"]})
+    client.get("/taches/", params={"search": "c1"})
+    assert taches_list_cache.stats()["hits"] == hits + 1
+
+
+# -----------------------------------------------------------------
+# ✅ RÉSUMÉ IA EN ARRIÈRE-PLAN
+# -----------------------------------------------------------------
+def test_resume_ia_generated_in_background(create_test_user, monkeypatch):
+    from app.tests.conftest import TestingSessionLocal
+    from app.services.summaries import summary_queue, summarize_tache
+
+    # Jobs capturés puis exécutés ici : pas de thread concurrent sur la base
+    # SQLite partagée pendant la sérialisation des réponses
+    submitted = []
+    monkeypatch.setattr(summary_queue, "submit", submitted.append)
+
+    contenu = "Impossible d'imprimer depuis le poste de l'accueil. " * 4
+    create = client.post("/taches/", json={"titre": "R", "contenu": contenu, "auteur_id": create_test_user["id"]})
+    tache_id = create.json()["id"]
+    assert submitted == [tache_id]
+
+    # Le détail ne calcule plus rien
+    assert client.get(f"/taches/{tache_id}").json()["resume_ia"] is None
+
+    assert summarize_tache(tache_id, TestingSessionLocal)
+    resume = client.get(f"/taches/{tache_id}").json()["resume_ia"]
+    assert resume.startswith("Résumé automatique")
+
+    # Contenu modifié : résumé effacé puis recalculé
+    r = client.put(f"/taches/{tache_id}", data={"titre": "R", "contenu": "Nouveau contenu. " * 10})
+    assert r.status_code == 200
+    assert r.json()["resume_ia"] is None
+    assert submitted == [tache_id, tache_id]
+    assert summarize_tache(tache_id, TestingSessionLocal)
+    assert "Nouveau contenu" in client.get(f"/taches/{tache_id}").json()["resume_ia"]
+
+    # Titre seul modifié : pas de nouveau job
+    client.put(f"/taches/{tache_id}", data={"titre": "R2", "contenu": "Nouveau contenu. " * 10})
+    assert submitted == [tache_id, tache_id]
+
+
+# -----------------------------------------------------------------
+# ✅ COMMENTAIRES PAGINÉS (détail + keyset)
+# -----------------------------------------------------------------
+def test_detail_and_comments_pagination(create_test_user, monkeypatch):
+    from app.config import settings
+    monkeypatch.setattr(settings, "DETAIL_COMMENTS_LIMIT", 3)
+
+    create = client.post("/taches/", json={"titre": "P", "contenu": "x", "auteur_id": create_test_user["id"]})
+    tache_id = create.json()["id"]
+    for i in range(7):
+        client.post(f"/taches/{tache_id}/commentaires", json={"contenu": f"c{i}", "auteur_id": create_test_user["id"]})
+
+    # Détail : 3 plus récents (ordre chronologique) + total + curseur vers les plus anciens
+    detail = client.get(f"/taches/{tache_id}").json()
+    assert [c["contenu"] for c in detail["commentaires"]] == ["c4", "c5", "c6"]
+    assert detail["nb_commentaires"] == 7
+
+    r = client.get(f"/taches/{tache_id}/commentaires", params={"cursor": detail["commentaires_next_cursor"], "limit": 3})
+    assert [c["contenu"] for c in r.json()] == ["c1", "c2", "c3"]
+    assert r.headers["x-total-count"] == "7"
+
+    r = client.get(f"/taches/{tache_id}/commentaires", params={"cursor": r.headers["x-next-cursor"], "limit": 3})
+    assert [c["contenu"] for c in r.json()] == ["c0"]
+    assert "x-next-cursor" not in r.headers
+
+    # Retour vers les plus récents
+    r = client.get(f"/taches/{tache_id}/commentaires", params={"cursor": r.headers["x-prev-cursor"], "limit": 3})
+    assert [c["contenu"] for c in r.json()] == ["c1", "c2", "c3"]
+
+    # Sans curseur : la page la plus récente
+    r = client.get(f"/taches/{tache_id}/commentaires", params={"limit": 2})
+    assert [c["contenu"] for c in r.json()] == ["c5", "c6"]
+
+    assert client.get("/taches/999/commentaires").status_code == 404
+    assert client.get(f"/taches/{tache_id}/commentaires", params={"cursor": "invalide"}).status_code == 400
+
+
+# -----------------------------------------------------------------
+# ✅ PIÈCES JOINTES : LIMITES PENDANT L'ÉCRITURE
+# -----------------------------------------------------------------
+def test_create_tache_upload_limits(create_test_user, tmp_path, monkeypatch):
+    from app.config import settings
+    from app.services import uploads
+
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "UPLOAD_MAX_FILE_BYTES", 1024)
+
+    form = {"titre": "PJ", "contenu": "avec fichiers"}
+    r = client.post("/taches/", data=form, files=[
+        ("fichiers", ("a.txt", b"a" * 100, "text/plain")),
+        ("fichiers", ("b.txt", b"b" * 200, "text/plain")),
+    ])
+    assert r.status_code == 200
+    assert sorted(f["nom_fichier"] for f in r.json()["fichiers"]) == ["a.txt", "b.txt"]
+
+    r = client.post("/taches/", data=form, files=[("fichiers", ("gros.pdf", b"x" * 2048, "application/pdf"))])
+    assert r.status_code == 413
+    assert not (tmp_path / "gros.pdf").exists()
+    # Aucune tâche créée sans ses pièces jointes
+    assert client.get("/taches/", params={"search": "PJ"}).json()["total"] == 1
+
+
+# -----------------------------------------------------------------
+# ✅ TÉLÉCHARGEMENT : RANGE, ETAG, DÉLÉGATION AU PROXY
+# -----------------------------------------------------------------
+def test_download_file(create_test_user, tmp_path, monkeypatch):
+    import hashlib
+    from app.config import settings
+    from app.services import uploads
+
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", str(tmp_path))
+    data = b"0123456789" * 10
+    r = client.post("/taches/", data={"titre": "DL", "contenu": "x"},
+                    files=[("fichiers", ("rapport été.pdf", data, "application/pdf"))])
+    file_id = r.json()["fichiers"][0]["id"]
+    etag = f'"{hashlib.sha256(data).hexdigest()}"'
+
+    r = client.get(f"/taches/fichiers/{file_id}")
+    assert r.status_code == 200
+    assert r.content == data
+    assert r.headers["etag"] == etag
+    assert "immutable" in r.headers["cache-control"]
+    assert r.headers["content-type"] == "application/pdf"
+    assert r.headers["content-disposition"] == "attachment; filename*=utf-8''rapport%20%C3%A9t%C3%A9.pdf"
+
+    r = client.get(f"/taches/fichiers/{file_id}", headers={"Range": "bytes=10-19"})
+    assert r.status_code == 206
+    assert r.content == data[10:20]
+    assert r.headers["content-range"] == f"bytes 10-19/{len(data)}"
+
+    r = client.get(f"/taches/fichiers/{file_id}", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["etag"] == etag
+
+    monkeypatch.setattr(settings, "FILES_ACCEL_REDIRECT_PREFIX", "/_uploads/")
+    r = client.get(f"/taches/fichiers/{file_id}")
+    assert r.status_code == 200 and r.content == b""
+    sha = etag.strip('"')
+    assert r.headers["x-accel-redirect"] == f"/_uploads/blobs/{sha[:2]}/{sha[2:4]}/{sha}"
+
+    assert client.get("/taches/fichiers/999").status_code == 404
+
+
+# -----------------------------------------------------------------
+# ✅ UPLOAD REPRENABLE : SESSION, BLOCS, REPRISE, FINALISATION
+# -----------------------------------------------------------------
+def test_resumable_upload(create_test_user, tmp_path, monkeypatch):
+    import hashlib
+    import os
+    import stat
+    from app.config import settings
+    from app.services import uploads
+
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "RESUMABLE_CHUNK_BYTES", 10)
+    data = b"abcdefghij" * 2 + b"xyz"
+    tache_id = client.post("/taches/", json={"titre": "Terrain", "contenu": "x"}).json()["id"]
+
+    r = client.post("/taches/uploads", json={
+        "nom_fichier": "photo.jpg", "taille": len(data), "sha256": hashlib.sha256(data).hexdigest(),
+    })
+    assert r.status_code == 201
+    upload_id = r.json()["upload_id"]
+    url = f"/taches/uploads/{upload_id}"
+
+    assert client.put(url, params={"offset": 0}, content=data[:10]).json()["offset"] == 10
+    # Réponse perdue : le même bloc renvoyé est accepté sans être réécrit
+    assert client.put(url, params={"offset": 0}, content=data[:10]).json()["offset"] == 10
+    # Offset en avance : 409 avec l'offset attendu
+    r = client.put(url, params={"offset": 20}, content=data[20:])
+    assert r.status_code == 409 and r.headers["upload-offset"] == "10"
+    # Bloc altéré en route
+    r = client.put(url, params={"offset": 10}, content=data[10:20], headers={"X-Chunk-SHA256": "0" * 64})
+    assert r.status_code == 400
+    assert client.get(url).headers["upload-offset"] == "10"
+
+    client.put(url, params={"offset": 10}, content=data[10:20],
+               headers={"X-Chunk-SHA256": hashlib.sha256(data[10:20]).hexdigest()})
+    assert client.post(f"{url}/finalize", json={"tache_id": tache_id}).status_code == 409   # incomplet
+    assert client.put(url, params={"offset": 20}, content=data[20:]).json()["offset"] == len(data)
+
+    r = client.post(f"{url}/finalize", json={"tache_id": tache_id})
+    assert r.status_code == 200
+    fichier = r.json()
+    assert (fichier["nom_fichier"], fichier["taille"], fichier["tache_id"]) == ("photo.jpg", len(data), tache_id)
+    assert client.get(f"/taches/fichiers/{fichier['id']}").content == data
+    assert client.get(url).status_code == 404        # session terminée
+    # Publié lisible par le proxy inverse (X-Accel-Redirect)
+    mode = os.stat(uploads.blob_path(hashlib.sha256(data).hexdigest())).st_mode
+    assert stat.S_IMODE(mode) == 0o644
+
+
+# -----------------------------------------------------------------
+# ✅ EXPORT ZIP DES PIÈCES JOINTES (TÂCHE, ÉQUIPE)
+# -----------------------------------------------------------------
+def test_export_fichiers_zip(create_test_user, tmp_path, monkeypatch):
+    import io
+    import zipfile
+    from datetime import date, timedelta
+    from app.services import uploads
+
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", str(tmp_path))
+    texte = b"rapport " * 200
+    r = client.post("/taches/", data={"titre": "Export", "contenu": "x", "equipe": "Terrain"}, files=[
+        ("fichiers", ("notes.txt", texte, "text/plain")),
+        ("fichiers", ("photo.jpg", b"\xff\xd8jpeg", "image/jpeg")),
+        ("fichiers", ("notes.txt", b"autre version", "text/plain")),
+    ])
+    tache_id = r.json()["id"]
+
+    r = client.get(f"/taches/{tache_id}/fichiers.zip")
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/zip"
+    archive = zipfile.ZipFile(io.BytesIO(r.content))
+    assert archive.namelist() == ["notes.txt", "photo.jpg", "notes (2).txt"]
+    assert archive.read("notes.txt") == texte
+    assert archive.getinfo("notes.txt").compress_type == zipfile.ZIP_DEFLATED
+    assert archive.getinfo("photo.jpg").compress_type == zipfile.ZIP_STORED
+    assert archive.testzip() is None
+
+    today = date.today()
+    r = client.get("/taches/equipes/Terrain/fichiers.zip",
+                   params={"date_from": str(today - timedelta(days=1)), "date_to": str(today + timedelta(days=1))})
+    names = zipfile.ZipFile(io.BytesIO(r.content)).namelist()
+    assert names == [f"{tache_id} - Export/notes.txt", f"{tache_id} - Export/photo.jpg",
+                     f"{tache_id} - Export/notes (2).txt"]
+
+    r = client.get("/taches/equipes/Terrain/fichiers.zip", params={"date_to": str(today - timedelta(days=2))})
+    assert zipfile.ZipFile(io.BytesIO(r.content)).namelist() == []
+    assert client.get("/taches/999/fichiers.zip").status_code == 404
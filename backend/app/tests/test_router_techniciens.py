@@ -103,3 +103,39 @@ def test_get_technicien_invalid_id(client):
     r = client.get("/techniciens/99999")
     assert r.status_code == 404
     assert "Technicien non trouvé" in r.text
+
+
+def test_list_techniciens_sparse_fields(client):
+    client.post("/utilisateurs/", json={
+        "nom": "Tech Sparse",
+        "email": "sparse@test.com",
+        "mot_de_passe": "12345678",
+        "type": "technicien",
+        "equipe": "Support"
+    })
+
+    r = client.get("/techniciens/", params={"fields": "nom,equipe"})
+    assert r.status_code == 200
+    assert r.json()["data"] == [{"id": r.json()["data"][0]["id"], "nom": "Tech Sparse", "equipe": "Support"}]
+
+
+def test_technicien_relations_reserved_to_admin_or_self(client, request):
+    r = client.post("/utilisateurs/", json={
+        "nom": "Tech Privé",
+        "email": "prive@test.com",
+        "mot_de_passe": "12345678",
+        "type": "technicien",
+        "equipe": "Support"
+    })
+    tech_id = r.json()["data"]["id"]
+
+    # Admin : relations autorisées
+    assert client.get("/techniciens/", params={"include": "taches"}).status_code == 200
+
+    # Simple utilisateur : ni include=, ni champs pointés des relations
+    request.getfixturevalue("create_test_user_non_admin")
+    for params in ({"include": "taches"}, {"include": "assignations,commentaires"}, {"fields": "nom,taches.titre"}):
+        assert client.get("/techniciens/", params=params).status_code == 403
+        assert client.get(f"/techniciens/{tech_id}", params=params).status_code == 403
+    # Champs simples toujours accessibles
+    assert client.get("/techniciens/", params={"fields": "nom"}).status_code == 200
@@ -118,3 +118,62 @@ def test_create_user_email_duplicate(client):
 def test_get_user_not_found(client):
     r = client.get("/utilisateurs/9999")
     assert r.status_code == 404
+
+
+def test_user_detail_sparse_fields(client):
+    r = client.post("/utilisateurs/", json={
+        "nom": "UserSparse",
+        "email": "usersparse@test.com",
+        "mot_de_passe": "12345678",
+        "type": "admin",
+        "equipe": "Dev"
+    })
+    user_id = r.json()["data"]["id"]
+
+    r = client.get(f"/utilisateurs/{user_id}", params={"fields": "email,assignations.titre"})
+    assert r.status_code == 200
+    assert r.json()["data"] == {"id": user_id, "email": "usersparse@test.com", "assignations": []}
+
+    r = client.get("/utilisateurs/", params={"fields": "nom"})
+    assert all(set(u) == {"id", "nom"} for u in r.json()["data"]["users"])
+
+
+def test_import_users_router(client):
+    files = {"file": ("users.csv", "nom,email\nImport,import@test.com\n".encode(), "text/csv")}
+    r = client.post("/utilisateurs/import", files=files)
+    assert r.status_code == 200
+    assert r.json()["data"]["created"] == 1
+
+    files = {"file": ("users.csv", "nom,email\nHélène,helene@test.com\n".encode("latin-1"), "text/csv")}
+    r = client.post("/utilisateurs/import", files=files)
+    assert r.status_code == 400
+    assert "UTF-8" in r.json()["detail"]
+
+
+def test_user_update_and_delete_refresh_task_lists(client):
+    from app.tests import conftest
+    from app.models.tache import Tache
+
+    r = client.post("/utilisateurs/", json={
+        "nom": "Auteur", "email": "auteur@test.com", "mot_de_passe": "12345678", "type": "user", "equipe": "Dev"
+    })
+    user_id = r.json()["data"]["id"]
+    with conftest.TestingSessionLocal() as db:
+        db.add(Tache(titre="T", contenu="x", auteur_id=user_id, equipe="Dev"))
+        db.commit()
+
+    r = client.get("/taches/")
+    etag = r.headers["etag"]
+    assert r.json()["taches"][0]["auteur"]["nom"] == "Auteur"
+
+    # Nom embarqué dans les listes : ni corps en cache ni 304 périmés
+    client.put(f"/utilisateurs/{user_id}", json={"nom": "Renommé"})
+    r = client.get("/taches/", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()["taches"][0]["auteur"]["nom"] == "Renommé"
+
+    # Ses tâches disparaissent avec lui
+    client.delete(f"/utilisateurs/{user_id}")
+    r = client.get("/taches/")
+    assert r.json()["total"] == 0
+    assert r.json()["taches"] == []
@@ -1,7 +1,10 @@
 # app/tests/test_service_commentaires.py
 
 import pytest
+from sqlalchemy import event
+
 from app.tests.conftest import TestingSessionLocal
+from app.models.commentaire import Commentaire
 from app.models.tache import Tache
 from app.models.utilisateur import Utilisateur
 from app.schemas.schemas import CommentaireCreate
@@ -82,3 +85,31 @@ def test_get_commentaires(db):
 
     assert len(commentaires) == 1
     assert commentaires[0].contenu == "Très bien"
+
+
+# -------------------------------------------------------------------------
+# ✅ LISTE LÉGÈRE : auteurs en une requête, jamais la tâche parente
+# -------------------------------------------------------------------------
+def test_get_commentaires_lite_batch_loads_authors(db):
+    tache = db.query(Tache).first()
+    auteurs = [Utilisateur(nom=f"U{i}", email=f"u{i}@test.com", mot_de_passe="x") for i in range(3)]
+    db.add_all(auteurs)
+    db.commit()
+    tache_id = tache.id
+    db.add_all([Commentaire(contenu=f"c{i}", auteur_id=auteurs[i % 3].id, tache_id=tache_id) for i in range(9)])
+    db.commit()
+    db.expunge_all()
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.bind, "before_cursor_execute", listener)
+    commentaires = get_commentaires_service(tache_id, db)
+    event.remove(db.bind, "before_cursor_execute", listener)
+
+    # 1 requête pour les commentaires + 1 pour les 3 auteurs distincts
+    assert len(statements) == 2
+    assert len(commentaires) == 9
+    assert commentaires[0].auteur.nom == "U0"
+    payload = commentaires[0].model_dump()
+    assert "tache" not in payload
+    assert set(payload["auteur"]) == {"id", "nom", "avatar_url"}
@@ -0,0 +1,114 @@
+# app/tests/test_service_counter_buffers.py
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.tests.conftest import TestingSessionLocal, engine
+from app.models.tache import Tache
+from app.services.counter_buffers import CounterBuffer
+
+
+@pytest.fixture
+def db_session():
+    db = TestingSessionLocal()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def counter():
+    c = CounterBuffer("nb_vues", flush_seconds=60, max_pending=100, batch_size=2)
+    c._session_factory = sessionmaker(bind=engine)
+    return c
+
+
+def _taches(db, n):
+    taches = [Tache(titre=f"T{i}", contenu="x", nb_vues=i) for i in range(n)]
+    db.add_all(taches)
+    db.commit()
+    return [t.id for t in taches]
+
+
+def test_read_adds_pending_delta(db_session, counter):
+    (tache_id,) = _taches(db_session, 1)
+
+    counter.record(tache_id)
+    counter.record(tache_id)
+
+    assert counter.pending(tache_id) == 2
+    assert counter.read(tache_id, 0) == 2
+    assert counter.stats()["flush_lag_seconds"] >= 0
+
+
+def test_flush_writes_batched_deltas_without_touching_updated_at(db_session, counter):
+    ids = _taches(db_session, 3)
+    for tache_id, views in zip(ids, (1, 2, 3)):
+        for _ in range(views):
+            counter.record(tache_id)
+
+    assert counter.flush() == 6
+    assert counter.pending(ids[0]) == 0
+    assert counter.stats()["pending_total"] == 0
+
+    db_session.expire_all()
+    rows = db_session.query(Tache).filter(Tache.id.in_(ids)).order_by(Tache.id).all()
+    assert [t.nb_vues for t in rows] == [1, 3, 5]
+    assert all(t.updated_at is None for t in rows)
+    # lecture monotone : base écrite, plus rien en attente
+    assert counter.read(ids[2], rows[2].nb_vues) == 5
+
+
+def test_reads_stay_monotonic_during_flush(db_session, counter):
+    """Pendant le COMMIT, base d'avant ou d'après le lot : ni perte, ni double compte."""
+    (tache_id,) = _taches(db_session, 1)    # nb_vues = 0
+    counter.record(tache_id)
+    counter.record(tache_id)
+    assert counter.read(tache_id, 0) == 2
+    seen = []
+
+    factory = counter._session_factory
+    def session_factory():
+        session = factory()
+        commit = session.commit
+        def spy():
+            seen.append((counter.read(tache_id, 0), counter.read(tache_id, 2)))
+            counter.record(tache_id)        # vue arrivée pendant le COMMIT
+            commit()
+            seen.append((counter.read(tache_id, 0), counter.read(tache_id, 2)))
+        session.commit = spy
+        return session
+    counter._session_factory = session_factory
+
+    assert counter.flush() == 2
+    assert seen == [(2, 2), (3, 3)]
+    # Plancher gardé jusqu'au lot suivant, puis oublié
+    counter._session_factory = factory
+    assert counter.flush() == 1
+    assert counter.read(tache_id, 0) == 3
+    assert counter.flush() == 0
+    assert counter.read(tache_id, 0) == 0
+
+
+def test_failed_flush_requeues_views(db_session, counter, monkeypatch):
+    (tache_id,) = _taches(db_session, 1)
+    counter.record(tache_id)
+
+    def broken():
+        raise RuntimeError("db down")
+    monkeypatch.setattr(counter, "_session_factory", lambda: broken())
+
+    assert counter.flush() == 0
+    assert counter.pending(tache_id) == 1
+    assert counter.read(tache_id, 0) == 1
+    assert counter.stats()["errors"] == 1
+
+
+def test_stop_flushes_remaining_views(db_session, counter):
+    (tache_id,) = _taches(db_session, 1)
+    counter.start(sessionmaker(bind=engine))
+    counter.record(tache_id)
+
+    counter.stop()
+
+    db_session.expire_all()
+    assert db_session.get(Tache, tache_id).nb_vues == 1
+    assert counter.stats()["running"] is False
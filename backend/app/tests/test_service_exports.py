@@ -0,0 +1,38 @@
+# app/tests/test_service_exports.py
+import io
+import zipfile
+
+import pytest
+from fastapi import HTTPException
+
+from app.config import settings
+from app.services.exports import MISSING_FILE, ExportEntry, export_equipe_fichiers_service, stream_zip
+
+
+def test_stream_zip_yields_per_chunk(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_BYTES", 1024)
+    data = bytes(range(256)) * 64                      # 16 Kio, peu compressible par bloc
+    (tmp_path / "video.mp4").write_bytes(data)
+    entries = [
+        ExportEntry("video.mp4", str(tmp_path / "video.mp4")),
+        ExportEntry("absent.txt", str(tmp_path / "absent.txt")),
+    ]
+
+    pieces = list(stream_zip(entries))
+    # Envoi au fil de la lecture : jamais l'archive entière en un morceau
+    assert len(pieces) > 10
+    assert max(len(p) for p in pieces) <= 2 * 1024
+
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(pieces)))
+    assert archive.read("video.mp4") == data
+    assert archive.getinfo("video.mp4").compress_type == zipfile.ZIP_STORED
+    assert archive.read(MISSING_FILE) == b"absent.txt\n"
+
+
+def test_team_export_is_admin_only(tmp_path):
+    class User:
+        id, type = 1, "user"
+
+    with pytest.raises(HTTPException) as exc:
+        export_equipe_fichiers_service("Dev", None, None, db=None, current_user=User())
+    assert exc.value.status_code == 403
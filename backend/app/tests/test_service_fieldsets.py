@@ -0,0 +1,84 @@
+# app/tests/test_service_fieldsets.py
+import pytest
+from fastapi import HTTPException
+
+from app.tests.conftest import TestingSessionLocal
+from app.models.utilisateur import Utilisateur
+from app.models.tache import Tache
+from app.models.fichier import FichierTache
+from app.services.fieldsets import parse_fieldset, TACHES, UTILISATEURS
+from app.services.taches import list_taches_service
+
+
+class FakeUser:
+    id = 1
+    equipe = "Dev"
+    type = "admin"
+
+
+@pytest.fixture
+def db_session():
+    db = TestingSessionLocal()
+    yield db
+    db.close()
+
+
+# =========================================================
+# 🔹 PARSING
+# =========================================================
+def test_parse_fieldset_none_without_params():
+    assert parse_fieldset(TACHES, None, "") is None
+
+
+def test_parse_fieldset_columns_and_relations():
+    fs = parse_fieldset(TACHES, "titre,status,auteur.nom", "fichiers")
+
+    assert fs.columns == ("id", "titre", "status")
+    assert fs.relations["auteur"] == ("id", "nom")
+    assert "chemin" in fs.relations["fichiers"]
+
+
+def test_parse_fieldset_include_only_keeps_all_columns():
+    fs = parse_fieldset(UTILISATEURS, None, "assignations")
+
+    assert "email" in fs.columns
+    assert "mot_de_passe" not in fs.columns
+    assert list(fs.relations) == ["assignations"]
+
+
+@pytest.mark.parametrize("fields,include", [
+    ("mot_de_passe", None),
+    ("auteur.mot_de_passe", None),
+    (None, "inconnue"),
+])
+def test_parse_fieldset_rejects_unknown(fields, include):
+    with pytest.raises(HTTPException) as exc:
+        parse_fieldset(UTILISATEURS if fields == "mot_de_passe" else TACHES, fields, include)
+    assert exc.value.status_code == 400
+
+
+# =========================================================
+# 🔹 CHARGEMENT LIMITÉ
+# =========================================================
+def test_list_taches_fieldset_limits_columns_and_relations(db_session):
+    u = Utilisateur(nom="Léa", email="lea@test.com", mot_de_passe="123", type="admin")
+    db_session.add(u)
+    db_session.commit()
+    t = Tache(titre="T", contenu="long" * 100, auteur_id=u.id, assign_to_id=u.id)
+    db_session.add(t)
+    db_session.commit()
+    db_session.add(FichierTache(nom_fichier="a.txt", chemin="uploads/a.txt", tache_id=t.id))
+    db_session.commit()
+    tache_id, user_id = t.id, u.id
+    db_session.expunge_all()
+
+    fs = parse_fieldset(TACHES, "titre,auteur.nom", None)
+    res = list_taches_service(None, None, "date_desc", 1, 10, db_session, FakeUser(), fieldset=fs)
+
+    tache = res["taches"][0]
+    # Colonnes / relations non demandées : jamais lues
+    assert "contenu" not in tache.__dict__
+    assert "fichiers" not in tache.__dict__
+    assert "assign_to" not in tache.__dict__
+
+    assert fs.serialize(tache) == {"id": tache_id, "titre": "T", "auteur": {"id": user_id, "nom": "Léa"}}
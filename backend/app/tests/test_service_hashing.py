@@ -0,0 +1,44 @@
+import threading
+import pytest
+from fastapi import HTTPException
+from app.services.hashing import HashingService, hash_password, verify_password_async
+
+
+# =========================================================
+# 🔹 HASH / VERIFY
+# =========================================================
+def test_hash_and_verify_roundtrip():
+    service = HashingService(max_workers=1, max_pending=1)
+    hashed = service.hash("secret123")
+
+    assert service.verify("secret123", hashed)
+    assert not service.verify("wrong", hashed)
+    assert service.stats()["completed"] == 3
+
+
+@pytest.mark.asyncio
+async def test_verify_password_async():
+    hashed = hash_password("secret123")
+
+    assert await verify_password_async("secret123", hashed)
+
+
+# =========================================================
+# 🔹 SATURATION
+# =========================================================
+def test_rejects_when_saturated():
+    service = HashingService(max_workers=1, max_pending=0)
+    gate = threading.Event()
+
+    blocked = service._submit(gate.wait)
+    with pytest.raises(HTTPException) as exc:
+        service.hash("secret123")
+
+    gate.set()
+    blocked.result()
+    # Slot rendu avant le résultat : pas d'attente nécessaire
+    assert service.stats()["in_flight"] == 0
+
+    assert exc.value.status_code == 503
+    assert service.stats()["rejected"] == 1
+    assert service.hash("secret123")
@@ -0,0 +1,79 @@
+# app/tests/test_service_list_cache.py
+from app.services.list_cache import ResponseCache
+
+
+def _cache(**kwargs):
+    params = {"max_entries": 10, "max_bytes": 1000, "ttl_seconds": 60}
+    params.update(kwargs)
+    return ResponseCache(**params)
+
+
+def _put(cache, key, scope="admin", ids=(), searched=False, body=b"{}"):
+    cache.put(key, scope, body, '"e"', ids, searched, cache.generation())
+
+
+# =========================================================
+# 🔹 LRU / MÉMOIRE
+# =========================================================
+def test_hit_miss_and_stats():
+    cache = _cache()
+    assert cache.get(("a",)) is None
+    _put(cache, ("a",))
+    assert cache.get(("a",)).body == b"{}"
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_memory_cap_evicts_lru():
+    cache = _cache(max_bytes=10)
+    _put(cache, ("a",), body=b"x" * 4)
+    _put(cache, ("b",), body=b"x" * 4)
+    cache.get(("a",))
+    _put(cache, ("c",), body=b"x" * 4)
+
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) is not None
+    assert cache.stats()["bytes"] == 8
+    assert cache.stats()["evictions"] == 1
+
+
+def test_stale_generation_is_not_stored():
+    cache = _cache()
+    generation = cache.generation()
+    cache.invalidate_tache(1)
+    cache.put(("a",), "admin", b"{}", '"e"', (), False, generation)
+    assert cache.get(("a",)) is None
+
+
+# =========================================================
+# 🔹 INVALIDATION CIBLÉE
+# =========================================================
+def test_in_place_write_only_drops_pages_with_the_tache():
+    cache = _cache()
+    _put(cache, ("admin-p1",), ids=(1, 2))
+    _put(cache, ("admin-p2",), ids=(3,))
+    _put(cache, ("admin-search",), ids=(3,), searched=True)
+    _put(cache, ("user7",), scope=7, ids=(1,))
+    _put(cache, ("user8",), scope=8, ids=(5,))
+
+    cache.invalidate_tache(1, 7)
+
+    assert cache.get(("admin-p1",)) is None
+    assert cache.get(("admin-search",)) is None
+    assert cache.get(("user7",)) is None
+    assert cache.get(("admin-p2",)) is not None
+    assert cache.get(("user8",)) is not None
+
+
+def test_membership_write_drops_whole_scopes():
+    cache = _cache()
+    _put(cache, ("admin",), ids=(2,))
+    _put(cache, ("user7",), scope=7, ids=())
+    _put(cache, ("user8",), scope=8, ids=())
+
+    cache.invalidate_tache(1, None, 7, membership=True)
+
+    assert cache.get(("admin",)) is None
+    assert cache.get(("user7",)) is None
+    assert cache.get(("user8",)) is not None
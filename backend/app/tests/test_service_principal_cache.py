@@ -0,0 +1,110 @@
+import time
+import pytest
+from sqlalchemy import event
+from app.tests.conftest import TestingSessionLocal
+from app.models.utilisateur import Utilisateur
+from app.auth import create_access_token, get_current_user
+from app.services.principal_cache import PrincipalCache, principal_cache
+from app.services.utilisateurs import update_user_service, delete_user_service
+
+
+class FakeAdmin:
+    id = 999
+    type = "admin"
+
+
+# =========================================================
+# 🔧 DB fixture
+# =========================================================
+@pytest.fixture
+def db_session():
+    db = TestingSessionLocal()
+    yield db
+    db.rollback()
+    db.close()
+
+
+@pytest.fixture
+def user(db_session):
+    u = Utilisateur(nom="Cache", email="cache@test.com", mot_de_passe="123", type="user", equipe="Dev")
+    db_session.add(u)
+    db_session.commit()
+    return u
+
+
+def _count_queries(db_session):
+    counter = {"n": 0}
+
+    @event.listens_for(db_session.bind, "before_cursor_execute")
+    def _count(*args):
+        counter["n"] += 1
+
+    return counter, _count
+
+
+# =========================================================
+# 🔹 LRU / TTL
+# =========================================================
+def test_cache_lru_eviction():
+    cache = PrincipalCache(max_size=2, ttl_seconds=60)
+    cache.put("1", {"id": 1})
+    cache.put("2", {"id": 2})
+    cache.get("1")
+    cache.put("3", {"id": 3})
+
+    assert cache.get("2") is None
+    assert cache.get("1") == {"id": 1}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_ttl_expiry():
+    cache = PrincipalCache(max_size=10, ttl_seconds=0.01)
+    cache.put("1", {"id": 1})
+    time.sleep(0.02)
+
+    assert cache.get("1") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_invalidate_by_id_removes_all_subs():
+    cache = PrincipalCache(max_size=10, ttl_seconds=60)
+    cache.put("7", {"id": 7})
+    cache.put("bob@test.com", {"id": 7})
+
+    cache.invalidate(user_id=7)
+
+    assert cache.stats()["size"] == 0
+
+
+# =========================================================
+# 🔹 get_current_user
+# =========================================================
+def test_get_current_user_hits_cache(db_session, user):
+    token = create_access_token({"sub": str(user.id)})
+
+    first = get_current_user(token=token, db=db_session)
+    counter, listener = _count_queries(db_session)
+    second = get_current_user(token=token, db=db_session)
+    event.remove(db_session.bind, "before_cursor_execute", listener)
+
+    assert first["id"] == second["id"] == user.id
+    assert counter["n"] == 0
+    assert principal_cache.stats()["hits"] >= 1
+
+
+def test_update_user_invalidates_cache(db_session, user):
+    token = create_access_token({"sub": str(user.id)})
+    get_current_user(token=token, db=db_session)
+
+    update_user_service(user.id, {"equipe": "QA"}, db_session, FakeAdmin())
+
+    assert get_current_user(token=token, db=db_session)["equipe"] == "QA"
+
+
+def test_delete_user_invalidates_cache(db_session, user):
+    token = create_access_token({"sub": str(user.id)})
+    get_current_user(token=token, db=db_session)
+
+    delete_user_service(user.id, db_session, FakeAdmin())
+
+    assert principal_cache.get(str(user.id)) is None
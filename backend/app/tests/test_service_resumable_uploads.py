@@ -0,0 +1,111 @@
+# app/tests/test_service_resumable_uploads.py
+import os
+
+import pytest
+from fastapi import HTTPException
+
+from app.config import settings
+from app.services import resumable_uploads, uploads
+from app.tests.conftest import TestingSessionLocal
+from app.services.resumable_uploads import (
+    abort_session_service,
+    create_session_service,
+    finalize_session_service,
+    gc_sessions,
+    get_session_service,
+    write_chunk_service,
+)
+
+
+class Owner:
+    id, type = 1, "user"
+
+
+class Other:
+    id, type = 2, "user"
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "RESUMABLE_CHUNK_BYTES", 8)
+    return tmp_path
+
+
+async def _body(*pieces):
+    for piece in pieces:
+        yield piece
+
+
+def _sessions(upload_dir):
+    root = upload_dir / resumable_uploads.SESSION_DIR
+    return sorted(os.listdir(root)) if root.exists() else []
+
+
+@pytest.mark.asyncio
+async def test_chunks_are_checked_against_limits(upload_dir):
+    session = create_session_service("a.bin", 12, None, Owner())
+    upload_id = session["upload_id"]
+
+    with pytest.raises(HTTPException) as exc:
+        await write_chunk_service(upload_id, 0, _body(b"x" * 5, b"x" * 5), None, Owner())
+    assert exc.value.status_code == 413        # bloc > chunk_size
+
+    state = await write_chunk_service(upload_id, 0, _body(b"x" * 4, b"x" * 4), None, Owner())
+    assert state["offset"] == 8
+    with pytest.raises(HTTPException) as exc:
+        await write_chunk_service(upload_id, 8, _body(b"y" * 6), None, Owner())
+    assert exc.value.status_code == 413        # au-delà de la taille annoncée
+
+    with pytest.raises(HTTPException) as exc:
+        get_session_service(upload_id, Other())
+    assert exc.value.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_finalize_requires_access_to_task(upload_dir):
+    from app.models.fichier import FichierTache
+    from app.models.tache import Tache
+
+    db = TestingSessionLocal()
+    try:
+        tache = Tache(titre="Autre", contenu="x", auteur_id=Other.id, assign_to_id=Other.id)
+        db.add(tache)
+        db.commit()
+        upload_id = create_session_service("a.bin", 4, None, Owner())["upload_id"]
+        await write_chunk_service(upload_id, 0, _body(b"data"), None, Owner())
+
+        with pytest.raises(HTTPException) as exc:
+            finalize_session_service(upload_id, tache.id, db, Owner())
+        assert exc.value.status_code == 403
+        assert db.query(FichierTache).filter_by(tache_id=tache.id).count() == 0
+        assert _sessions(upload_dir) == [upload_id]     # session conservée
+    finally:
+        db.close()
+
+
+def test_limits_on_creation():
+    with pytest.raises(HTTPException) as exc:
+        create_session_service("gros.iso", settings.RESUMABLE_MAX_FILE_BYTES + 1, None, Owner())
+    assert exc.value.status_code == 413
+
+    with pytest.raises(HTTPException) as exc:
+        create_session_service("..", 1, None, Owner())
+    assert exc.value.status_code == 400
+
+
+def test_expired_sessions_are_collected(upload_dir, monkeypatch):
+    monkeypatch.setattr(settings, "RESUMABLE_MAX_SESSIONS_PER_USER", 2)
+    kept = create_session_service("a.bin", 4, None, Owner())["upload_id"]
+    create_session_service("b.bin", 4, None, Owner())
+    with pytest.raises(HTTPException) as exc:
+        create_session_service("c.bin", 4, None, Owner())
+    assert exc.value.status_code == 429
+
+    abort_session_service(kept, Owner())
+    assert len(_sessions(upload_dir)) == 1
+
+    monkeypatch.setattr(settings, "RESUMABLE_SESSION_TTL_SECONDS", -1)
+    expired = create_session_service("d.bin", 4, None, Owner())["upload_id"]   # expire aussitôt
+    assert gc_sessions() == 1
+    assert expired not in _sessions(upload_dir) and len(_sessions(upload_dir)) == 1
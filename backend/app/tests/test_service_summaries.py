@@ -0,0 +1,129 @@
+# app/tests/test_service_summaries.py
+import threading
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.tests.conftest import TestingSessionLocal, engine
+from app.models.tache import Tache
+from app.services import summaries
+from app.services.summaries import SummaryQueue, summarize_tache
+
+LONG = "Le serveur de fichiers ne répond plus depuis ce matin. " * 4
+
+
+@pytest.fixture
+def db_session():
+    db = TestingSessionLocal()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def factory():
+    return sessionmaker(bind=engine)
+
+
+def _tache(db, contenu=LONG):
+    tache = Tache(titre="T", contenu=contenu)
+    db.add(tache)
+    db.commit()
+    return tache.id
+
+
+def _resume(tache_id):
+    with TestingSessionLocal() as db:
+        return db.get(Tache, tache_id).resume_ia
+
+
+def test_summarize_writes_without_touching_updated_at(db_session, factory):
+    tache_id = _tache(db_session)
+    updated_at = db_session.get(Tache, tache_id).updated_at
+
+    assert summarize_tache(tache_id, factory) is True
+    assert _resume(tache_id).startswith("Résumé automatique")
+    with TestingSessionLocal() as db:
+        assert db.get(Tache, tache_id).updated_at == updated_at
+
+    # Déjà résumée / contenu trop court / tâche absente : rien à faire
+    assert summarize_tache(tache_id, factory) is False
+    assert summarize_tache(_tache(db_session, "court"), factory) is False
+    assert summarize_tache(999, factory) is False
+
+
+def test_summarize_never_stores_stale_summary(db_session, factory, monkeypatch):
+    tache_id = _tache(db_session)
+
+    def generate_then_edit(contenu):
+        # Le contenu change pendant le calcul
+        with TestingSessionLocal() as db:
+            db.get(Tache, tache_id).contenu = LONG + " (modifié)"
+            db.commit()
+        return "périmé"
+
+    monkeypatch.setattr(summaries, "generate_summary", generate_then_edit)
+    assert summarize_tache(tache_id, factory) is False
+    assert _resume(tache_id) is None
+
+
+def test_queue_disabled_until_started(db_session):
+    queue = SummaryQueue(max_workers=1, max_pending=1)
+    assert queue.submit(_tache(db_session)) is False
+    assert queue.stats()["submitted"] == 0
+
+
+def test_queue_deduplicates_and_reruns(db_session, factory, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def blocking(tache_id, session_factory):
+        calls.append(tache_id)
+        started.set()
+        release.wait(5)
+        return True
+
+    monkeypatch.setattr(summaries, "summarize_tache", blocking)
+    queue = SummaryQueue(max_workers=1, max_pending=4)
+    queue.start(factory)
+
+    queue.submit(1)
+    assert started.wait(5)
+    queue.submit(2)
+    queue.submit(2)          # déjà en attente : ignoré
+    queue.submit(1)          # en cours : relancé après la fin
+    release.set()
+    assert queue.drain(timeout=5)
+    queue.shutdown()
+
+    assert sorted(calls) == [1, 1, 2]
+    stats = queue.stats()
+    assert stats["deduplicated"] == 2
+    assert stats["completed"] == 3
+
+
+def test_queue_rejects_when_full(factory, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(summaries, "summarize_tache", lambda *_: release.wait(5))
+    queue = SummaryQueue(max_workers=1, max_pending=1)
+    queue.start(factory)
+
+    assert queue.submit(1) is True
+    assert queue.submit(2) is True
+    assert queue.submit(3) is False      # jamais bloquant pour l'écrivain
+    release.set()
+    assert queue.drain(timeout=5)
+    queue.shutdown()
+    assert queue.stats()["rejected"] == 1
+
+
+def test_queue_counts_errors(factory, monkeypatch):
+    def boom(*_):
+        raise RuntimeError("modèle indisponible")
+
+    monkeypatch.setattr(summaries, "summarize_tache", boom)
+    queue = SummaryQueue(max_workers=1, max_pending=1)
+    queue.start(factory)
+    queue.submit(1)
+    assert queue.drain(timeout=5)
+    queue.shutdown()
+    assert queue.stats()["errors"] == 1
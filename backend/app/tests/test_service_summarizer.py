@@ -0,0 +1,56 @@
+# app/tests/test_service_summarizer.py
+from app.services.summarizer import summarize, summarize_batch, MAX_CHARS
+from app.services.some_ai_module import generate_summary, generate_summaries
+
+FR = (
+    "L'imprimante du deuxième étage ne fonctionne plus depuis lundi matin. "
+    "Les utilisateurs de la comptabilité ne peuvent plus imprimer leurs factures. "
+    "Le voyant de l'imprimante clignote en orange et un message de bourrage papier s'affiche. "
+    "Nous avons déjà redémarré l'imprimante sans succès. "
+    "Il fait beau aujourd'hui."
+)
+EN = (
+    "The VPN client disconnects every ten minutes. "
+    "It happens on all laptops of the sales team. "
+    "The VPN logs show an authentication timeout on the gateway. "
+    "Reinstalling the VPN client did not help. "
+    "Lunch was great."
+)
+
+
+def test_summary_keeps_central_sentences_in_order():
+    for text, off_topic in ((FR, "Il fait beau"), (EN, "Lunch")):
+        resume = summarize(text)
+        assert len(resume) <= MAX_CHARS
+        assert off_topic not in resume
+        sentences = [s for s in resume.split(". ") if s]
+        positions = [text.index(s.rstrip(".")) for s in sentences]
+        assert positions == sorted(positions)
+
+
+def test_short_and_degenerate_texts():
+    assert summarize("") == ""
+    assert summarize("  Court   texte. ") == "Court texte."
+    assert len(summarize("a" * 500)) == MAX_CHARS
+    assert len(summarize("mot " * 200)) <= MAX_CHARS
+
+
+def test_batch_matches_single_calls():
+    texts = [FR, EN, "", "court", FR + " " + EN, EN * 3]
+    assert summarize_batch(texts) == [summarize(t) for t in texts]
+
+
+def test_generate_summary_prefix():
+    assert generate_summary("") == ""
+    assert generate_summary(FR).startswith("Résumé automatique : ")
+    assert generate_summaries([FR, ""]) == [generate_summary(FR), ""]
+
+
+def test_similarity_by_term_chunks(monkeypatch):
+    from app.services import summarizer
+
+    texts = [FR, EN, FR + " " + EN]
+    expected = summarize_batch(texts)
+    # Tranches de 3 termes : même résultat que la matrice entière
+    monkeypatch.setattr(summarizer, "TERM_CHUNK", 3)
+    assert summarize_batch(texts) == expected
@@ -1,12 +1,19 @@
 import io
+import os
 import pytest
+from datetime import datetime, timedelta
 from fastapi import HTTPException, UploadFile
+from sqlalchemy import create_engine, inspect
+from app.db import Base
 from app.tests.conftest import TestingSessionLocal
 from app.models.utilisateur import Utilisateur
 from app.models.tache import Tache
 from app.models.fichier import FichierTache
 from app.models.commentaire import Commentaire
 from app.schemas.schemas import CommentaireCreate
+from app.services.counter_buffers import view_counter, like_counter
+from app.services.pagination import ensure_keyset_indexes
+from app.models.like import TacheLike
 from app.services.taches import (
     create_tache_service,
     list_taches_service,
@@ -14,9 +21,13 @@ from app.services.taches import (
     update_tache_service,
     delete_tache_service,
     like_tache_service,
+    unlike_tache_service,
+    get_like_service,
+    ensure_likes_schema,
     get_commentaires_service,
     add_commentaire_service,
-    delete_file_service
+    delete_file_service,
+    tache_etag,
 )
 
 # =========================================================
@@ -65,7 +76,10 @@ def test_create_tache_service(db_session):
     assert t.status == "en_attente"
 
 
-def test_create_tache_with_files(tmp_path, db_session):
+def test_create_tache_with_files(tmp_path, db_session, monkeypatch):
+    from app.services import uploads
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", str(tmp_path))
+
     # créer utilisateur
     user = Utilisateur(nom="Leo", email="leo@test.com", mot_de_passe="123", type="admin")
     db_session.add(user)
@@ -87,6 +101,7 @@ def test_create_tache_with_files(tmp_path, db_session):
     )
 
     assert len(tache.fichiers) == 1
+    assert tache.fichiers[0].chemin.startswith(str(tmp_path))
 
 
 # =========================================================
@@ -134,6 +149,176 @@ def test_list_taches_search(db_session):
     assert "Install Fibre" in res["taches"][0].titre
 
 
+def _walk(db_session, sort, limit=2):
+    res = list_taches_service(None, None, sort, 1, limit, db_session, fake_user)
+    pages = [[t.id for t in res["taches"]]]
+    while res["next_cursor"]:
+        res = list_taches_service(None, None, sort, 1, limit, db_session, fake_user, cursor=res["next_cursor"])
+        pages.append([t.id for t in res["taches"]])
+    return pages, res
+
+
+def test_list_taches_cursor_pagination(db_session):
+    base = datetime(2024, 1, 1)
+    for i in range(5):
+        # deux tâches avec la même date : départage par id
+        db_session.add(Tache(titre=f"T{i}", contenu="X", auteur_id=1, equipe="Dev",
+                             created_at=base + timedelta(days=i // 2)))
+    db_session.commit()
+
+    pages, last = _walk(db_session, "date_desc")
+    assert pages == [[5, 4], [3, 2], [1]]
+
+    # retour en arrière depuis la dernière page
+    back = list_taches_service(None, None, "date_desc", 1, 2, db_session, fake_user, cursor=last["prev_cursor"])
+    assert [t.id for t in back["taches"]] == [3, 2]
+    assert back["next_cursor"] is not None
+
+    pages, _ = _walk(db_session, "date_asc")
+    assert pages == [[1, 2], [3, 4], [5]]
+
+
+def test_list_taches_invalid_cursor(db_session):
+    with pytest.raises(HTTPException) as exc:
+        list_taches_service(None, None, "date_desc", 1, 10, db_session, fake_user, cursor="pas-un-curseur")
+    assert exc.value.status_code == 400
+
+
+def test_ensure_keyset_indexes_on_old_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX idx_tache_created_id")
+        conn.exec_driver_sql("DROP INDEX idx_commentaire_tache_date_id")
+
+    ensure_keyset_indexes(engine)
+    ensure_keyset_indexes(engine)   # idempotent
+
+    inspector = inspect(engine)
+    assert "idx_tache_created_id" in {i["name"] for i in inspector.get_indexes("taches")}
+    assert "idx_commentaire_tache_date_id" in {i["name"] for i in inspector.get_indexes("commentaires")}
+    engine.dispose()
+
+
+def test_list_taches_cached_count_invalidated_on_create(db_session):
+    user = Utilisateur(nom="Cpt", email="cpt@test.com", mot_de_passe="123", type="admin")
+    db_session.add(user)
+    db_session.commit()
+
+    res = list_taches_service(None, None, "date_desc", 1, 10, db_session, fake_user, count="cached")
+    assert (res["total"], res["count_mode"]) == (0, "cached")
+
+    create_tache_service("T", "C", user.id, "Dev", "haute", "info", None, db_session, user)
+
+    res = list_taches_service(None, None, "date_desc", 1, 10, db_session, fake_user, count="cached")
+    assert res["total"] == 1
+
+
+def test_list_taches_etag_follows_page_rows_and_total(db_session):
+    for i in range(3):
+        db_session.add(Tache(titre=f"T{i}", contenu="X", auteur_id=1, equipe="Dev",
+                             created_at=datetime(2024, 1, 1) + timedelta(days=i)))
+    db_session.commit()
+
+    def etag(**kwargs):
+        return list_taches_service(None, None, "date_desc", 1, 2, db_session, fake_user, **kwargs)["etag"]
+
+    first = etag()
+    with pytest.raises(HTTPException) as exc:
+        etag(if_none_match=first)
+    assert exc.value.status_code == 304
+
+    # Like sur une tâche de la page : ligne renvoyée modifiée
+    like_tache_service(3, db_session, fake_user)
+    second = etag()
+    assert second != first
+
+    # Suppression hors de la page : seul le total change
+    db_session.query(Tache).filter(Tache.id == 1).delete()
+    db_session.commit()
+    assert etag() != second
+
+
+def test_list_taches_estimated_count_falls_back_to_exact(db_session):
+    db_session.add(Tache(titre="T", contenu="X", auteur_id=1, equipe="Dev"))
+    db_session.commit()
+
+    res = list_taches_service(None, None, "date_desc", 1, 10, db_session, fake_user, count="estimated")
+
+    # SQLite n'a pas d'estimation du planificateur
+    assert (res["total"], res["count_mode"]) == (1, "exact")
+
+
+def test_list_taches_search_relevance(db_session):
+    db_session.add_all([
+        Tache(titre="Réunion", contenu="Parler de la fibre plus tard", auteur_id=1, equipe="Dev"),
+        Tache(titre="Fibre optique", contenu="Installer la fibre chez le client", auteur_id=1, equipe="Dev"),
+        Tache(titre="Autre", contenu="Rien à voir", auteur_id=1, equipe="Dev"),
+    ])
+    db_session.commit()
+
+    res = list_taches_service("fibre", None, "relevance", 1, 10, db_session, fake_user)
+
+    assert res["total"] == 2
+    assert res["taches"][0].titre == "Fibre optique"
+
+
+def test_list_taches_search_index_follows_updates(db_session):
+    t = Tache(titre="Ancien titre", contenu="X", auteur_id=1, equipe="Dev")
+    db_session.add(t)
+    db_session.commit()
+
+    t.titre = "Câblage réseau"
+    db_session.commit()
+
+    assert list_taches_service("cablage", None, "date_desc", 1, 10, db_session, fake_user)["total"] == 1
+    assert list_taches_service("ancien", None, "date_desc", 1, 10, db_session, fake_user)["total"] == 0
+
+
+def test_list_taches_search_without_words_falls_back_to_ilike(db_session):
+    db_session.add_all([
+        Tache(titre="Urgent !!!", contenu="X", auteur_id=1, equipe="Dev"),
+        Tache(titre="Autre", contenu="Rien", auteur_id=1, equipe="Dev"),
+    ])
+    db_session.commit()
+
+    assert list_taches_service("!!!", None, "relevance", 1, 10, db_session, fake_user)["total"] == 1
+    assert list_taches_service("?!", None, "date_desc", 1, 10, db_session, fake_user)["total"] == 0
+
+
+def test_list_taches_search_ilike_backend(db_session, monkeypatch):
+    from app.config import settings
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "ilike")
+    db_session.add(Tache(titre="Install Fibre", contenu="X", auteur_id=1, equipe="Dev"))
+    db_session.commit()
+
+    res = list_taches_service("ibr", None, "relevance", 1, 10, db_session, fake_user)
+
+    assert res["total"] == 1
+
+
+def test_list_taches_summary_view(db_session):
+    u = Utilisateur(nom="Sam", email="sam@test.com", mot_de_passe="123", type="admin")
+    db_session.add(u)
+    db_session.commit()
+    t = Tache(titre="Résumé", contenu="X" * 5000, auteur_id=u.id, assign_to_id=u.id, equipe="Dev")
+    db_session.add(t)
+    db_session.commit()
+    db_session.add_all([
+        FichierTache(nom_fichier="a.txt", chemin="uploads/a.txt", tache_id=t.id),
+        FichierTache(nom_fichier="b.txt", chemin="uploads/b.txt", tache_id=t.id),
+    ])
+    db_session.commit()
+    db_session.expunge_all()
+
+    res = list_taches_service(None, "Sam", "date_desc", 1, 10, db_session, fake_user, view="summary")
+
+    row = res["taches"][0]
+    assert (row.titre, row.auteur_nom, row.assign_to_nom, row.nb_fichiers) == ("Résumé", "Sam", "Sam", 2)
+    assert "contenu" not in row._mapping
+    assert len(db_session.identity_map) == 0
+
+
 # =========================================================
 # 🔹 DÉTAIL TÂCHE
 # =========================================================
@@ -152,6 +337,22 @@ def test_get_tache_detail_not_found(db_session):
         get_tache_detail_service(9999, db_session)
 
 
+def test_get_tache_detail_view_keeps_updated_at(db_session):
+    t = Tache(titre="T", contenu="court", auteur_id=1, equipe="Dev")
+    db_session.add(t)
+    db_session.commit()
+
+    res = get_tache_detail_service(t.id, db_session)
+    assert res.updated_at is None
+    assert res.nb_vues == 1
+
+    # If-None-Match à jour : 304 avant toute écriture
+    with pytest.raises(HTTPException) as exc:
+        get_tache_detail_service(t.id, db_session, if_none_match=tache_etag(res))
+    assert exc.value.status_code == 304
+    assert view_counter.pending(t.id) == 1
+
+
 # =========================================================
 # 🔹 UPDATE TÂCHE
 # =========================================================
@@ -203,19 +404,61 @@ def test_delete_tache_not_found(db_session):
 # =========================================================
 # 🔹 LIKE TÂCHE
 # =========================================================
+def test_ensure_likes_schema_on_old_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(bind=engine)
+    TacheLike.__table__.drop(engine)
+
+    ensure_likes_schema(engine)
+    ensure_likes_schema(engine)   # idempotent
+
+    assert inspect(engine).has_table("tache_likes")
+    engine.dispose()
+
+
 def test_like_tache_service(db_session):
     t = Tache(titre="Like", contenu="aaa", auteur_id=1, equipe="Dev")
     db_session.add(t)
     db_session.commit()
 
-    res = like_tache_service(t.id, db_session)
+    res = like_tache_service(t.id, db_session, fake_user)
+
+    assert res == {"likes": 1, "liked": True}
+
+
+def test_like_tache_is_idempotent_per_user(db_session):
+    t = Tache(titre="Like", contenu="aaa", auteur_id=1, equipe="Dev", likes=5)
+    db_session.add(t)
+    db_session.commit()
+
+    assert like_tache_service(t.id, db_session, fake_user)["likes"] == 6
+    assert like_tache_service(t.id, db_session, fake_user)["likes"] == 6
+    assert get_like_service(t.id, db_session, fake_user) == {"likes": 6, "liked": True}
+
+    assert unlike_tache_service(t.id, db_session, fake_user) == {"likes": 5, "liked": False}
+    assert unlike_tache_service(t.id, db_session, fake_user)["likes"] == 5
+    assert db_session.query(TacheLike).count() == 0
+
+
+def test_like_tache_coalesced(db_session, monkeypatch):
+    from app.config import settings
+    monkeypatch.setattr(settings, "LIKES_COALESCE", True)
+    t = Tache(titre="Like", contenu="aaa", auteur_id=1, equipe="Dev")
+    db_session.add(t)
+    db_session.commit()
+
+    assert like_tache_service(t.id, db_session, fake_user)["likes"] == 1
 
-    assert res["likes"] == 1
+    # Total pas encore écrit, mais lu avec le delta en attente
+    db_session.expire_all()
+    assert db_session.get(Tache, t.id).likes == 0
+    assert like_counter.pending(t.id) == 1
 
 
 def test_like_tache_not_found(db_session):
     with pytest.raises(HTTPException):
-        like_tache_service(9999, db_session)
+        like_tache_service(9999, db_session, fake_user)
+    assert db_session.query(TacheLike).count() == 0
 
 
 # =========================================================
@@ -262,7 +505,8 @@ def test_get_commentaires_service(db_session):
 
     res = get_commentaires_service(t.id, db_session)
 
-    assert len(res) == 1
+    assert len(res["commentaires"]) == 1
+    assert res["total"] == 1
 
 
 # =========================================================
@@ -287,6 +531,69 @@ def test_delete_file_service(db_session, tmp_path):
     assert not file_path.exists()
 
 
+def test_attachments_are_deduplicated_and_refcounted(db_session, tmp_path, monkeypatch):
+    from app.models.fichier import FichierBlob
+    from app.config import settings
+    from app.services import uploads
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "UPLOAD_BLOB_GRACE_SECONDS", 0)
+
+    user = Utilisateur(nom="Dup", email="dup@test.com", mot_de_passe="123", type="admin")
+    db_session.add(user)
+    db_session.commit()
+
+    def create(name):
+        return create_tache_service(
+            "T", "C", user.id, "Dev", "haute", "info",
+            fichiers=[UploadFile(filename=name, file=io.BytesIO(b"rapport"))],
+            db=db_session, current_user=user,
+        )
+
+    t1, t2 = create("rapport.pdf"), create("copie.pdf")
+    f1, f2 = t1.fichiers[0], t2.fichiers[0]
+    assert f1.chemin == f2.chemin and f1.nom_fichier == "rapport.pdf"
+    assert db_session.get(FichierBlob, f1.sha256).refcount == 2
+
+    # Une référence rendue : le contenu reste pour l'autre tâche
+    delete_file_service(f1.id, db_session)
+    db_session.expire_all()
+    assert db_session.get(FichierBlob, f2.sha256).refcount == 1
+    assert (tmp_path / f2.chemin[len(str(tmp_path)) + 1:]).exists()
+
+    chemin, sha256 = f2.chemin, f2.sha256
+    delete_tache_service(t2.id, db_session)
+    assert db_session.get(FichierBlob, sha256) is None
+    assert not os.path.exists(chemin)
+
+
+def test_download_file_requires_access(db_session, tmp_path):
+    from app.services.downloads import download_file_service
+
+    path = tmp_path / "note.txt"
+    path.write_bytes(b"abc")
+    t = Tache(titre="Privée", contenu="C", auteur_id=1, assign_to_id=2)
+    db_session.add(t)
+    db_session.flush()
+    f = FichierTache(nom_fichier="note.txt", chemin=str(path), tache_id=t.id)
+    db_session.add(f)
+    db_session.commit()
+
+    class Other:
+        id, type = 3, "user"
+
+    class Assignee:
+        id, type = 2, "user"
+
+    with pytest.raises(HTTPException) as exc:
+        download_file_service(f.id, db_session, Other())
+    assert exc.value.status_code == 403
+
+    # Fichier non migré : pas d'ETag par empreinte, revalidation
+    res = download_file_service(f.id, db_session, Assignee())
+    assert res.headers["cache-control"] == "private, no-cache"
+    assert res.headers["content-type"].startswith("text/plain")
+
+
 def test_delete_file_not_found(db_session):
     with pytest.raises(HTTPException):
         delete_file_service(9999, db_session)
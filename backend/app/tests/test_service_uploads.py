@@ -0,0 +1,206 @@
+# app/tests/test_service_uploads.py
+import hashlib
+import io
+import os
+import stat
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.config import settings
+from app.services import uploads
+from app.services.uploads import store_uploads, store_uploads_async
+from app.tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_BYTES", 4)
+    monkeypatch.setattr(settings, "UPLOAD_BLOB_GRACE_SECONDS", 0)
+    return tmp_path
+
+
+@pytest.fixture
+def db_session():
+    db = TestingSessionLocal()
+    yield db
+    db.close()
+
+
+def _file(name, data):
+    return UploadFile(filename=name, file=io.BytesIO(data))
+
+
+def _blobs(upload_dir):
+    """Fichiers du magasin (hors .part), par nom."""
+    return sorted(
+        name for _, _, names in os.walk(upload_dir / uploads.BLOB_DIR) for name in names
+    )
+
+
+def test_store_uploads_streams_in_chunks(upload_dir):
+    stored = store_uploads([_file("a.txt", b"hello world"), _file("../../b.bin", b"\x00" * 10)])
+
+    assert [s.nom_fichier for s in stored] == ["a.txt", "b.bin"]
+    assert [s.taille for s in stored] == [11, 10]
+    sha = hashlib.sha256(b"hello world").hexdigest()
+    assert stored[0].sha256 == sha
+    assert stored[0].chemin == os.path.join(str(upload_dir), "blobs", sha[:2], sha[2:4], sha)
+    assert open(stored[0].chemin, "rb").read() == b"hello world"
+    assert _blobs(upload_dir) == sorted(s.sha256 for s in stored)   # aucun .part restant
+
+
+def test_identical_content_is_stored_once(upload_dir):
+    first = store_uploads([_file("a.txt", b"same bytes"), _file("copie.txt", b"same bytes")])
+    again = store_uploads([_file("autre.txt", b"same bytes")])
+
+    assert len({s.chemin for s in first + again}) == 1
+    # Écritures parallèles : un seul des deux premiers a créé le blob
+    assert sorted(s.created for s in first) == [False, True]
+    assert not again[0].created
+    assert len(_blobs(upload_dir)) == 1
+
+
+def test_published_blob_is_world_readable(upload_dir):
+    (stored,) = store_uploads([_file("a.txt", b"proxy")])
+    assert stat.S_IMODE(os.stat(stored.chemin).st_mode) == uploads.BLOB_MODE == 0o644
+
+
+def test_per_file_limit_rejects_and_cleans_up(upload_dir):
+    with pytest.raises(HTTPException) as exc:
+        store_uploads([_file("ok.txt", b"x" * 8), _file("gros.txt", b"x" * 20)], max_file_bytes=16)
+
+    assert exc.value.status_code == 413
+    assert "gros.txt" in exc.value.detail
+    assert _blobs(upload_dir) == []
+
+
+def test_per_request_limit_counts_all_files(upload_dir):
+    files = [_file(f"f{i}.txt", b"x" * 12) for i in range(3)]
+    with pytest.raises(HTTPException) as exc:
+        store_uploads(files, max_file_bytes=16, max_request_bytes=30)
+
+    assert exc.value.status_code == 413
+    assert _blobs(upload_dir) == []
+
+
+def test_failed_request_keeps_preexisting_blob(upload_dir):
+    (existing,) = store_uploads([_file("a.txt", b"x" * 8)])
+    with pytest.raises(HTTPException):
+        store_uploads([_file("b.txt", b"x" * 8), _file("gros.txt", b"y" * 20)], max_file_bytes=16)
+
+    assert os.path.exists(existing.chemin)
+    assert _blobs(upload_dir) == [existing.sha256]
+
+
+@pytest.mark.asyncio
+async def test_store_uploads_async(upload_dir):
+    stored = await store_uploads_async([_file(f"f{i}.txt", bytes([i]) * 9) for i in range(5)])
+
+    assert [s.taille for s in stored] == [9] * 5
+    assert open(stored[3].chemin, "rb").read() == b"\x03" * 9
+    assert await store_uploads_async(None) == []
+
+
+def test_invalid_filename(upload_dir):
+    with pytest.raises(HTTPException) as exc:
+        store_uploads([_file("..", b"x")])
+    assert exc.value.status_code == 400
+
+
+# =========================================================
+# 🔹 COMPTEURS DE RÉFÉRENCES
+# =========================================================
+def test_refcounts_release_blob_when_unreferenced(db_session, upload_dir):
+    from app.models.fichier import FichierBlob
+    from app.services.uploads import acquire_blobs, release_blobs, remove_orphan_blobs
+
+    a, b = store_uploads([_file("a.txt", b"partage"), _file("b.txt", b"partage")])
+    acquire_blobs(db_session, [a, b])
+    db_session.commit()
+    assert db_session.get(FichierBlob, a.sha256).refcount == 2
+
+    assert release_blobs(db_session, [a.sha256]) == []
+    db_session.commit()
+    db_session.expire_all()
+    assert db_session.get(FichierBlob, a.sha256).refcount == 1
+
+    orphans = release_blobs(db_session, [b.sha256, None])
+    db_session.commit()
+    assert orphans == [a.sha256]
+    assert remove_orphan_blobs(db_session, orphans) == 1
+    assert not os.path.exists(a.chemin)
+    assert _blobs(upload_dir) == []
+
+
+def test_discard_keeps_blob_referenced_meanwhile(db_session, upload_dir):
+    from app.services.uploads import acquire_blobs, discard_uploads
+
+    (stored,) = store_uploads([_file("a.txt", b"course")])
+    acquire_blobs(db_session, [stored])     # même contenu validé par une autre requête
+    db_session.commit()
+
+    discard_uploads([stored], db_session)
+    assert os.path.exists(stored.chemin)
+
+
+def test_discard_keeps_blob_reused_meanwhile(db_session, upload_dir):
+    from app.services.uploads import discard_uploads
+
+    (stored,) = store_uploads([_file("a.txt", b"course")])
+    (reused,) = store_uploads([_file("b.txt", b"course")])    # pas encore validé
+    assert stored.created and not reused.created
+
+    discard_uploads([stored], db_session)
+    assert os.path.exists(stored.chemin)
+
+    (other,) = store_uploads([_file("c.txt", b"seul")])
+    discard_uploads([other], db_session)
+    assert not os.path.exists(other.chemin)
+
+
+def test_cleanup_runs_only_after_commit(db_session, upload_dir):
+    from app.models.fichier import FichierBlob
+    from app.services.uploads import acquire_blobs, release_fichiers
+
+    (stored,) = store_uploads([_file("a.txt", b"transaction")])
+    legacy = upload_dir / "ancien.txt"
+    legacy.write_bytes(b"ancien")
+    acquire_blobs(db_session, [stored])
+    db_session.commit()
+
+    release_fichiers(db_session, [(stored.sha256, stored.chemin), (None, str(legacy))])
+    db_session.rollback()
+    assert os.path.exists(stored.chemin) and legacy.exists()
+    assert db_session.get(FichierBlob, stored.sha256).refcount == 1
+
+    release_fichiers(db_session, [(stored.sha256, stored.chemin), (None, str(legacy))])
+    db_session.commit()
+    assert not os.path.exists(stored.chemin) and not legacy.exists()
+
+
+def test_cleanup_keeps_recently_reused_blob(db_session, upload_dir, monkeypatch):
+    from app.services.uploads import acquire_blobs, release_fichiers
+
+    monkeypatch.setattr(settings, "UPLOAD_BLOB_GRACE_SECONDS", 3600)
+    (stored,) = store_uploads([_file("a.txt", b"rejoue")])
+    acquire_blobs(db_session, [stored])
+    db_session.commit()
+    old = stored.mtime_ns - 7200 * 10**9
+    os.utime(stored.chemin, ns=(old, old))
+
+    # Même contenu envoyé pendant la suppression : blob rajeuni, référence à venir
+    (reused,) = store_uploads([_file("b.txt", b"rejoue")])
+    release_fichiers(db_session, [(stored.sha256, stored.chemin)])
+    db_session.commit()
+    assert os.path.exists(reused.chemin)
+
+    os.utime(stored.chemin, ns=(old, old))
+    (again,) = store_uploads([_file("c.txt", b"rejoue")])
+    acquire_blobs(db_session, [again])
+    db_session.commit()
+    os.utime(stored.chemin, ns=(old, old))
+    release_fichiers(db_session, [(again.sha256, again.chemin)])
+    db_session.commit()
+    assert not os.path.exists(stored.chemin)
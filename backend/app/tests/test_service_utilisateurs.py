@@ -4,7 +4,11 @@ from datetime import datetime
 from starlette.background import BackgroundTasks
 from fastapi import HTTPException, UploadFile
 from app.tests.conftest import TestingSessionLocal
+from app.config import settings
 from app.models.utilisateur import Utilisateur
+from app.models.tache import Tache
+from app.models.like import TacheLike
+from app.services.taches import like_tache_service
 from app.services.utilisateurs import (
     create_user_service,
     list_users_service,
@@ -12,7 +16,8 @@ from app.services.utilisateurs import (
     update_user_service,
     delete_user_service,
     upload_avatar_service,
-    get_avatar_service
+    get_avatar_service,
+    import_users_service,
 )
 
 # =========================================================
@@ -100,6 +105,72 @@ def test_create_user_email_duplicate(db_session):
         create_user_service(user_data, db_session, fake_admin, background_tasks)
 
 
+# =========================================================
+# 🔹 Import en masse
+# =========================================================
+def test_import_users_csv(db_session):
+    db_session.add(Utilisateur(nom="Old", email="old@test.com", mot_de_passe="x", type="user"))
+    db_session.commit()
+    background_tasks = BackgroundTasks()
+
+    content = (
+        "nom,email,mot_de_passe,type,equipe\n"
+        "Ana,ana@test.com,secret123,technicien,Support\n"
+        "Old,old@test.com,,user,\n"
+        "Ana bis,ana@test.com,,user,\n"
+        "Sans email,pas-un-email,,user,\n"
+        "Ben,ben@test.com,,,\n"
+    ).encode()
+
+    report = import_users_service(content, "users.csv", db_session, fake_admin, background_tasks)
+
+    statuses = {r["line"]: r["status"] for r in report["rows"]}
+    assert statuses == {2: "created", 3: "duplicate", 4: "duplicate", 5: "error", 6: "created"}
+    assert report["created"] == 2
+    assert len(background_tasks.tasks) == 1
+
+    ben = db_session.query(Utilisateur).filter_by(email="ben@test.com").first()
+    assert ben.type == "user"
+    assert ben.equipe == "Aucune"
+    assert ben.is_active is False
+
+
+def test_import_users_ndjson_invalid_line(db_session):
+    content = b'{"nom": "Zoe", "email": "zoe@test.com"}\n{pas du json}\n'
+
+    report = import_users_service(content, "users.ndjson", db_session, fake_admin, BackgroundTasks())
+
+    assert [r["status"] for r in report["rows"]] == ["created", "error"]
+
+
+def test_import_users_latin1_csv_rejected(db_session):
+    content = "nom,email\nHélène,helene@test.com\n".encode("latin-1")
+
+    with pytest.raises(HTTPException) as exc:
+        import_users_service(content, "users.csv", db_session, fake_admin, BackgroundTasks())
+
+    assert exc.value.status_code == 400
+    assert "UTF-8" in exc.value.detail
+
+
+def test_import_users_row_cap_checked_while_reading(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "USER_IMPORT_MAX_ROWS", 2)
+    stream = io.BytesIO(b"nom,email\na,a@test.com\nb,b@test.com\nc,c@test.com\n")
+
+    with pytest.raises(HTTPException) as exc:
+        import_users_service(stream, "users.csv", db_session, fake_admin, BackgroundTasks())
+
+    assert exc.value.status_code == 400
+    assert not stream.closed
+    assert db_session.query(Utilisateur).count() == 0
+
+
+def test_import_users_unauthorized(db_session):
+    with pytest.raises(HTTPException) as exc:
+        import_users_service(b"nom,email\n", "users.csv", db_session, fake_user, BackgroundTasks())
+    assert exc.value.status_code == 403
+
+
 # =========================================================
 # 🔹 Listing
 # =========================================================
@@ -135,6 +206,20 @@ def test_list_users_with_filter(db_session):
     assert len(res["users"]) == 1
 
 
+def test_list_users_exact_team_and_type(db_session):
+    db_session.add_all([
+        Utilisateur(nom="A", email="a@test.com", mot_de_passe="123", type="technicien", equipe="Support"),
+        Utilisateur(nom="B", email="b@test.com", mot_de_passe="123", type="user", equipe="Support N2"),
+    ])
+    db_session.commit()
+
+    res = list_users_service("", "", "Support", "", "nom_asc", 1, 10, db_session, fake_admin)
+    assert [u.nom for u in res["users"]] == ["A"]
+
+    res = list_users_service("", "", "", "tech", "nom_asc", 1, 10, db_session, fake_admin)
+    assert res["total"] == 0
+
+
 def test_list_users_unauthorized(db_session):
     with pytest.raises(HTTPException):
         list_users_service("", "", "", "", "nom_asc", 1, 10, db_session, fake_user)
@@ -224,6 +309,22 @@ def test_delete_user_service(db_session):
     assert db_session.query(Utilisateur).count() == 0
 
 
+def test_delete_user_removes_likes_from_totals(db_session):
+    u = Utilisateur(nom="Liker", email="liker@test.com", mot_de_passe="123", type="user")
+    db_session.add(u)
+    db_session.commit()
+    t = Tache(titre="T", contenu="x", likes=3)
+    db_session.add(t)
+    db_session.commit()
+    like_tache_service(t.id, db_session, u)
+
+    delete_user_service(u.id, db_session, fake_admin)
+
+    db_session.expire_all()
+    assert db_session.get(Tache, t.id).likes == 3
+    assert db_session.query(TacheLike).count() == 0
+
+
 def test_delete_user_unauthorized(db_session):
     u = Utilisateur(nom="Eve", email="eve@test.com", mot_de_passe="123", type="user")
     db_session.add(u)